@@ -0,0 +1,57 @@
+"""
+Bytes per Profile of the model objects (Profile, Location, Position, Company,
+dates excluded) with __slots__, against the same objects carrying a __dict__
+as the model classes used to.
+
+    python -m benchmarks.memory_benchmark
+"""
+import sys
+
+from linkedin import parser
+from linkedin.model import LinkedInModel
+from benchmarks.payloads import connections_xml
+
+class DictModel(object):
+    """
+    A model object with a per instance __dict__, like before __slots__.
+    """
+
+def as_dict_model(model):
+    copy = DictModel()
+    for name in model._fields():
+        setattr(copy, name, getattr(model, name, None))
+    return copy
+
+def models(value):
+    """
+    The model objects reachable from value, value included.
+    """
+    if isinstance(value, LinkedInModel):
+        yield value
+        for name in value._fields():
+            for model in models(getattr(value, name, None)):
+                yield model
+    elif isinstance(value, list):
+        for item in value:
+            for model in models(item):
+                yield model
+
+def slots_size(model):
+    return sys.getsizeof(model)
+
+def dict_size(model):
+    copy = as_dict_model(model)
+    return sys.getsizeof(copy) + sys.getsizeof(copy.__dict__)
+
+def main():
+    count = 2000
+    profiles = parser.parse_people(connections_xml(count))
+    objects = [model for profile in profiles for model in models(profile)]
+    before = sum([dict_size(model) for model in objects])
+    after = sum([slots_size(model) for model in objects])
+    print "%d profiles, %d model objects" % (count, len(objects))
+    print "__dict__:  %6d bytes per Profile" % (before / count)
+    print "__slots__: %6d bytes per Profile (%.0f%% less)" % (after / count, 100.0 * (before - after) / before)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Parses ~/connections responses of 500 and 5000 people into Profile objects,
+with minidom and with the single pass linkedin.parser engine.
+
+    python -m benchmarks.parser_benchmark
+"""
+import time
+from xml.dom import minidom
+
+from linkedin import parser
+from linkedin.model import Profile
+from benchmarks.payloads import connections_xml
+
+def minidom_people(xml):
+    document = minidom.parseString(xml)
+    return [Profile.create(person) for person in document.getElementsByTagName("person")]
+
+def single_pass_people(xml):
+    return parser.parse_people(xml)
+
+def best_of(function, xml, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        function(xml)
+        elapsed = time.time() - start
+        best = best is None and elapsed or min(best, elapsed)
+    return best
+
+def main():
+    for count, repeat in ((500, 5), (5000, 3)):
+        xml = connections_xml(count)
+        assert [repr(p) for p in minidom_people(xml)] == [repr(p) for p in single_pass_people(xml)]
+        old = best_of(minidom_people, xml, repeat)
+        new = best_of(single_pass_people, xml, repeat)
+        print "%5d connections (%4d KB): minidom %7.3fs  single pass %7.3fs  speedup x%.1f" % (
+            count, len(xml) / 1024, old, new, old / new)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic LinkedIn API responses for the benchmarks.
+"""
+import random
+
+INDUSTRIES = ["Computer Software", "Internet", "Staffing and Recruiting",
+              "Information Technology and Services", "Financial Services",
+              "Telecommunications", "Higher Education", "Marketing and Advertising"]
+COUNTRIES = [("Israel", "il"), ("San Francisco Bay Area", "us"), ("London, United Kingdom", "gb"),
+             ("Paris Area, France", "fr"), ("Berlin Area, Germany", "de"), ("Lisbon Area, Portugal", "pt")]
+COMPANIES = [("1009", "XIV - IBM", "Public Company"), ("1337", "LinkedIn", "Public Company"),
+             ("1441", "Google", "Public Company"), ("2020", "Akinon", "Privately Held"),
+             ("3003", "Tiny Startup", "Privately Held")]
+
+PERSON = """
+    <person>
+      <id>%(id)s</id>
+      <first-name>First%(n)d</first-name>
+      <last-name>Last%(n)d</last-name>
+      <headline>Engineer at %(company)s</headline>
+      <picture-url>http://media.linkedin.com/mpr/mprx/0_%(id)s</picture-url>
+      <site-standard-profile-request>
+        <url>http://www.linkedin.com/profile?viewProfile=&amp;key=%(n)d&amp;authToken=SBq1&amp;authType=name</url>
+      </site-standard-profile-request>
+      <location>
+        <name>%(location)s</name>
+        <country>
+          <code>%(country)s</code>
+        </country>
+      </location>
+      <industry>%(industry)s</industry>
+      <num-connections>%(num_connections)d</num-connections>
+      <positions total="%(num_positions)d">%(positions)s
+      </positions>
+    </person>"""
+
+POSITION = """
+        <position>
+          <id>%(id)d</id>
+          <title>Software Engineer</title>
+          <summary>Writes code</summary>
+          <start-date>
+            <year>%(start)d</year>
+            <month>%(month)d</month>
+          </start-date>%(end)s
+          <is-current>%(current)s</is-current>
+          <company>
+            <id>%(company_id)s</id>
+            <name>%(company)s</name>
+            <type>%(company_type)s</type>
+          </company>
+        </position>"""
+
+END_DATE = """
+          <end-date>
+            <year>%d</year>
+          </end-date>"""
+
+def person_xml(n, rnd):
+    positions = []
+    num_positions = rnd.randint(1, 3)
+    year = 2011
+    for i in range(num_positions):
+        start = year - rnd.randint(1, 6)
+        company_id, company, company_type = rnd.choice(COMPANIES)
+        positions.append(POSITION % {"id": n * 10 + i, "start": start, "month": rnd.randint(1, 12),
+                                     "end": i and END_DATE % year or "", "current": i == 0 and "true" or "false",
+                                     "company_id": company_id, "company": company, "company_type": company_type})
+        year = start
+    location, country = rnd.choice(COUNTRIES)
+    return PERSON % {"id": "id%08d" % n, "n": n, "company": COMPANIES[0][1], "location": location,
+                     "country": country, "industry": rnd.choice(INDUSTRIES),
+                     "num_connections": rnd.randint(1, 500), "num_positions": num_positions,
+                     "positions": "".join(positions)}
+
+def connections_xml(count, seed = 42):
+    """
+    A ~/connections response with 'count' people.
+    """
+    rnd = random.Random(seed)
+    people = "".join([person_xml(n, rnd) for n in range(count)])
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<connections total="%d" count="%d" start="0">%s\n</connections>' % (count, count, people))
@@ -0,0 +1,59 @@
+"""
+Requests signed per second by LinkedIn._signed_query, against the former
+signing path which quoted the key, keyed a new HMAC and quoted every
+parameter for each request, with a nonce of 20 random.randint calls.
+
+    python -m benchmarks.signing_benchmark
+"""
+import binascii, hashlib, hmac, random, string, time, urllib
+
+from linkedin.linkedin import LinkedIn
+
+PARAMS = {"keywords" : "python", "start" : 0, "count" : 25}
+
+def quote(st):
+    return urllib.quote(st, safe = '~')
+
+def utf8(st):
+    return isinstance(st, unicode) and st.encode("utf-8") or str(st)
+
+def urlencode(query_dict):
+    keys_and_values = [(quote(utf8(k)), quote(utf8(v))) for k, v in query_dict.items()]
+    keys_and_values.sort()
+    return '&'.join(['%s=%s' % (k, v) for k, v in keys_and_values])
+
+def former_signed_query(api, relative_url, params):
+    query_dict = {"oauth_consumer_key" : api._api_key,
+                  "oauth_nonce" : ''.join([string.letters[random.randint(0, len(string.letters) - 1)]
+                                           for i in range(20)]),
+                  "oauth_signature_method" : "HMAC-SHA1",
+                  "oauth_timestamp" : str(int(time.time())),
+                  "oauth_version" : api.VERSION,
+                  "oauth_token" : api._access_token}
+    signature_dict = dict(query_dict)
+    signature_dict.update(params)
+    key = quote(api._api_secret) + "&" + quote(api._access_token_secret)
+    base_string = "&".join([quote("GET"), quote(api._get_url(relative_url)), quote(urlencode(signature_dict))])
+    query_dict["oauth_signature"] = binascii.b2a_base64(hmac.new(key, base_string, hashlib.sha1).digest())[:-1]
+    return "%s?%s" % (relative_url, urlencode(params)), query_dict
+
+def signs_per_second(function, seconds = 1.0):
+    count = 0
+    start = time.time()
+    while time.time() - start < seconds:
+        for i in xrange(1000):
+            function()
+        count += 1000
+    return count / (time.time() - start)
+
+def main():
+    api = LinkedIn("api key", "api secret", "http://localhost")
+    api._access_token = "access token"
+    api._access_token_secret = "access token secret"
+    former = signs_per_second(lambda: former_signed_query(api, "/v1/people-search", PARAMS))
+    signer = signs_per_second(lambda: api._signed_query("/v1/people-search", params = PARAMS))
+    print "former signing %8.0f requests/s  signer %8.0f requests/s  speedup x%.2f" % (former, signer,
+                                                                                        signer / former)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Aggregates over large sets of profiles, computed with numpy on the columns of
+a batch.ProfileBatch. This module needs numpy, the rest of the package does not.
+
+    from linkedin import analytics
+    batch = api.get_connections(columnar = True)
+    analytics.industry_histogram(batch, top = 10) # [("Internet", 412), ("Computer Software", 388), ...]
+    analytics.location_histogram(batch)           # per country code, by = "name" per location name
+    analytics.tenure_distribution(batch)          # months spent in the positions
+    analytics.career_length_distribution(batch)   # months from the first position to the last one
+    analytics.current_employers(batch, top = 10)  # [("Google", 120), ...] members per current company
+
+The functions also take a list of Profiles, but convert it to a ProfileBatch
+on each call, which costs far more than the aggregate itself: convert the list
+once with ProfileBatch.from_profiles(profiles) before computing several ones.
+
+The distributions are dicts of count, mean, min, max, median, p25, p75, p90
+and histogram, a (counts, bin edges) pair of lists.
+"""
+import datetime
+
+import numpy
+
+from batch import ProfileBatch, MISSING
+
+def _batch(profiles):
+    """
+    The profiles as a ProfileBatch, a list of Profiles being converted anew.
+    """
+    if isinstance(profiles, ProfileBatch):
+        return profiles
+    return ProfileBatch.from_profiles(profiles)
+
+def _integers(column):
+    return numpy.frombuffer(column, dtype = numpy.dtype(column.typecode))
+
+def _factorize(values):
+    """
+    @Returns: the distinct values, None first, and the array of the codes of
+    the values in them. Hashing the values is much faster than sorting them.
+    """
+    codes = {None : 0}
+    keys = numpy.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                          dtype = numpy.intp, count = len(values))
+    distinct = [None] * len(codes)
+    for value, code in codes.iteritems():
+        distinct[code] = value
+    return distinct, keys
+
+def _ranking(distinct, counts, top):
+    """
+    (value, count) pairs of the values but None, most frequent first, then by value.
+    """
+    order = sorted(xrange(1, len(distinct)), key = lambda code: (-counts[code], distinct[code]))
+    if top is not None:
+        order = order[:top]
+    return [(distinct[code], int(counts[code])) for code in order if counts[code]]
+
+def _counts(values, top = None):
+    distinct, codes = _factorize(values)
+    return _ranking(distinct, numpy.bincount(codes, minlength = len(distinct)), top)
+
+def histogram(column, top = None):
+    """
+    Group-by count of a text column of a batch, e.g. batch.headline.
+    """
+    return _counts(column, top = top)
+
+def industry_histogram(profiles, top = None):
+    return _counts(_batch(profiles).industry, top = top)
+
+def location_histogram(profiles, by = "country_code", top = None):
+    """
+    Members per location country code, or per location name with by = "name".
+    """
+    return _counts(_batch(profiles).columns["location_" + by], top = top)
+
+def _months(years, months):
+    """
+    Month numbers of year/month columns, the missing months counted as January
+    like model.parse_date does.
+    """
+    return years * 12 + numpy.where(months == MISSING, 1, months) - 1
+
+def _position_spans(batch, today):
+    """
+    @Returns: the start and end month numbers of the positions, and a mask of
+    the positions with a start date. Positions without end date run until today.
+    """
+    positions = batch.positions.columns
+    start_years = _integers(positions["start_year"])
+    end_years = _integers(positions["end_year"])
+    now = today.year * 12 + today.month - 1
+    starts = _months(start_years, _integers(positions["start_month"]))
+    ends = numpy.where(end_years == MISSING, now, _months(end_years, _integers(positions["end_month"])))
+    return starts, ends, start_years != MISSING
+
+def distribution(values, bins = 10):
+    """
+    Summary statistics and histogram of a sequence of numbers.
+    """
+    values = numpy.asarray(values, dtype = numpy.float64)
+    if not len(values):
+        return {"count" : 0, "mean" : None, "min" : None, "max" : None, "median" : None,
+                "p25" : None, "p75" : None, "p90" : None, "histogram" : ([], [])}
+    p25, median, p75, p90 = numpy.percentile(values, [25, 50, 75, 90])
+    counts, edges = numpy.histogram(values, bins = bins)
+    return {"count" : len(values), "mean" : float(values.mean()), "min" : float(values.min()),
+            "max" : float(values.max()), "median" : float(median), "p25" : float(p25),
+            "p75" : float(p75), "p90" : float(p90), "histogram" : (counts.tolist(), edges.tolist())}
+
+def tenure_distribution(profiles, bins = 10, current = None, today = None):
+    """
+    Distribution of the months spent in each position with a start date. With
+    current = True or False, only the current or the past positions are counted.
+    """
+    batch = _batch(profiles)
+    starts, ends, dated = _position_spans(batch, today or datetime.date.today())
+    if current is not None:
+        dated &= (_integers(batch.positions.is_current) == 1) == current
+    return distribution(numpy.maximum(ends - starts, 0)[dated], bins)
+
+def career_length_distribution(profiles, bins = 10, today = None):
+    """
+    Distribution of the months between the start of the first position of each
+    member and the end of their last one, for the members with a dated position.
+    """
+    batch = _batch(profiles)
+    starts, ends, dated = _position_spans(batch, today or datetime.date.today())
+    # Undated positions can neither start nor end a career.
+    starts = numpy.where(dated, starts, numpy.iinfo(starts.dtype).max)
+    ends = numpy.where(dated, ends, numpy.iinfo(ends.dtype).min)
+
+    offsets = _integers(batch.position_offsets)
+    sizes = numpy.diff(offsets)
+    segments = offsets[:-1][sizes > 0]
+    if not len(segments):
+        return distribution([], bins)
+    # Each segment runs to the next non-empty one, the members without positions holding no items.
+    first = numpy.minimum.reduceat(starts, segments)
+    last = numpy.maximum.reduceat(ends, segments)
+    careers = numpy.add.reduceat(dated.astype(numpy.int64), segments) > 0
+    return distribution(numpy.maximum(last - first, 0)[careers], bins)
+
+def current_employers(profiles, top = None, by = "company_name"):
+    """
+    Members per company of their current positions, a member holding two
+    current positions at the same company being counted once. by = "company_id"
+    groups on the company ids.
+    """
+    batch = _batch(profiles)
+    positions = batch.positions.columns
+    offsets = _integers(batch.position_offsets)
+    members = numpy.repeat(numpy.arange(len(batch)), numpy.diff(offsets))
+    distinct, companies = _factorize(positions[by])
+    selected = (_integers(positions["is_current"]) == 1) & (companies != 0)
+    pairs = numpy.unique(members[selected] * len(distinct) + companies[selected])
+    return _ranking(distinct, numpy.bincount(pairs % len(distinct), minlength = len(distinct)), top)
@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+"""
+Non-blocking variant of the LinkedIn client.
+
+AsyncLinkedIn has the same public API methods as LinkedIn, but every call
+returns an AsyncResult immediately instead of blocking on the socket. The
+requests in flight are multiplexed on one thread by asyncore, so a single
+process can keep hundreds of API calls open without a thread per call.
+Signing and model parsing are shared with the blocking client. A rate_limiter
+never holds the loop back: a call over a rate fails right away, its
+AsyncResult raising RateLimitError.
+
+    api = AsyncLinkedIn(KEY, SECRET, RETURN_URL)
+    api.access_token(request_token, request_token_secret, verifier)
+
+    results = [api.get_profile(member_id = member_id) for member_id in ids]
+    api.run() # returns when every request has finished
+    profiles = [result.result() for result in results]
+"""
+import asyncore, select, socket, ssl, sys, time
+
+from linkedin import LinkedIn, LinkedinError, OAuthError, HTTPError, RateLimitError
+import parser
+
+HTTPS_PORT = 443
+
+class AsyncResult(object):
+    """
+    The eventual outcome of a request started by AsyncLinkedIn.
+    """
+    def __init__(self):
+        self._done = False
+        self._value = None
+        self._error = None
+        self._callbacks = []
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        """
+        Returns the parsed response, or raises the error the request failed with.
+        """
+        if not self._done:
+            raise LinkedinError("The request is still in flight. Please run the client loop first.")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def add_callback(self, callback):
+        """
+        callback(async_result) is called when the request finishes,
+        right away if it has already finished.
+        """
+        if self._done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(self, value = None, error = None):
+        self._done = True
+        self._value = value
+        self._error = error
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+def parse_http_response(raw):
+    """
+    Splits a raw HTTP/1.1 response into its status code and body,
+    decoding a chunked body if needed.
+    """
+    head, separator, body = raw.partition("\r\n\r\n")
+    if not separator:
+        raise LinkedinError("Incomplete HTTP response received.")
+    lines = head.split("\r\n")
+    try:
+        status = int(lines[0].split(" ", 2)[1])
+    except (IndexError, ValueError):
+        raise LinkedinError("Invalid HTTP status line: %r" % lines[0])
+
+    headers = {}
+    for line in lines[1:]:
+        name, separator, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        position = 0
+        while True:
+            line_end = body.index("\r\n", position)
+            size = int(body[position:line_end].split(";")[0], 16)
+            if size == 0:
+                break
+            chunks.append(body[line_end + 2:line_end + 2 + size])
+            position = line_end + 2 + size + 2
+        body = "".join(chunks)
+    return status, body
+
+
+class HTTPSRequest(asyncore.dispatcher):
+    """
+    A single HTTPS request/response exchange driven by the asyncore loop.
+    on_done(status, response, error) is called exactly once.
+    """
+    def __init__(self, host, request, on_done, socket_map, timeout):
+        asyncore.dispatcher.__init__(self, map = socket_map)
+        self.host = host
+        self.deadline = time.time() + timeout
+        self._out = request
+        self._in = []
+        self._on_done = on_done
+        self._handshaking = True
+        self._want_write = True
+        self._finished = False
+
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.connect((host, HTTPS_PORT))
+
+    def readable(self):
+        return not self._handshaking or not self._want_write
+
+    def writable(self):
+        if not self.connected or self._handshaking:
+            return self._want_write
+        return bool(self._out)
+
+    def handle_connect(self):
+        self.socket = wrap_socket(self.socket, self.host)
+        self._handshake()
+
+    def handle_read(self):
+        if self._handshaking:
+            self._handshake()
+            return
+        # Drain everything available, the SSL layer may hold decrypted data
+        # the socket no longer signals as readable.
+        while True:
+            try:
+                data = self.socket.recv(8192)
+            except ssl.SSLError, error:
+                if error.args[0] == ssl.SSL_ERROR_WANT_READ:
+                    return
+                if error.args[0] in (ssl.SSL_ERROR_ZERO_RETURN, ssl.SSL_ERROR_EOF) or \
+                   (self._in and "EOF" in str(error).upper()):
+                    # Servers often drop the connection without a close_notify.
+                    data = ""
+                else:
+                    raise
+            if not data:
+                self._complete()
+                return
+            self._in.append(data)
+
+    def handle_write(self):
+        if self._handshaking:
+            self._handshake()
+            return
+        try:
+            sent = self.socket.send(self._out)
+        except ssl.SSLError, error:
+            if error.args[0] == ssl.SSL_ERROR_WANT_WRITE:
+                return
+            raise
+        self._out = self._out[sent:]
+
+    def handle_close(self):
+        self._complete()
+
+    def handle_error(self):
+        self.fail(sys.exc_info()[1])
+
+    def fail(self, error):
+        if not self._finished:
+            self._finished = True
+            self.close()
+            self._on_done(None, None, error)
+
+    def _handshake(self):
+        try:
+            self.socket.do_handshake()
+        except ssl.SSLError, error:
+            if error.args[0] == ssl.SSL_ERROR_WANT_READ:
+                self._want_write = False
+                return
+            if error.args[0] == ssl.SSL_ERROR_WANT_WRITE:
+                self._want_write = True
+                return
+            raise
+        self._handshaking = False
+
+    def _complete(self):
+        if self._finished:
+            return
+        self._finished = True
+        self.close()
+        try:
+            status, response = parse_http_response("".join(self._in))
+        except Exception, error:
+            self._on_done(None, None, error)
+            return
+        self._on_done(status, response, None)
+
+
+def wrap_socket(sock, host):
+    if hasattr(ssl, "create_default_context"):
+        context = ssl.create_default_context()
+        return context.wrap_socket(sock, server_hostname = host, do_handshake_on_connect = False)
+    return ssl.wrap_socket(sock, do_handshake_on_connect = False)
+
+
+class AsyncLinkedIn(LinkedIn):
+    """
+    LinkedIn client whose API methods return AsyncResult instances.
+    The OAuth handshake (request_token, access_token) stays blocking.
+    """
+    request_class = HTTPSRequest
+
+    def __init__(self, api_key, api_secret, callback_url, timeout = 30.0):
+        LinkedIn.__init__(self, api_key, api_secret, callback_url)
+        self.timeout = timeout
+        self._socket_map = {}
+
+    def get_profile(self, member_id = None, url = None, fields=()):
+        return self.get_profile_raw(self._profile_raw_url(member_id, url, fields))
+
+    def get_profile_raw(self, raw_url, params=None):
+        self._check_tokens()
+        return self._do_async_query("/v1/people/" + raw_url, params=params, parse=self._parse_profile)
+
+    def get_updates(self, types = None):
+        if (not self._access_token) or (not self._access_token_secret):
+            self.error = "You do not have an access token. Plase perform 'accessToken()' method first."
+            raise OAuthError(self.error)
+        return self._do_async_query("/v1/people/~/network/updates", params=self._updates_params(types),
+                                    parse=lambda response: self._parse_updates(response, types))
+
+    def get_connections(self, member_id = None, public_url = None, fields=(), columnar = False):
+        self._check_tokens()
+        return self._do_async_query(self._connections_url(member_id, public_url, fields),
+                                    parse=lambda response: self._parse_people(response, columnar))
+
+    def get_search(self, parameters, fields=[], columnar = False):
+        self._check_tokens()
+        return self._do_async_query(self._search_url(fields), params=parameters,
+                                    parse=lambda response: self._parse_search(response, columnar))
+
+    def send_message(self, subject, message, ids = None, send_yourself = False):
+        if not ids: ids = []
+        self._check_tokens()
+        body = self._message_body(subject, message, ids, send_yourself)
+        return self._do_async_query("/v1/people/~/mailbox", body=body, method="POST")
+
+    def send_invitation(self, subject, message, first_name, last_name, email):
+        self._check_tokens()
+        body = self._invitation_body(subject, message, first_name, last_name, email)
+        return self._do_async_query("/v1/people/~/mailbox", body=body, method="POST")
+
+    def set_status(self, status_message):
+        self._check_tokens()
+        return self._do_async_query("/v1/people/~/current-status", body=self._status_body(status_message),
+                                    method="PUT")
+
+    def clear_status(self):
+        self._check_tokens()
+        return self._do_async_query("/v1/people/~/current-status", method="DELETE")
+
+    def share_update(self, comment=None, title=None, submitted_url=None,
+                    submitted_image_url=None, description=None,
+                    visibility="connections-only"):
+        self._check_tokens()
+        body = self._share_body(comment, title, submitted_url, submitted_image_url,
+                                description, visibility)
+        return self._do_async_query("/v1/people/~/shares", body=body, method="POST")
+
+    def pending(self):
+        """
+        Number of requests in flight.
+        """
+        return len(self._socket_map)
+
+    def run(self, timeout = None):
+        """
+        Drives the requests in flight until all of them finished, or until
+        'timeout' seconds passed. Requests older than the client timeout fail
+        with socket.timeout.
+        """
+        deadline = timeout is not None and time.time() + timeout
+        use_poll = hasattr(select, "poll")
+        while self._socket_map:
+            asyncore.loop(timeout = 0.5, use_poll = use_poll, map = self._socket_map, count = 1)
+            now = time.time()
+            for request in self._socket_map.values():
+                if request.deadline < now:
+                    request.fail(socket.timeout("The request to %s timed out." % request.host))
+            if deadline and now > deadline:
+                break
+
+    #################################################
+    # HELPER FUNCTIONS                              #
+    # You do not explicitly use those methods below #
+    #################################################
+
+    def _do_async_query(self, relative_url, body=None, method="GET", params=None, parse=None):
+        result = AsyncResult()
+        try:
+            # Waiting for the rate limiter would stall every request of the loop.
+            relative_url, query_dict = self._signed_query(relative_url, method, params, block=False)
+        except RateLimitError, error:
+            result._finish(None, error)
+            return result
+
+        def on_done(status, response, error):
+            value = None
+            if error is None:
+                try:
+                    if not 200 <= status < 300:
+                        raise HTTPError(status, response)
+                    response = parser.Response(response)
+                    self._check_response(response)
+                    if parse is not None:
+                        value = parse(response)
+                except Exception, parse_error:
+                    error = parse_error
+            result._finish(value, error)
+
+        request = self._http_request(method, relative_url, query_dict, body)
+        try:
+            self.request_class(self.API_ENDPOINT, request, on_done, self._socket_map, self.timeout)
+        except socket.error, error:
+            result._finish(None, error)
+        return result
+
+    def _http_request(self, method, relative_url, query_dict, body = None):
+        lines = ["%s %s HTTP/1.1" % (method, relative_url),
+                 "Host: %s" % self.API_ENDPOINT,
+                 "Authorization: %s" % self._create_oauth_header(query_dict),
+                 "Connection: close"]
+        if body is not None:
+            body = self._utf8(body)
+            lines.append("Content-Length: %d" % len(body))
+        elif method in ("POST", "PUT"):
+            lines.append("Content-Length: 0")
+        return "\r\n".join(lines) + "\r\n\r\n" + (body or "")
+
+    ########################
+    # END HELPER FUNCTIONS #
+    ########################
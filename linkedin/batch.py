@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar batches of profiles, for analytics over large connection sets.
+
+A ProfileBatch keeps one column per field instead of one object per profile:
+the text fields in lists, the integer fields in arrays. The positions and the
+educations of all the profiles are kept in two nested tables, the rows of
+profile i being offsets[i]:offsets[i + 1] of them.
+
+    batch = api.get_connections(columnar = True)
+    batch.industry                      # one value per profile
+    batch.num_connections               # array('l'), MISSING when unknown
+    batch.positions.company_name        # one value per position, all profiles
+    batch.position_offsets              # array('l') of len(batch) + 1 items
+    batch.to_numpy()["num_connections"] # numpy view of the array, no copy
+    batch[3]                            # Profile of row 3, built on demand
+"""
+import datetime
+from array import array
+
+from model import Profile, Location, Position, Company, Education, get_child, str_to_bool, PROFILE_DECODERS_BY_NAME
+
+# Value of a missing field in the integer columns.
+MISSING = -1
+
+def _element(node, tag_name):
+    if node is None:
+        return None
+    elements = node.getElementsByTagName(tag_name)
+    return elements and elements[0] or None
+
+def _int(value):
+    if value is None:
+        return MISSING
+    try:
+        return int(value)
+    except ValueError:
+        return MISSING
+
+def _text(tag_name):
+    return lambda node: get_child(node, tag_name)
+
+def _path(*tag_names):
+    def decode(node):
+        for tag_name in tag_names[:-1]:
+            node = _element(node, tag_name)
+        return get_child(node, tag_names[-1])
+    return decode
+
+def _number(*tag_names):
+    decode = _path(*tag_names)
+    return lambda node: _int(decode(node))
+
+def _flag(tag_name):
+    def decode(node):
+        value = str_to_bool(get_child(node, tag_name))
+        if value is None:
+            return MISSING
+        return int(value)
+    return decode
+
+def _num_connections(person):
+    return _int(PROFILE_DECODERS_BY_NAME["num_connections"](person))
+
+# Text columns of the profiles copied as they are from and to the Profile attributes.
+PROFILE_TEXT_FIELDS = ("id", "first_name", "last_name", "headline", "industry", "distance", "summary",
+                       "current_status", "picture_url", "public_url", "private_url")
+
+# (column, integer column?, decoder) of the tables, the decoders take the element of a row.
+# The profile fields are decoded by the very decoders of the Profile attributes.
+PROFILE_COLUMNS = [(name, False, PROFILE_DECODERS_BY_NAME[name]) for name in PROFILE_TEXT_FIELDS] + [
+    ("location_name", False, _path("location", "name")),
+    ("location_country_code", False, _path("location", "country", "code")),
+    ("num_connections", True, _num_connections),
+]
+
+POSITION_COLUMNS = [
+    ("id", False, _text("id")),
+    ("title", False, _text("title")),
+    ("summary", False, _text("summary")),
+    ("company_id", False, _path("company", "id")),
+    ("company_name", False, _path("company", "name")),
+    ("company_industry", False, _path("company", "industry")),
+    ("is_current", True, _flag("is-current")),
+    ("start_year", True, _number("start-date", "year")),
+    ("start_month", True, _number("start-date", "month")),
+    ("end_year", True, _number("end-date", "year")),
+    ("end_month", True, _number("end-date", "month")),
+]
+
+EDUCATION_COLUMNS = [
+    ("id", False, _text("id")),
+    ("school_name", False, _text("school-name")),
+    ("degree", False, _text("degree")),
+    ("field_of_study", False, _text("field-of-study")),
+    ("start_year", True, _number("start-date", "year")),
+    ("start_month", True, _number("start-date", "month")),
+    ("end_year", True, _number("end-date", "year")),
+    ("end_month", True, _number("end-date", "month")),
+]
+
+
+class ColumnTable(object):
+    """
+    Columns of equal length, read as attributes: the text columns are lists,
+    the integer ones array('l').
+    """
+    def __init__(self, specs):
+        self._specs = specs
+        self.columns = {}
+        self.names = []
+        for name, integer, decode in specs:
+            if integer:
+                self.columns[name] = array("l")
+            else:
+                self.columns[name] = []
+            self.names.append(name)
+
+    def append(self, node):
+        """
+        Decodes the element of a row in every column.
+        """
+        columns = self.columns
+        for name, integer, decode in self._specs:
+            columns[name].append(decode(node))
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.columns[self.names[0]])
+
+    def to_numpy(self):
+        """
+        @Returns: a dict of numpy arrays. The integer columns are views of the
+        arrays, without copy; the text columns are object arrays.
+        """
+        import numpy
+        result = {}
+        for name in self.names:
+            column = self.columns[name]
+            if isinstance(column, array):
+                result[name] = numpy.frombuffer(column, dtype = numpy.dtype(column.typecode))
+            else:
+                result[name] = numpy.array(column, dtype = object)
+        return result
+
+
+class ProfileBatch(ColumnTable):
+    """
+    The profiles of a response as columns (see PROFILE_COLUMNS), with their
+    positions and educations as nested ColumnTables indexed by the offsets
+    arrays. batch[i] builds the Profile of row i.
+    """
+    def __init__(self):
+        ColumnTable.__init__(self, PROFILE_COLUMNS)
+        self.positions = ColumnTable(POSITION_COLUMNS)
+        self.educations = ColumnTable(EDUCATION_COLUMNS)
+        self.position_offsets = array("l", [0])
+        self.education_offsets = array("l", [0])
+
+    @classmethod
+    def create(cls, persons):
+        """
+        Builds the batch of a sequence of <person> elements.
+        """
+        batch = cls()
+        for person in persons:
+            batch.append(person)
+        return batch
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        """
+        Builds the batch of Profile instances, such as the ones get_connections returns.
+        """
+        batch = cls()
+        for profile in profiles:
+            batch.append_profile(profile)
+        return batch
+
+    def append(self, person):
+        ColumnTable.append(self, person)
+        for table, offsets, list_tag, item_tag in ((self.positions, self.position_offsets, "positions", "position"),
+                                                   (self.educations, self.education_offsets, "educations", "education")):
+            parent = _element(person, list_tag)
+            if parent is not None:
+                for node in parent.getElementsByTagName(item_tag):
+                    table.append(node)
+            offsets.append(len(table))
+
+    def append_profile(self, profile):
+        """
+        Adds a row with the fields of a Profile.
+        """
+        columns = self.columns
+        for name in PROFILE_TEXT_FIELDS:
+            columns[name].append(getattr(profile, name))
+        location = profile.location or Location()
+        columns["location_name"].append(location.name)
+        columns["location_country_code"].append(location.country_code)
+        columns["num_connections"].append(_int(profile.num_connections))
+
+        columns = self.positions.columns
+        for position in profile.positions or ():
+            company = position.company or Company()
+            for name, value in (("id", position.id), ("title", position.title), ("summary", position.summary),
+                                ("company_id", company.id), ("company_name", company.name),
+                                ("company_industry", company.industry)):
+                columns[name].append(value)
+            if position.is_current is None:
+                columns["is_current"].append(MISSING)
+            else:
+                columns["is_current"].append(int(position.is_current))
+            _append_date(columns, "start", position.start_date)
+            _append_date(columns, "end", position.end_date)
+        self.position_offsets.append(len(self.positions))
+
+        columns = self.educations.columns
+        for education in profile.educations or ():
+            for name in ("id", "school_name", "degree", "field_of_study"):
+                columns[name].append(getattr(education, name))
+            _append_date(columns, "start", education.start_date)
+            _append_date(columns, "end", education.end_date)
+        self.education_offsets.append(len(self.educations))
+
+    def to_numpy(self):
+        """
+        @Returns: a dict of numpy arrays with the profile columns, the offsets
+        arrays, and the nested columns under "positions.<name>" and
+        "educations.<name>". The integer columns are not copied.
+        """
+        import numpy
+        result = ColumnTable.to_numpy(self)
+        for name in ("position_offsets", "education_offsets"):
+            result[name] = numpy.frombuffer(getattr(self, name), dtype = numpy.dtype("l"))
+        for prefix, table in (("positions", self.positions), ("educations", self.educations)):
+            for name, column in table.to_numpy().items():
+                result["%s.%s" % (prefix, name)] = column
+        return result
+
+    def row(self, index):
+        """
+        @Returns: the Profile of row 'index', built from the columns
+        """
+        columns = self.columns
+        profile = Profile()
+        for name in PROFILE_TEXT_FIELDS:
+            setattr(profile, name, columns[name][index])
+        num_connections = columns["num_connections"][index]
+        if num_connections != MISSING:
+            profile.num_connections = num_connections
+        if columns["location_name"][index] is not None or columns["location_country_code"][index] is not None:
+            profile.location = Location()
+            profile.location.name = columns["location_name"][index]
+            profile.location.country_code = columns["location_country_code"][index]
+        profile.positions = [self._position(i) for i in
+                             xrange(self.position_offsets[index], self.position_offsets[index + 1])]
+        profile.educations = [self._education(i) for i in
+                              xrange(self.education_offsets[index], self.education_offsets[index + 1])]
+        return profile
+
+    def _position(self, index):
+        columns = self.positions.columns
+        position = Position()
+        position.id = columns["id"][index]
+        position.title = columns["title"][index]
+        position.summary = columns["summary"][index]
+        if columns["is_current"][index] != MISSING:
+            position.is_current = bool(columns["is_current"][index])
+        if columns["company_name"][index] is not None or columns["company_id"][index] is not None:
+            position.company = Company()
+            position.company.id = columns["company_id"][index]
+            position.company.name = columns["company_name"][index]
+            position.company.industry = columns["company_industry"][index]
+        position.start_date = _date(columns, "start", index)
+        position.end_date = _date(columns, "end", index)
+        return position
+
+    def _education(self, index):
+        columns = self.educations.columns
+        education = Education()
+        for name in ("id", "school_name", "degree", "field_of_study"):
+            setattr(education, name, columns[name][index])
+        education.start_date = _date(columns, "start", index)
+        education.end_date = _date(columns, "end", index)
+        return education
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.row(index)
+
+    def __iter__(self):
+        for index in xrange(len(self)):
+            yield self.row(index)
+
+    def __repr__(self):
+        return "ProfileBatch(%d profiles, %d positions, %d educations)" % (len(self), len(self.positions),
+                                                                           len(self.educations))
+
+def _date(columns, prefix, index):
+    """
+    The date of a row like model.parse_date builds it, January when the month is missing.
+    """
+    year = columns[prefix + "_year"][index]
+    if year == MISSING:
+        return None
+    month = columns[prefix + "_month"][index]
+    return datetime.date(year, month != MISSING and month or 1, 1)
+
+def _append_date(columns, prefix, date):
+    if date is None:
+        columns[prefix + "_year"].append(MISSING)
+        columns[prefix + "_month"].append(MISSING)
+    else:
+        columns[prefix + "_year"].append(date.year)
+        columns[prefix + "_month"].append(date.month)
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in caches of the GET responses of the read endpoints
+(get_profile_raw, get_connections, get_search).
+
+A hit skips the signed round trip to the API. The caches hold the raw response
+bodies, so every hit is parsed into fresh model objects.
+
+    from linkedin.cache import ResponseCache, DiskCache, TieredCache
+    api.cache = ResponseCache(max_entries = 5000, max_bytes = 64 * 1024 * 1024,
+                              ttls = {"profile" : 600, "connections" : 1800})
+    ...
+    api.cache.stats() # {'hits': 12, 'misses': 3, 'evictions': 0, 'expirations': 1, ...}
+
+    # memory first, then a sqlite file shared by the workers of the host
+    api.cache = TieredCache(ResponseCache(), DiskCache("/var/cache/linkedin.db"))
+"""
+import hashlib, os, sqlite3, threading, time
+from collections import OrderedDict
+
+# Seconds a response stays fresh, per endpoint.
+DEFAULT_TTLS = {"profile" : 300,
+                "connections" : 600,
+                "search" : 60}
+DEFAULT_TTL = 60 # endpoints missing from the ttls
+
+INCREMENTAL = 2 # PRAGMA auto_vacuum value
+
+def request_key(access_token, relative_url, params = None):
+    """
+    The key of a request, equal for the requests getting the same response.
+    The relative url carries the field selector. A list or tuple value is a
+    repeated parameter, sent sorted by _urlencode.
+    """
+    if params:
+        params = tuple(sorted([(name, tuple(sorted(value)) if isinstance(value, (list, tuple)) else value)
+                               for name, value in params.items()]))
+    return (access_token, relative_url, params or ())
+
+
+class LocalConnections(object):
+    """
+    sqlite connections to a file, which can not cross threads nor forks: each
+    thread of each process opens its own, runs the 'pragmas' on it, and keeps
+    it. The 'options' are passed to sqlite3.connect.
+    """
+    def __init__(self, path, pragmas = (), **options):
+        self.path = path
+        self.pragmas = pragmas
+        self.options = options
+        self._local = threading.local()
+
+    def get(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, **self.options)
+            for pragma in self.pragmas:
+                connection.execute(pragma)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+
+class ResponseCache(object):
+    """
+    A thread-safe LRU cache of response bodies, bounded by number of entries and
+    by total size of the bodies in bytes. Entries expire after the ttl of their
+    endpoint. The least recently used entries are evicted first.
+    """
+    def __init__(self, max_entries = 1000, max_bytes = 16 * 1024 * 1024, ttls = None,
+                 default_ttl = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+
+        self._entries = OrderedDict() # key -> (data, endpoint, fetched, expires), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    key = staticmethod(request_key)
+
+    def get(self, key):
+        """
+        @Returns: the cached response body, None on a miss
+        """
+        entry = self.get_entry(key)
+        return entry and entry[0]
+
+    def get_entry(self, key):
+        """
+        @Returns: (body, endpoint, fetch time) of a fresh entry, None on a miss
+        """
+        self._lock.acquire()
+        try:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            data, endpoint, fetched, expires = entry
+            if expires <= time.time():
+                self._bytes -= len(data)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries[key] = entry # most recently used now
+            self.hits += 1
+            return data, endpoint, fetched
+        finally:
+            self._lock.release()
+
+    def set(self, key, data, endpoint = None, fetched = None):
+        """
+        Stores a response body of the given endpoint ("profile", "connections", "search")
+        fetched at the given time, now by default. Bodies larger than max_bytes are not stored.
+        """
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        if ttl <= 0 or len(data) > self.max_bytes:
+            return
+        if fetched is None:
+            fetched = time.time()
+        self._lock.acquire()
+        try:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (data, endpoint, fetched, fetched + ttl)
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, old_entry = self._entries.popitem(last = False)
+                self._bytes -= len(old_entry[0])
+                self.evictions += 1
+        finally:
+            self._lock.release()
+
+    def invalidate(self, access_token = None):
+        """
+        Drops every entry, or the entries of one access token.
+        """
+        self._lock.acquire()
+        try:
+            for key in self._entries.keys():
+                if access_token is None or key[0] == access_token:
+                    self._bytes -= len(self._entries.pop(key)[0])
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        self._lock.acquire()
+        try:
+            return {"hits" : self.hits, "misses" : self.misses, "evictions" : self.evictions,
+                    "expirations" : self.expirations, "entries" : len(self._entries), "bytes" : self._bytes}
+        finally:
+            self._lock.release()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache(object):
+    """
+    A response cache in a sqlite file, which survives restarts and can be shared
+    by several processes of the host. Each row holds the raw body and its fetch
+    time; freshness is checked against the current ttls on read. When the file
+    holds more than max_bytes of bodies, the expired rows then the oldest ones
+    are deleted and the freed pages returned to the filesystem.
+
+    The keys are stored hashed, access tokens never reach the disk.
+    """
+    # Writes between two checks of the total size.
+    COMPACT_EVERY = 50
+
+    def __init__(self, path, max_bytes = 256 * 1024 * 1024, ttls = None,
+                 default_ttl = DEFAULT_TTL, timeout = 30.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.timeout = timeout # seconds to wait for the lock of another process
+
+        # Before anything writes a new file, auto_vacuum can not be set afterwards.
+        # In WAL mode readers do not block the writer.
+        self._connections = LocalConnections(path, ("PRAGMA auto_vacuum = INCREMENTAL",
+                                                    "PRAGMA journal_mode = WAL"), timeout = timeout)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        connection = self._connection()
+        connection.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                  key TEXT PRIMARY KEY,
+                                  endpoint TEXT,
+                                  fetched REAL,
+                                  size INTEGER,
+                                  data BLOB)""")
+        connection.execute("CREATE INDEX IF NOT EXISTS responses_fetched ON responses (fetched)")
+        connection.commit()
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != INCREMENTAL:
+            # A file made without incremental auto_vacuum only takes it through a full VACUUM.
+            connection.execute("VACUUM")
+
+    key = staticmethod(ResponseCache.key)
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry and entry[0]
+
+    def get_entry(self, key):
+        row = self._connection().execute("SELECT endpoint, fetched, data FROM responses WHERE key = ?",
+                                         (self._digest(key),)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        endpoint, fetched, data = row
+        if fetched + self.ttls.get(endpoint, self.default_ttl) <= time.time():
+            self._count("misses", "expirations")
+            return None
+        self._count("hits")
+        return str(data), endpoint, fetched
+
+    def set(self, key, data, endpoint = None, fetched = None):
+        if self.ttls.get(endpoint, self.default_ttl) <= 0 or len(data) > self.max_bytes:
+            return
+        if fetched is None:
+            fetched = time.time()
+        connection = self._connection()
+        connection.execute("INSERT OR REPLACE INTO responses (key, endpoint, fetched, size, data) "
+                           "VALUES (?, ?, ?, ?, ?)",
+                           (self._digest(key), endpoint, fetched, len(data), sqlite3.Binary(data)))
+        connection.commit()
+
+        self._lock.acquire()
+        try:
+            self._writes += 1
+            compact = self._writes % self.COMPACT_EVERY == 0
+        finally:
+            self._lock.release()
+        if compact:
+            self.compact()
+
+    def compact(self):
+        """
+        Deletes the expired rows, then the oldest ones while the bodies take more
+        than max_bytes, and shrinks the file.
+        """
+        connection = self._connection()
+        now = time.time()
+        deleted = 0
+        for endpoint, in connection.execute("SELECT DISTINCT endpoint FROM responses").fetchall():
+            ttl = self.ttls.get(endpoint, self.default_ttl)
+            if endpoint is None:
+                cursor = connection.execute("DELETE FROM responses WHERE endpoint IS NULL AND fetched <= ?",
+                                            (now - ttl,))
+            else:
+                cursor = connection.execute("DELETE FROM responses WHERE endpoint = ? AND fetched <= ?",
+                                            (endpoint, now - ttl))
+            deleted += cursor.rowcount
+        self._count(*["expirations"] * deleted)
+
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            oldest = []
+            for key, size in connection.execute("SELECT key, size FROM responses ORDER BY fetched"):
+                if excess <= 0:
+                    break
+                oldest.append((key,))
+                excess -= size
+            connection.executemany("DELETE FROM responses WHERE key = ?", oldest)
+            self._count(*["evictions"] * len(oldest))
+        connection.commit()
+        self._vacuum(connection)
+
+    def invalidate(self, access_token = None):
+        """
+        Drops every entry. Keys are hashed, so dropping the entries of a single
+        access token is not supported.
+        """
+        if access_token is not None:
+            raise ValueError("DiskCache can only be invalidated as a whole.")
+        connection = self._connection()
+        connection.execute("DELETE FROM responses")
+        connection.commit()
+        self._vacuum(connection)
+
+    def stats(self):
+        row = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits" : self.hits, "misses" : self.misses, "evictions" : self.evictions,
+                "expirations" : self.expirations, "entries" : row[0], "bytes" : row[1]}
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _connection(self):
+        return self._connections.get()
+
+    def _vacuum(self, connection):
+        """
+        Returns the free pages to the filesystem. They leave the file once the
+        write-ahead log is checkpointed.
+        """
+        connection.execute("PRAGMA incremental_vacuum").fetchall()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+    def _digest(self, key):
+        return hashlib.sha1(repr(key)).hexdigest()
+
+    def _count(self, *counters):
+        self._lock.acquire()
+        try:
+            for counter in counters:
+                setattr(self, counter, getattr(self, counter) + 1)
+        finally:
+            self._lock.release()
+
+
+class TieredCache(object):
+    """
+    Chains caches, fastest first. A hit in a slower tier is copied in the
+    faster ones with its original fetch time, a new response is stored in
+    all of them.
+    """
+    def __init__(self, *caches):
+        self.caches = caches
+
+    key = staticmethod(ResponseCache.key)
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry and entry[0]
+
+    def get_entry(self, key):
+        for position, cache in enumerate(self.caches):
+            entry = cache.get_entry(key)
+            if entry is not None:
+                for faster in self.caches[:position]:
+                    faster.set(key, *entry)
+                return entry
+        return None
+
+    def set(self, key, data, endpoint = None, fetched = None):
+        for cache in self.caches:
+            cache.set(key, data, endpoint, fetched)
+
+    def invalidate(self, access_token = None):
+        for cache in self.caches:
+            cache.invalidate(access_token)
+
+    def stats(self):
+        return [cache.stats() for cache in self.caches]
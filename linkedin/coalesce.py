@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Single-flight coalescing of the identical GET calls made at the same time.
+
+When several threads ask for the same url with the same access token and
+parameters while a call for it is in flight, they wait for that call and
+share its parsed response instead of sending their own. Together with a
+response cache, an expired entry is then fetched once however many threads
+miss it at the same time.
+
+    from linkedin.coalesce import SingleFlight
+    api.single_flight = SingleFlight()
+    ...
+    api.single_flight.stats() # {'calls': 120, 'shared': 1380, 'in_flight': 2}
+
+The shared response is only read by the parsers, each caller still gets its
+own model objects.
+"""
+import sys, threading
+
+# The calls with the same key, the one of the response cache, get the same response.
+from cache import request_key
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None # exc_info of a failed call
+
+
+class SingleFlight(object):
+    """
+    The calls in flight by key, safe to share between threads and between the
+    sessions of a client.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0  # made by a leader
+        self.shared = 0 # answered by the call of another thread
+
+    def do(self, key, function, *args):
+        """
+        Calls function(*args), unless a call of the same key is in flight: then
+        waits for it and returns its result, or raises its error.
+        """
+        self._lock.acquire()
+        try:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        finally:
+            self._lock.release()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error[0], call.error[1], call.error[2]
+            return call.result
+
+        try:
+            call.result = function(*args)
+        except:
+            call.error = sys.exc_info()
+            raise
+        finally:
+            # Forget the call before waking the followers, the later calls start a new one.
+            self._lock.acquire()
+            try:
+                del self._calls[key]
+            finally:
+                self._lock.release()
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        self._lock.acquire()
+        try:
+            return {"calls" : self.calls, "shared" : self.shared, "in_flight" : len(self._calls)}
+        finally:
+            self._lock.release()
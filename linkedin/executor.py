@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Runs independent LinkedIn API calls concurrently on a pool of worker threads.
+
+    executor = LinkedInExecutor(api, workers = 8)
+    calls = [Call.profile(member_id = member_id) for member_id in ids]
+    calls.append(Call.connections())
+    calls.append(Call.search({"keywords" : "python"}))
+
+    results = executor.map(calls)          # in submission order
+    for done in executor.as_completed(calls): # as they finish
+        print done.call, done.result()
+
+    executor.shutdown()
+
+All the workers share the LinkedIn instance, which reads its tokens under a
+lock, and the process wide connection pool of linkedin.pool.
+"""
+import threading, sys
+from Queue import Queue
+
+class Call(object):
+    """
+    Description of one API call: the name of a LinkedIn method and its arguments.
+    """
+    def __init__(self, method, *args, **kwargs):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    @classmethod
+    def profile(cls, member_id = None, url = None, fields = ()):
+        return cls("get_profile", member_id = member_id, url = url, fields = fields)
+
+    @classmethod
+    def profiles(cls, member_ids, fields = ()):
+        return cls("get_profiles", member_ids, fields = fields)
+
+    @classmethod
+    def connections(cls, member_id = None, public_url = None, fields = ()):
+        return cls("get_connections", member_id = member_id, public_url = public_url, fields = fields)
+
+    @classmethod
+    def search(cls, parameters):
+        return cls("get_search", parameters)
+
+    @classmethod
+    def updates(cls, types = None):
+        if types is None:
+            return cls("get_updates")
+        return cls("get_updates", types = types)
+
+    def execute(self, api):
+        return getattr(api, self.method)(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        arguments = [repr(arg) for arg in self.args]
+        arguments.extend(["%s=%r" % item for item in sorted(self.kwargs.items())])
+        return "%s(%s)" % (self.method, ", ".join(arguments))
+
+
+class CallResult(object):
+    """
+    Outcome of a call run by the executor.
+    """
+    def __init__(self, call, index):
+        self.call = call
+        self.index = index # position of the call in the submitted list
+        self.value = None
+        self.error = None
+        self._exc_info = None
+
+    def result(self):
+        """
+        Returns the value of the call, or raises the error it failed with.
+        """
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self.value
+
+
+class LinkedInExecutor(object):
+    """
+    A fixed pool of worker threads running Call descriptions against one LinkedIn instance.
+    The threads are started on first use and stay alive until shutdown().
+    """
+    def __init__(self, api, workers = 4):
+        self.api = api
+        self.workers = workers
+        self._tasks = Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, calls):
+        """
+        Queues the calls.
+        @Returns: a Queue the CallResult instances are put in as the calls finish
+        """
+        self._start()
+        done = Queue()
+        for index, call in enumerate(calls):
+            self._tasks.put((CallResult(call, index), done))
+        return done
+
+    def as_completed(self, calls):
+        """
+        Runs the calls and yields their CallResult instances in completion order.
+        """
+        calls = list(calls)
+        done = self.submit(calls)
+        for i in range(len(calls)):
+            yield done.get()
+
+    def map(self, calls):
+        """
+        Runs the calls and returns their values in submission order.
+        The error of the first failed call, in submission order, is raised.
+        """
+        results = sorted(self.as_completed(calls), key = lambda done: done.index)
+        return [done.result() for done in results]
+
+    def shutdown(self):
+        """
+        Stops the workers once the queued calls are finished.
+        """
+        self._lock.acquire()
+        try:
+            threads, self._threads = self._threads, []
+        finally:
+            self._lock.release()
+        for thread in threads:
+            self._tasks.put(None)
+        for thread in threads:
+            thread.join()
+
+    def _start(self):
+        self._lock.acquire()
+        try:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target = self._work, name = "linkedin-executor-%d" % len(self._threads))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        finally:
+            self._lock.release()
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            call_result, done = task
+            try:
+                call_result.value = call_result.call.execute(self.api)
+            except Exception:
+                call_result._exc_info = sys.exc_info()
+                call_result.error = call_result._exc_info[1]
+            done.put(call_result)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in sharing of the values that repeat across the profiles of a network.
+
+Over a large connection graph the same industries, location names, country
+codes, company names and skills come back in millions of profiles. With an
+InternPool the parsers replace every repeated string by one shared instance,
+and every repeated Location or Company by one shared object.
+
+    from linkedin.interning import InternPool
+    api.intern_pool = InternPool()
+    connections = api.get_connections()
+    ...
+    api.intern_pool.stats() # {'strings': 812, 'locations': 96, 'companies': 410, 'bytes_saved': 3145728, ...}
+
+The shared Location and Company instances must be treated as read-only:
+changing one changes it in every profile holding it. The pool keeps every
+distinct value it saw until clear() is called.
+"""
+import sys, threading
+
+from model import Profile, Company
+
+class InternPool(object):
+    """
+    Canonical instances of strings, Locations and Companies, safe to share
+    between threads.
+    """
+    def __init__(self):
+        self._strings = {}
+        self._locations = {}
+        self._companies = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def intern_profile(self, profile):
+        """
+        Replaces the repeated values of a Profile, and of the profiles nested
+        in it, by their shared instances.
+        @Returns: the profile
+        """
+        self._lock.acquire()
+        try:
+            self._profile(profile)
+        finally:
+            self._lock.release()
+        return profile
+
+    def intern_field(self, name, value):
+        """
+        @Returns: the value of the Profile field 'name' with its repeated values
+        shared, for the fields a LazyProfile decodes on access.
+        """
+        intern = PROFILE_FIELDS.get(name)
+        if intern is None:
+            return value
+        self._lock.acquire()
+        try:
+            return intern(self, value)
+        finally:
+            self._lock.release()
+
+    def string(self, value):
+        """
+        @Returns: the shared instance of a string.
+        """
+        self._lock.acquire()
+        try:
+            return self._string(value)
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._strings.clear()
+            self._locations.clear()
+            self._companies.clear()
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        self._lock.acquire()
+        try:
+            return {"strings" : len(self._strings), "locations" : len(self._locations),
+                    "companies" : len(self._companies), "hits" : self.hits, "misses" : self.misses,
+                    "bytes_saved" : self.bytes_saved}
+        finally:
+            self._lock.release()
+
+    # The helpers below run with the lock held.
+
+    def _string(self, value):
+        if value is None:
+            return None
+        shared = self._strings.setdefault(value, value)
+        if shared is value:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.bytes_saved += sys.getsizeof(value)
+        return shared
+
+    def _strings_list(self, values):
+        return [self._string(value) for value in values]
+
+    def _flyweight(self, instances, key, instance):
+        shared = instances.setdefault(key, instance)
+        if shared is instance:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.bytes_saved += sys.getsizeof(instance)
+        return shared
+
+    def _location(self, location):
+        if location is None:
+            return None
+        location.name = self._string(location.name)
+        location.country_code = self._string(location.country_code)
+        return self._flyweight(self._locations, (location.name, location.country_code), location)
+
+    def _company(self, company):
+        if company is None:
+            return None
+        for name in Company.__slots__:
+            setattr(company, name, self._string(getattr(company, name)))
+        key = tuple([getattr(company, name) for name in Company.__slots__])
+        return self._flyweight(self._companies, key, company)
+
+    def _positions(self, positions):
+        for position in positions or ():
+            position.title = self._string(position.title)
+            position.company = self._company(position.company)
+        return positions
+
+    def _educations(self, educations):
+        for education in educations or ():
+            education.school_name = self._string(education.school_name)
+            education.degree = self._string(education.degree)
+            education.field_of_study = self._string(education.field_of_study)
+        return educations
+
+    def _profiles(self, profiles):
+        for profile in profiles or ():
+            self._profile(profile)
+        return profiles
+
+    def _relation_to_viewer(self, relation):
+        if relation is not None:
+            relation.connections = self._profiles(relation.connections)
+        return relation
+
+    def _profile(self, profile):
+        for name, intern in PROFILE_FIELDS.iteritems():
+            # Read through the slot, which does not make a LazyProfile decode the
+            # field; the fields it decodes later are interned then.
+            try:
+                value = getattr(Profile, name).__get__(profile)
+            except AttributeError:
+                continue
+            if value is not None:
+                setattr(profile, name, intern(self, value))
+
+# Profile field -> how the pool shares its values.
+PROFILE_FIELDS = {"industry" : InternPool._string,
+                  "distance" : InternPool._string,
+                  "location" : InternPool._location,
+                  "positions" : InternPool._positions,
+                  "educations" : InternPool._educations,
+                  "skills" : InternPool._strings_list,
+                  "languages" : InternPool._strings_list,
+                  "connections" : InternPool._profiles,
+                  "relation_to_viewer" : InternPool._relation_to_viewer}
@@ -16,12 +16,12 @@ Provides a Pure Python LinkedIn API Interface.
 import hashlib
 sha = hashlib.sha1
 
-import urllib, time, random, httplib, hmac, binascii, cgi, string
+import urllib, time, httplib, cgi, threading
 from HTMLParser import HTMLParser
 from xml.dom import minidom
-from xml.etree.ElementTree import parse
 
 from model import Profile, Update
+import pool, parser, pagination, updates, batch, signer, throttle, retry, coalesce
 
 class Stripper(HTMLParser):
     """
@@ -77,6 +77,36 @@ class LinkedinError(Exception):
     def __str__(self):
         return repr(self._error)
 
+class HTTPError(LinkedinError):
+    """
+    A response with a status other than 2xx. The message is the one of the
+    error document of LinkedIn, "HTTP <status>" for any other body.
+    @status: the HTTP status
+    @data: the response body
+    """
+    def __init__(self, status, data):
+        LinkedinError.__init__(self, parser.Response(data).error or "HTTP %d" % status)
+        self.status = status
+        self.data = data
+
+class RateLimitError(LinkedinError):
+    """
+    A call held back by the rate limiter of the client before it was sent.
+    @retry_after: seconds after which the call would pass
+    """
+    def __init__(self, error, retry_after):
+        LinkedinError.__init__(self, error)
+        self.retry_after = retry_after
+
+class CircuitOpenError(LinkedinError):
+    """
+    A call failed fast while the circuit breaker of the retry policy is open.
+    @retry_after: seconds before the breaker lets a probe call through
+    """
+    def __init__(self, error, retry_after):
+        LinkedinError.__init__(self, error)
+        self.retry_after = retry_after
+
 class OAuthError(LinkedinError):
     """
     General OAuth exception, nothing special.
@@ -88,6 +118,21 @@ class OAuthError(LinkedinError):
         return repr(self.parameter)
 
 
+class BulkProfiles(dict):
+    """
+    Profiles fetched by LinkedIn.get_profiles, keyed by member id.
+    @failures: list of (member_ids, error) pairs, one per chunk whose request failed
+    @missing: ids of successful chunks that LinkedIn did not return a profile for
+    """
+    def __init__(self):
+        dict.__init__(self)
+        self.failures = []
+        self.missing  = []
+
+    def failed_ids(self):
+        return [member_id for member_ids, error in self.failures for member_id in member_ids]
+
+
 class LinkedIn(object):
     def __init__(self, api_key, api_secret, callback_url, gae = False):
         """
@@ -135,6 +180,40 @@ class LinkedIn(object):
 
         self._debug = False
 
+        # Guards the token fields so that they can be changed while other threads make calls.
+        self._token_lock = threading.RLock()
+
+        # Longest relative url get_profiles puts a chunk of member ids in.
+        self.MAX_URL_LENGTH = 2000
+
+        # signer.Signer per (consumer secret, token secret), dropped all together beyond MAX_SIGNERS.
+        self._signers = {}
+        self.MAX_SIGNERS = 1000
+
+        # Opt-in cache.ResponseCache of the read endpoints, None disables caching.
+        self.cache = None
+
+        # Build LazyProfile instances, which decode each field on first access.
+        self.lazy_profiles = False
+
+        # Opt-in interning.InternPool sharing the values repeated across the profiles.
+        self.intern_pool = None
+
+        # Opt-in throttle.RateLimiter, which holds the calls back before LinkedIn throttles them.
+        self.rate_limiter = None
+
+        # Opt-in retry.RetryPolicy of the calls that fail on a socket error or a 5xx.
+        self.retry_policy = None
+
+        # Opt-in coalesce.SingleFlight, which makes identical concurrent GETs share one call.
+        self.single_flight = None
+
+        # updates.HighWaterMark of the network updates feed per access token, for
+        # get_new_updates. Any dict-like object works, a shelve keeps them across runs.
+        self.update_marks = {}
+        # Guards update_marks. The sessions share it, and this lock, with their client.
+        self._marks_lock = threading.Lock()
+
     def request_token(self):
         """
         Performs the corresponding API which returns the request token in a query string
@@ -155,14 +234,18 @@ class LinkedIn(object):
 
         self._calc_signature(self._get_url(relative_url), query_dict, self._request_token_secret, method)
 
-        response = self._https_connection(method, relative_url, query_dict)
+        response = self._oauth_connection(method, relative_url, query_dict)
 
         oauth_problem = self._get_value_from_raw_qs("oauth_problem", response)
         if oauth_problem:
             raise OAuthError(oauth_problem)
 
-        self._request_token = self._get_value_from_raw_qs("oauth_token", response)
-        self._request_token_secret = self._get_value_from_raw_qs("oauth_token_secret", response)
+        self._token_lock.acquire()
+        try:
+            self._request_token = self._get_value_from_raw_qs("oauth_token", response)
+            self._request_token_secret = self._get_value_from_raw_qs("oauth_token_secret", response)
+        finally:
+            self._token_lock.release()
         #TODO: Must catch the OAuthErrors instead of just return True
         return True
 
@@ -199,14 +282,18 @@ class LinkedIn(object):
 
         self._calc_signature(self._get_url(relative_url), query_dict, self._request_token_secret, method)
 
-        response = self._https_connection(method, relative_url, query_dict)
+        response = self._oauth_connection(method, relative_url, query_dict)
 
         oauth_problem = self._get_value_from_raw_qs("oauth_problem", response)
         if oauth_problem:
             raise OAuthError(oauth_problem)
 
-        self._access_token = self._get_value_from_raw_qs("oauth_token", response)
-        self._access_token_secret = self._get_value_from_raw_qs("oauth_token_secret", response)
+        self._token_lock.acquire()
+        try:
+            self._access_token = self._get_value_from_raw_qs("oauth_token", response)
+            self._access_token_secret = self._get_value_from_raw_qs("oauth_token_secret", response)
+        finally:
+            self._token_lock.release()
         #TODO: Must catch the OAuthErrors instead of just return True
         return True
 
@@ -227,20 +314,7 @@ class LinkedIn(object):
 
         @ Returns Profile instance
         """
-        # specify the url according to the parameters given
-        if url:
-            url = self._quote(url)
-            raw_url = "url=%s:public" % url
-        elif member_id:
-            raw_url = "id=%s" % member_id
-        else:
-            raw_url = "~"
-        if url is None:
-            fields = ":(%s)" % ",".join(fields) if len(fields) > 0 else None
-            if fields:
-                raw_url = raw_url + fields
-
-        return self.get_profile_raw(raw_url)
+        return self.get_profile_raw(self._profile_raw_url(member_id, url, fields))
 
     def get_profile_raw(self, raw_url, params=None):
         """
@@ -250,44 +324,97 @@ class LinkedIn(object):
 
         self._check_tokens()
 
-        response = self._do_normal_query("/v1/people/" + raw_url, params=params)
-        return Profile.create(minidom.parseString(response), self._debug)
+        response = self._do_normal_query("/v1/people/" + raw_url, params=params, endpoint="profile")
+        return self._parse_profile(response)
+
+    def get_profiles(self, member_ids, fields=()):
+        """
+        Fetches the profiles of many members in as few requests as possible using the
+        multiple members selector of the Profile API:
+        * http://api.linkedin.com/v1/people::(id=12345,id=67890):(id,first-name,last-name)
+
+        The ids are packed in chunks whose url stays under MAX_URL_LENGTH characters and
+        every chunk is a single signed request. A failing chunk does not stop the others.
+        The 'id' field is always requested since the profiles are keyed by it.
+
+        @Returns: a BulkProfiles dictionary of Profile instances keyed by member id. Its
+        'failures' attribute lists the chunks that failed along with their error and
+        its 'missing' attribute the ids LinkedIn returned no profile for.
+        """
+        self._check_tokens()
+
+        fields = list(fields) or ["first-name", "last-name", "headline", "site-standard-profile-request"]
+        if "id" not in fields:
+            fields.insert(0, "id")
+        fields = ":(%s)" % ",".join(fields)
+
+        result = BulkProfiles()
+        for chunk in self._member_id_chunks(member_ids, fields):
+            try:
+                response = self._do_normal_query("/v1/people::(%s)%s" % (",".join(["id=%s" % member_id for member_id in chunk]), fields))
+                profiles = self._parse_people_list(response)
+            except (LinkedinError, httplib.HTTPException, IOError), error:
+                result.failures.append((chunk, error))
+                continue
+            for profile in profiles:
+                result[profile.id] = profile
+            result.missing.extend([member_id for member_id in chunk if member_id not in result])
+
+        return result
 
-    def get_updates(self):
+    def get_updates(self, types = None):
         """
         Gets all updates relative to the authenticated user
+        If update types are given (e.g. ["SHAR", "CONN", "PROF"]), LinkedIn is asked for
+        these types only and the updates of other types are skipped while parsing.
         """
         if (not self._access_token) or (not self._access_token_secret):
             self.error = "You do not have an access token. Plase perform 'accessToken()' method first."
             raise OAuthError(self.error)
 
-        raw_url = "/v1/people/"
-        raw_url = raw_url + "~/network/updates"
+        response = self._do_normal_query("/v1/people/~/network/updates", params=self._updates_params(types))
+        return self._parse_updates(response, types)
 
-        response = self._do_normal_query(raw_url)
-        error = self._parse_error(response)
-        if error:
-            self.error = error
-            return None
+    def get_new_updates(self, types = None):
+        """
+        Incremental get_updates: returns only the updates newer than the ones the previous
+        call returned for the same access token, newest first. The 'after' parameter asks
+        LinkedIn for the delta only, and the feed is parsed while it is read and dropped at
+        the first update already seen. Each selection of types keeps its own mark.
+        """
+        if (not self._access_token) or (not self._access_token_secret):
+            self.error = "You do not have an access token. Plase perform 'accessToken()' method first."
+            raise OAuthError(self.error)
 
-        from StringIO import StringIO
-        content = StringIO(response)
-        document = parse(content)
-        updates = document.getroot()
-        result = []
-        for update in updates:
-            update_type = update.find("update-type").text
-            up = Update.create(update,update_type)
-            if up is not None:
-                result.append(up)
+        mark_key = access_token = self._get_access_token()[0]
+        if types is not None:
+            mark_key = "%s|%s" % (access_token, ",".join(sorted(set(types)))) # shelve keys are strings
+        mark = self.update_marks.get(mark_key) or updates.HighWaterMark()
+        params = self._updates_params(types)
+        if mark.timestamp is not None:
+            params = dict(params or {}, after = mark.timestamp)
 
+        relative_url, query_dict = self._signed_query("/v1/people/~/network/updates", params=params)
+        try:
+            result = list(updates.iter_updates(self._https_stream("GET", relative_url, query_dict), mark, types))
+        except parser.ErrorResponse, error:
+            raise LinkedinError(self._parse_error(error.xml))
+
+        self._marks_lock.acquire()
+        try:
+            # Another thread or session may have moved the mark meanwhile, advance the newest one.
+            mark = self.update_marks.get(mark_key) or mark
+            self.update_marks[mark_key] = mark.advance(result)
+        finally:
+            self._marks_lock.release()
         return result
 
-    def get_connections(self, member_id = None, public_url = None, fields=()):
+    def get_connections(self, member_id = None, public_url = None, fields=(), columnar = False):
         """
         Fetches the connections of a user whose id is the given member_id or url is the given public_url
         If none of the parameters given, the connections of the current user are fetched.
-        @Returns: a list of Profile instances or an empty list if there is no connection.
+        @Returns: a list of Profile instances or an empty list if there is no connection,
+        or with columnar=True a batch.ProfileBatch holding one column per field.
 
         Example urls:
         * http://api.linkedin.com/v1/people/~/connections (for current user)
@@ -296,29 +423,40 @@ class LinkedIn(object):
         """
         self._check_tokens()
 
-        raw_url = "/v1/people/%s/connections"
-        if member_id:
-            raw_url = raw_url % ("id=" + member_id)
-        elif public_url:
-            raw_url = raw_url % ("url=" + self._quote(public_url))
-        else:
-            raw_url = raw_url % "~"
-        fields = ":(%s)" % ",".join(fields) if len(fields) > 0 else None
-        if fields:
-            raw_url = raw_url + fields
+        response = self._do_normal_query(self._connections_url(member_id, public_url, fields),
+                                         endpoint="connections")
+        return self._parse_people(response, columnar)
 
-        response = self._do_normal_query(raw_url)
-        document = minidom.parseString(response)
-        connections = document.getElementsByTagName("person")
-        result = []
-        for connection in connections:
-            profile = Profile.create(connection, self._debug)
-            if profile is not None:
-                result.append(profile)
+    def iter_connections(self, member_id = None, public_url = None, fields=(), chunk_size = 16384):
+        """
+        Streaming variant of get_connections: the response is parsed as it is read
+        from the socket and each Profile is yielded as soon as its </person> closes.
+        The parsed elements are dropped along the way, so memory stays flat however
+        many connections the member has.
+        """
+        self._check_tokens()
 
-        return result
+        relative_url, query_dict = self._signed_query(self._connections_url(member_id, public_url, fields))
+        chunks = self._https_stream("GET", relative_url, query_dict, chunk_size = chunk_size)
+        try:
+            for profile in parser.iter_people(chunks, self._debug, self.lazy_profiles, self.intern_pool):
+                yield profile
+        except parser.ErrorResponse, error:
+            raise LinkedinError(self._parse_error(error.xml))
+
+    def iter_all_connections(self, member_id = None, public_url = None, fields=(), page_size = 500,
+                             prefetch = True):
+        """
+        Iterates over all the connections of a member, whereas get_connections only returns
+        the first page of them. The pages of 'page_size' connections are requested in
+        sequence and, with prefetch, page N+1 is fetched in the background while page N
+        is consumed.
+        @Returns: a pagination.ConnectionPages iterable of Profile instances
+        """
+        self._check_tokens()
+        return pagination.ConnectionPages(self, member_id, public_url, fields, page_size, prefetch)
 
-    def get_search(self, parameters, fields=[]):
+    def get_search(self, parameters, fields=[], columnar = False):
         """
         Use the People Search API to find LinkedIn profiles using keywords,
         company, name, or other methods. This returns search results,
@@ -355,31 +493,25 @@ class LinkedIn(object):
         </people_search>
 
         So users will have to update their code to reflect this new structure.
+
+        With columnar=True the results come as a batch.ProfileBatch.
         """
 
         self._check_tokens()
-        fields = ":(people:(id,first-name,last-name,headline,positions,public-profile-url,picture-url,location:(name)))"
-        response = self._do_normal_query("/v1/people-search" + fields, params=parameters)
-
-        error = self._parse_error(response)
-        if error:
-            self._error = error
-            #logging.error("Parsing Error")
-            return None
-
-        # Parse the response and list out all of the Person elements
-        document = minidom.parseString(response)
-
-        connections = document.getElementsByTagName("person")
-        result = []
-
-        for connection in connections:
-            profile = Profile.create(connection, self._debug)
-            if profile is not None:
-                result.append(profile)
-        return result
-
+        response = self._do_normal_query(self._search_url(fields), params=parameters, endpoint="search")
+        return self._parse_search(response, columnar)
 
+    def search_cursor(self, parameters, fields=(), page_size = 25, concurrency = 4, max_results = None):
+        """
+        Walks the result pages of a people search. Up to 'concurrency' pages are requested
+        at the same time and the profiles are yielded in rank order as the pages arrive.
+        'fields' is the field selector of the persons, a list of field names or a whole
+        selector string such as ":(people:(id,first-name),num-results)".
+        @Returns: a pagination.SearchCursor iterable of Profile instances
+        """
+        self._check_tokens()
+        return pagination.SearchCursor(self, parameters, self._search_url(fields), page_size,
+                                       concurrency, max_results)
 
 
     def send_message(self, subject, message, ids = None, send_yourself = False):
@@ -428,35 +560,7 @@ class LinkedIn(object):
 
         self._check_tokens()
 
-        # Shorten the list.
-        ids = ids[:10]
-        if send_yourself:
-            ids = ids[:9]
-            ids.append("~")
-
-        subjectStripper = Stripper()
-        subjectStripper.feed(subject)
-        subject = subjectStripper.getAlteredData()
-        bodyStripper = Stripper()
-        bodyStripper.feed(message)
-        body = bodyStripper.getAlteredData()
-
-        # Build up the POST body.
-        builder = XMLBuilder("mailbox-item")
-        recipients_element = builder.create_element("recipients")
-        subject_element = builder.create_element_with_text_node("subject", subject)
-        body_element = builder.create_element_with_text_node("body", body)
-        for member_id in ids:
-            recipient_element = builder.create_element("recipient")
-            person_element = builder.create_element("person")
-            person_element.setAttribute("path", "/people/%s" % member_id)
-            recipient_element.appendChild(person_element)
-            recipients_element.appendChild(recipient_element)
-
-        builder.append_element_to_root(recipients_element)
-        builder.append_element_to_root(subject_element)
-        builder.append_element_to_root(body_element)
-        body = builder.xml()
+        body = self._message_body(subject, message, ids, send_yourself)
 
         self._do_normal_query("/v1/people/~/mailbox", body=body, method="POST")
 
@@ -477,39 +581,7 @@ class LinkedIn(object):
 
         self._check_tokens()
 
-        subjectStripper = Stripper()
-        subjectStripper.feed(subject)
-        subject = subjectStripper.getAlteredData()
-        bodyStripper = Stripper()
-        bodyStripper.feed(message)
-        body = bodyStripper.getAlteredData()
-
-        # Build up the POST body.
-        builder = XMLBuilder("mailbox-item")
-        recipients_element = builder.create_element("recipients")
-        subject_element = builder.create_element_with_text_node("subject", subject)
-        body_element = builder.create_element_with_text_node("body", body)
-        recipient_element = builder.create_element("recipient")
-        person_element = builder.create_element("person")
-        person_element.setAttribute("path", "/people/email=%s" % email)
-        first_name_element = builder.create_element_with_text_node("first-name", first_name)
-        last_name_element = builder.create_element_with_text_node("last-name", last_name)
-        builder.append_list_of_elements_to_element(person_element, [first_name_element, last_name_element])
-        recipient_element.appendChild(person_element)
-        recipients_element.appendChild(recipient_element)
-
-        item_content_element = builder.create_element("item-content")
-        invitation_request_element = builder.create_element("invitation-request")
-        connect_type_element = builder.create_element_with_text_node("connect-type", "friend")
-        invitation_request_element.appendChild(connect_type_element)
-        item_content_element.appendChild(invitation_request_element)
-
-
-        builder.append_element_to_root(recipients_element)
-        builder.append_element_to_root(subject_element)
-        builder.append_element_to_root(body_element)
-        builder.append_element_to_root(item_content_element)
-        body = builder.xml()
+        body = self._invitation_body(subject, message, first_name, last_name, email)
 
         self._do_normal_query("/v1/people/~/mailbox", body=body, method="POST")
 
@@ -529,16 +601,7 @@ class LinkedIn(object):
         """
         self._check_tokens()
 
-        # Shorten the message just in case.
-        status_message = str(status_message)
-        if len(status_message) > 140:
-            status_message = status_message[:140]
-
-        # Build up the XML request
-        builder = XMLBuilder("current-status")
-        status_node = builder.document.createTextNode(status_message)
-        builder.root.appendChild(status_node)
-        body = builder.xml()
+        body = self._status_body(status_message)
 
         self._do_normal_query("/v1/people/~/current-status", body=body, method="PUT")
 
@@ -591,6 +654,240 @@ class LinkedIn(object):
         """
         self._check_tokens()
 
+        body = self._share_body(comment, title, submitted_url, submitted_image_url,
+                                description, visibility)
+
+        self._do_normal_query("/v1/people/~/shares", body=body, method="POST")
+
+    def get_authorize_url(self, request_token = None):
+        self._request_token = request_token and request_token or self._request_token
+        if self._request_token is None:
+            raise OAuthError("OAuth Request Token is NULL. Please acquire this first.")
+        return "%s%s?oauth_token=%s" % (self.BASE_URL, "/uas/oauth/authorize", self._request_token)
+
+    def set_debug(self, debug):
+        self._debug = debug
+
+    def session(self, access_token, access_token_secret):
+        """
+        Returns a Session making the calls of one member through this client.
+        The session carries the tokens of the member and shares everything else
+        with the client: configuration, connection pool, cache, signers. Serving
+        many members takes one client and one cheap session per member:
+
+            api = LinkedIn(KEY, SECRET, CALLBACK)
+            api.cache = ResponseCache()
+            for member in members:
+                connections = api.session(member.token, member.token_secret).get_connections()
+        """
+        return _session_class(type(self))(self, access_token, access_token_secret)
+
+    def clear(self):
+        self._token_lock.acquire()
+        try:
+            self._request_token = None
+            self._access_token  = None
+            self._verifier      = None
+
+            self._request_token_secret = None
+            self._access_token_secret = None
+        finally:
+            self._token_lock.release()
+
+    #################################################
+    # HELPER FUNCTIONS                              #
+    # You do not explicitly use those methods below #
+    #################################################
+
+    def _profile_raw_url(self, member_id, url, fields):
+        # specify the url according to the parameters given
+        if url:
+            url = self._quote(url)
+            raw_url = "url=%s:public" % url
+        elif member_id:
+            raw_url = "id=%s" % member_id
+        else:
+            raw_url = "~"
+        if url is None:
+            fields = ":(%s)" % ",".join(fields) if len(fields) > 0 else None
+            if fields:
+                raw_url = raw_url + fields
+        return raw_url
+
+    def _connections_url(self, member_id, public_url, fields):
+        raw_url = "/v1/people/%s/connections"
+        if member_id:
+            raw_url = raw_url % ("id=" + member_id)
+        elif public_url:
+            raw_url = raw_url % ("url=" + self._quote(public_url))
+        else:
+            raw_url = raw_url % "~"
+        fields = ":(%s)" % ",".join(fields) if len(fields) > 0 else None
+        if fields:
+            raw_url = raw_url + fields
+        return raw_url
+
+    def _search_url(self, fields=()):
+        if isinstance(fields, basestring):
+            return "/v1/people-search" + fields
+        if not fields:
+            fields = ["id", "first-name", "last-name", "headline", "positions", "public-profile-url",
+                      "picture-url", "location:(name)"]
+        return "/v1/people-search:(people:(%s))" % ",".join(fields)
+
+    def _parse_profile(self, response):
+        return Profile.create(response.document, self._debug, self.lazy_profiles, self.intern_pool)
+
+    def _parse_people(self, response, columnar = False):
+        if columnar:
+            return batch.ProfileBatch.create(response.document.getElementsByTagName("person"))
+        result = []
+        for person in response.document.getElementsByTagName("person"):
+            profile = Profile.create(person, self._debug, self.lazy_profiles, self.intern_pool)
+            if profile is not None:
+                result.append(profile)
+        return result
+
+    def _parse_people_list(self, response):
+        """
+        Parses a <people> or <connections> list. Unlike _parse_people it leaves out the persons nested in
+        the profiles, such as their connections.
+        """
+        document = response.document
+        result = []
+        for person in document.documentElement.childNodes:
+            if person.nodeName == "person":
+                result.append(Profile.create(person, self._debug, self.lazy_profiles, self.intern_pool))
+        return result
+
+    def _member_id_chunks(self, member_ids, fields):
+        """
+        Splits the member ids, without duplicates, in chunks whose people::(...) url
+        fits in MAX_URL_LENGTH.
+        """
+        chunks = []
+        chunk = []
+        base_length = len("/v1/people::()") + len(fields)
+        length = base_length
+        seen = set()
+        for member_id in member_ids:
+            if member_id in seen:
+                continue
+            seen.add(member_id)
+            selector_length = len("id=%s" % member_id) + (chunk and 1 or 0)
+            if chunk and length + selector_length > self.MAX_URL_LENGTH:
+                chunks.append(chunk)
+                chunk = []
+                length = base_length
+                selector_length -= 1
+            chunk.append(member_id)
+            length += selector_length
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _parse_search(self, response, columnar = False):
+        error = response.error
+        if error:
+            self._error = error
+            #logging.error("Parsing Error")
+            return None
+
+        # Parse the response and list out all of the Person elements
+        return self._parse_people(response, columnar)
+
+    def _updates_params(self, types):
+        if types is None:
+            return None
+        return {"type" : tuple(sorted(set(types)))}
+
+    def _parse_updates(self, response, types = None):
+        error = response.error
+        if error:
+            self.error = error
+            return None
+
+        return list(updates.iter_updates([response.data], types = types))
+
+    def _message_body(self, subject, message, ids, send_yourself):
+        # Shorten the list.
+        ids = ids[:10]
+        if send_yourself:
+            ids = ids[:9]
+            ids.append("~")
+
+        subjectStripper = Stripper()
+        subjectStripper.feed(subject)
+        subject = subjectStripper.getAlteredData()
+        bodyStripper = Stripper()
+        bodyStripper.feed(message)
+        body = bodyStripper.getAlteredData()
+
+        # Build up the POST body.
+        builder = XMLBuilder("mailbox-item")
+        recipients_element = builder.create_element("recipients")
+        subject_element = builder.create_element_with_text_node("subject", subject)
+        body_element = builder.create_element_with_text_node("body", body)
+        for member_id in ids:
+            recipient_element = builder.create_element("recipient")
+            person_element = builder.create_element("person")
+            person_element.setAttribute("path", "/people/%s" % member_id)
+            recipient_element.appendChild(person_element)
+            recipients_element.appendChild(recipient_element)
+
+        builder.append_element_to_root(recipients_element)
+        builder.append_element_to_root(subject_element)
+        builder.append_element_to_root(body_element)
+        return builder.xml()
+
+    def _invitation_body(self, subject, message, first_name, last_name, email):
+        subjectStripper = Stripper()
+        subjectStripper.feed(subject)
+        subject = subjectStripper.getAlteredData()
+        bodyStripper = Stripper()
+        bodyStripper.feed(message)
+        body = bodyStripper.getAlteredData()
+
+        # Build up the POST body.
+        builder = XMLBuilder("mailbox-item")
+        recipients_element = builder.create_element("recipients")
+        subject_element = builder.create_element_with_text_node("subject", subject)
+        body_element = builder.create_element_with_text_node("body", body)
+        recipient_element = builder.create_element("recipient")
+        person_element = builder.create_element("person")
+        person_element.setAttribute("path", "/people/email=%s" % email)
+        first_name_element = builder.create_element_with_text_node("first-name", first_name)
+        last_name_element = builder.create_element_with_text_node("last-name", last_name)
+        builder.append_list_of_elements_to_element(person_element, [first_name_element, last_name_element])
+        recipient_element.appendChild(person_element)
+        recipients_element.appendChild(recipient_element)
+
+        item_content_element = builder.create_element("item-content")
+        invitation_request_element = builder.create_element("invitation-request")
+        connect_type_element = builder.create_element_with_text_node("connect-type", "friend")
+        invitation_request_element.appendChild(connect_type_element)
+        item_content_element.appendChild(invitation_request_element)
+
+
+        builder.append_element_to_root(recipients_element)
+        builder.append_element_to_root(subject_element)
+        builder.append_element_to_root(body_element)
+        builder.append_element_to_root(item_content_element)
+        return builder.xml()
+
+    def _status_body(self, status_message):
+        # Shorten the message just in case.
+        status_message = str(status_message)
+        if len(status_message) > 140:
+            status_message = status_message[:140]
+
+        # Build up the XML request
+        builder = XMLBuilder("current-status")
+        status_node = builder.document.createTextNode(status_message)
+        builder.root.appendChild(status_node)
+        return builder.xml()
+
+    def _share_body(self, comment, title, submitted_url, submitted_image_url, description, visibility):
         if comment is not None:
             comment = str(comment)
             if len(comment) > 700:
@@ -642,34 +939,10 @@ class LinkedIn(object):
 
         builder.append_element_to_root(visibility_element)
 
-        body = builder.xml()
-
-        self._do_normal_query("/v1/people/~/shares", body=body, method="POST")
-
-    def get_authorize_url(self, request_token = None):
-        self._request_token = request_token and request_token or self._request_token
-        if self._request_token is None:
-            raise OAuthError("OAuth Request Token is NULL. Please acquire this first.")
-        return "%s%s?oauth_token=%s" % (self.BASE_URL, "/uas/oauth/authorize", self._request_token)
-
-    def set_debug(self, debug):
-        self._debug = debug
-
-    def clear(self):
-        self._request_token = None
-        self._access_token  = None
-        self._verifier      = None
-
-        self._request_token_secret = None
-        self._access_token_secret = None
-
-    #################################################
-    # HELPER FUNCTIONS                              #
-    # You do not explicitly use those methods below #
-    #################################################
+        return builder.xml()
 
     def _generate_nonce(self, length = 20):
-        return ''.join([string.letters[random.randint(0, len(string.letters) - 1)] for i in range(length)])
+        return signer.nonce(length)
 
     def _get_url(self, relative_path):
         return self.BASE_URL + relative_path
@@ -678,13 +951,21 @@ class LinkedIn(object):
         return str(int(time.time()))
 
     def _quote(self, st):
-        return urllib.quote(st, safe='~')
+        return signer.quote(st)
 
     def _utf8(self, st):
         return isinstance(st, unicode) and st.encode("utf-8") or str(st)
 
     def _urlencode(self, query_dict):
-        keys_and_values = [(self._quote(self._utf8(k)), self._quote(self._utf8(v))) for k,v in query_dict.items()]
+        """
+        A list or tuple value is sent as the parameter repeated once per item, as in
+        type=CONN&type=SHAR. The pairs are sorted by name then value, as OAuth signs them.
+        """
+        keys_and_values = []
+        for k, v in query_dict.items():
+            if not isinstance(v, (list, tuple)):
+                v = [v]
+            keys_and_values.extend([(self._quote(self._utf8(k)), self._quote(self._utf8(item))) for item in v])
         keys_and_values.sort()
         return '&'.join(['%s=%s' % (k, v) for k, v in keys_and_values])
 
@@ -711,17 +992,7 @@ class LinkedIn(object):
          <message>[invalid.property.name]. Couldn't find property with name: first_name</message>
         </error>
         """
-        try:
-            xmlDocument = minidom.parseString(str_as_xml)
-            if len(xmlDocument.getElementsByTagName("error")) > 0:
-                error = xmlDocument.getElementsByTagName("message")
-                if error:
-                    error = error[0]
-                    return error.childNodes[0].nodeValue
-            return None
-        except OAuthError, detail:
-#            raise detail
-            raise OAuthError("Invalid XML String given: error: %s" % repr(detail))
+        return parser.Response(str_as_xml).error
 
     def _create_oauth_header(self, query_dict):
         header = 'OAuth realm="http://api.linkedin.com", '
@@ -741,28 +1012,102 @@ class LinkedIn(object):
         query_dict.update(additional)
         return query_dict
 
-    def _do_normal_query(self, relative_url, body=None, method="GET", params=None):
-        method = method
-        query_dict = self._query_dict({"oauth_token" : self._access_token})
+    def _do_normal_query(self, relative_url, body=None, method="GET", params=None, endpoint=None):
+        """
+        Signs and performs the request. The GET requests of a named endpoint are
+        served from, and stored in, the response cache when there is one. With a
+        single flight, the GET requests identical to one in flight wait for its
+        response instead.
+        """
+        if self.single_flight is not None and method == "GET":
+            key = coalesce.request_key(self._get_access_token()[0], relative_url, params)
+            return self.single_flight.do(key, self._do_query, relative_url, body, method, params, endpoint)
+        return self._do_query(relative_url, body, method, params, endpoint)
+
+    def _do_query(self, relative_url, body=None, method="GET", params=None, endpoint=None):
+        cache_key = None
+        if self.cache is not None and endpoint is not None and method == "GET":
+            cache_key = self.cache.key(self._get_access_token()[0], relative_url, params)
+            data = self.cache.get(cache_key)
+            if data is not None:
+                return parser.Response(data)
+
+        if self.retry_policy is None:
+            data = self._send_query(relative_url, body, method, params)
+        else:
+            try:
+                data = self.retry_policy.call(self._send_query, (relative_url, body, method, params),
+                                              idempotent = method == "GET", answers = (HTTPError,))
+            except retry.ServerError, error:
+                raise HTTPError(error.status, error.data) # of the last attempt
+            except retry.CircuitOpen, error:
+                raise CircuitOpenError(str(error), error.retry_after)
+        response = parser.Response(data)
+        self._check_response(response)
+        if cache_key is not None:
+            self.cache.set(cache_key, response.data, endpoint)
+        return response
+
+    def _send_query(self, relative_url, body=None, method="GET", params=None):
+        """
+        Signs and sends one attempt of a request, each retry having its own nonce.
+        @Returns: the response body
+        """
+        relative_url, query_dict = self._signed_query(relative_url, method, params)
+        return self._https_connection(method, relative_url, query_dict, body)
+
+    def _oauth_connection(self, method, relative_url, query_dict, body=None):
+        """
+        _https_connection for the OAuth calls, which read the body whatever the
+        status: LinkedIn explains their failures in an oauth_problem parameter.
+        """
+        try:
+            return self._https_connection(method, relative_url, query_dict, body)
+        except retry.ServerError, error:
+            return error.data
+        except HTTPError, error:
+            return error.data
+
+    def _signed_query(self, relative_url, method="GET", params=None, block=None):
+        """
+        Signs the request with the access token. 'block' overrides the block
+        of the rate limiter.
+        @Returns: the relative url with the params appended and the oauth query dict
+        """
+        access_token, access_token_secret = self._get_access_token()
+        if self.rate_limiter is not None:
+            try:
+                self.rate_limiter.acquire(relative_url, access_token, block)
+            except throttle.Throttled, error:
+                raise RateLimitError(str(error), error.retry_after)
+        query_dict = self._query_dict({"oauth_token" : access_token})
         signature_dict = dict(query_dict)
 
         if params:
             signature_dict.update(params)
 
         query_dict["oauth_signature"] = self._calc_signature(self._get_url(relative_url),
-                                    signature_dict, self._access_token_secret, method, update=False)
+                                    signature_dict, access_token_secret, method, update=False)
 
         if params:
             relative_url = "%s?%s" % (relative_url, self._urlencode(params))
 
-        response = self._https_connection(method, relative_url, query_dict, body)
+        return relative_url, query_dict
 
-        if response:
-            error = self._parse_error(response)
-            if error:
-                raise LinkedinError(error)
+    def _check_response(self, response):
+        error = response.error
+        if error:
+            raise LinkedinError(error)
 
-        return response
+    def _get_access_token(self):
+        """
+        Returns the access token and its secret as a consistent pair.
+        """
+        self._token_lock.acquire()
+        try:
+            return self._access_token, self._access_token_secret
+        finally:
+            self._token_lock.release()
 
     def _check_tokens(self):
         if self._access_token is None:
@@ -771,16 +1116,29 @@ class LinkedIn(object):
             raise OAuthError("There is no Access Token Secret. Please perform 'access_token' method and obtain that token first.")
 
     def _calc_key(self, token_secret):
-        key = self._quote(self._api_secret) + "&"
-        if token_secret:
-            key += self._quote(token_secret)
-        return key
+        return self._signer(token_secret).key
+
+    def _signer(self, token_secret, token = None):
+        """
+        The signer.Signer of a token secret, made on first use. The constant oauth
+        parameters, and the token when given, are quoted once by the signer.
+        """
+        key = (self._api_secret, token_secret)
+        result = self._signers.get(key)
+        if result is None:
+            constants = {"oauth_consumer_key" : self._api_key,
+                         "oauth_signature_method" : "HMAC-SHA1",
+                         "oauth_version" : self.VERSION}
+            if token is not None:
+                constants["oauth_token"] = token
+            result = signer.Signer(self._api_secret, token_secret, constants)
+            if len(self._signers) >= self.MAX_SIGNERS:
+                self._signers.clear()
+            self._signers[key] = result
+        return result
 
     def _calc_signature(self, url, query_dict, token_secret, method = "GET", update=True):
-        query_string = self._quote(self._urlencode(query_dict))
-        signature_base_string = "&".join([self._quote(method), self._quote(url), query_string])
-        hashed = hmac.new(self._calc_key(token_secret), signature_base_string, sha)
-        signature = binascii.b2a_base64(hashed.digest())[:-1]
+        signature = self._signer(token_secret, query_dict.get("oauth_token")).sign(method, url, query_dict)
         if update:
             query_dict["oauth_signature"] = signature
         return signature
@@ -793,19 +1151,46 @@ class LinkedIn(object):
 
     def _https_connection_regular(self, method, relative_url, query_dict, body = None):
         header = self._create_oauth_header(query_dict)
-        connection = None
+        response, data = pool.get_pool(self.API_ENDPOINT).request(method, relative_url, body = body,
+                                                                  headers={'Authorization':header})
+        if response is None:
+            raise LinkedinError("No HTTP response received.")
+        return self._check_status(response.status, data)
+
+    def _check_status(self, status, data):
+        """
+        Returns the body of a 2xx response. Raises retry.ServerError on the
+        statuses the retry policy retries, HTTPError on the other ones, so
+        that a failed response is never taken for, nor cached as, a result.
+        """
+        if 200 <= status < 300:
+            return data
+        if self.retry_policy is not None and status in retry.RETRY_STATUSES:
+            raise retry.ServerError(status, data)
+        raise HTTPError(status, data)
+
+    def _https_stream(self, method, relative_url, query_dict, body = None, chunk_size = 16384):
+        """
+        Yields the response body in chunks as it is read from the socket. The
+        status is checked first, a non-2xx response raises HTTPError before any
+        of its body reaches the parser.
+        """
         try:
-            connection = httplib.HTTPSConnection(self.API_ENDPOINT)
-            connection.request(method, relative_url, body = body,
-                               headers={'Authorization':header})
-            response = connection.getresponse()
-
-            if response is None:
-                raise LinkedinError("No HTTP response received.")
-            return response.read()
-        finally:
-            if connection:
-                connection.close()
+            if self._gae:
+                yield self._https_connection_gae(method, relative_url, query_dict, body)
+                return
+            header = self._create_oauth_header(query_dict)
+            for chunk in pool.get_pool(self.API_ENDPOINT).stream(method, relative_url, body = body,
+                                                                 headers = {'Authorization':header},
+                                                                 chunk_size = chunk_size,
+                                                                 on_response = self._check_stream_status):
+                yield chunk
+        except retry.ServerError, error:
+            raise HTTPError(error.status, error.data) # the streamed calls are not retried
+
+    def _check_stream_status(self, response):
+        if not 200 <= response.status < 300:
+            self._check_status(response.status, response.read())
 
     def _https_connection_gae(self, method, relative_url, query_dict, body = None):
         from google.appengine.api import urlfetch
@@ -829,8 +1214,49 @@ class LinkedIn(object):
         urlfetch.make_fetch_call(rpc, url, method=method, headers=headers,
                              payload=body)
 
-        return rpc.get_result().content
+        result = rpc.get_result()
+        return self._check_status(result.status_code, result.content)
 
     ########################
     # END HELPER FUNCTIONS #
     ########################
+
+
+class Session(LinkedIn):
+    """
+    Handle on a shared LinkedIn client for one member, see LinkedIn.session.
+    It holds the tokens of the member and reads every other attribute from the
+    client, so the configuration set on the client (cache, lazy_profiles,
+    intern_pool...) applies to all its sessions. The methods are the ones of
+    the class of the client, a session of an AsyncLinkedIn is asynchronous.
+    Making one costs a few attribute assignments.
+    """
+    def __init__(self, client, access_token = None, access_token_secret = None):
+        self.client = client
+        self._access_token = access_token
+        self._access_token_secret = access_token_secret
+        self._request_token = None
+        self._request_token_secret = None
+        self._verifier = None
+        self._token_lock = threading.RLock()
+
+    def __getattr__(self, name):
+        # Only called for the attributes the session does not hold itself.
+        try:
+            client = self.__dict__["client"]
+        except KeyError:
+            raise AttributeError(name)
+        return getattr(client, name)
+
+    def session(self, access_token, access_token_secret):
+        return self.client.session(access_token, access_token_secret)
+
+# Session class of each client class: the sessions of a subclass of LinkedIn keep its methods.
+_session_classes = {}
+
+def _session_class(client_class):
+    session_class = _session_classes.get(client_class)
+    if session_class is None:
+        session_class = type(client_class.__name__ + "Session", (Session, client_class), {})
+        _session_classes[client_class] = session_class
+    return session_class
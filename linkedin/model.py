@@ -1,4 +1,5 @@
 import datetime
+from operator import attrgetter
 from xml.sax.saxutils import unescape
 
 def get_child(node, tagName,default=None):
@@ -52,18 +53,47 @@ def parse_connections(connections_node):
 
     return connections_list
 
-class LinkedInModel:
+class LinkedInModel(object):
+    """
+    Base of the model classes. They declare their attributes in __slots__, so
+    their instances carry no __dict__, which matters when millions of them are
+    kept in memory.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def _fields(cls):
+        """
+        Names of the public slots of the class and of its bases, bases first.
+        """
+        fields = cls.__dict__.get("_fields_cache")
+        if fields is None:
+            fields = []
+            for klass in reversed(cls.__mro__):
+                fields.extend([x for x in klass.__dict__.get("__slots__", ()) if not x.startswith("_")])
+            setattr(cls, "_fields_cache", fields)
+        return fields
 
     def __repr__(self):
         d = {}
-        for x,y in self.__dict__.items():
-            if (self.__dict__[x]):
+        for x in self._fields():
+            y = getattr(self, x, None)
+            if y:
                 d[x] = y
         return (self.__module__ + "." + self.__class__.__name__ + " " +
                 d.__repr__())
 
+    def __getstate__(self):
+        return dict([(x, getattr(self, x)) for x in self._fields() if hasattr(self, x)])
+
+    def __setstate__(self, state):
+        for x, y in state.items():
+            setattr(self, x, y)
+
 class Publication(LinkedInModel):
 
+    __slots__ = ("id", "title", "publisher_name", "date", "url", "summary")
+
     def __init__(self):
         self.id = None
         self.title = None
@@ -108,6 +138,8 @@ class Publication(LinkedInModel):
 
 class Company(LinkedInModel):
 
+    __slots__ = ("id", "name", "type", "size", "industry", "ticker")
+
     def __init__(self):
         self.id = None
         self.name = None
@@ -141,6 +173,9 @@ class Education(LinkedInModel):
     """
     Class that wraps an education info of a user
     """
+    __slots__ = ("id", "school_name", "degree", "start_date", "end_date", "activities", "notes",
+                 "field_of_study")
+
     def __init__(self):
         self.id          = None
         self.school_name = None
@@ -204,6 +239,8 @@ class Position(LinkedInModel):
     """
     Class that wraps a business position info of a user
     """
+    __slots__ = ("id", "title", "summary", "start_date", "end_date", "company", "is_current")
+
     def __init__(self):
         self.id         = None
         self.title      = None
@@ -252,6 +289,8 @@ class Position(LinkedInModel):
         return position
 
 class Location(LinkedInModel):
+    __slots__ = ("name", "country_code")
+
     def __init__(self):
         self.name = None
         self.country_code = None
@@ -276,6 +315,8 @@ class Location(LinkedInModel):
         return loc
 
 class RelationToViewer(LinkedInModel):
+    __slots__ = ("distance", "num_related_connections", "connections")
+
     def __init__(self):
         self.distance = None
         self.num_related_connections = None
@@ -317,6 +358,12 @@ class Profile(LinkedInModel):
     Wraps the data which comes from Profile API of LinkedIn.
     For further information, take a look at LinkedIn Profile API.
     """
+    __slots__ = ("id", "first_name", "last_name", "headline", "location", "industry", "distance",
+                 "relation_to_viewer", "summary", "specialties", "proposal_comments", "associations",
+                 "interests", "honors", "public_url", "private_url", "picture_url", "current_status",
+                 "current_share", "num_connections", "num_connections_capped", "languages", "skills",
+                 "connections", "positions", "educations", "xml_string")
+
     def __init__(self):
         self.id          = None
         self.first_name  = None
@@ -347,87 +394,24 @@ class Profile(LinkedInModel):
         self.xml_string  = None
 
     @staticmethod
-    def create(node, debug=False):
+    def create(node, debug=False, lazy=False, intern_pool=None):
+        """
+        Builds the Profile of the first <person> of node, node included.
+        With lazy=True a LazyProfile is returned, which decodes each field
+        from the element the first time it is read.
+        With an interning.InternPool, the repeated values are shared.
+        """
         person = node
         if person.nodeName != "person":
             person = person.getElementsByTagName("person")[0]
-        profile = Profile()
-        profile.id = get_child(person, "id")
-        profile.first_name = get_child(person, "first-name")
-        profile.last_name = get_child(person, "last-name")
-        profile.headline = get_child(person, "headline")
-        profile.distance = get_child(person, "distance")
-        profile.specialties = get_child(person, "specialties")
-        profile.proposal_comments = get_child(person, "proposal-comments")
-        profile.associations = get_child(person, "associations")
-        profile.industry = get_child(person, "industry")
-        profile.honors = get_child(person, "honors")
-        profile.interests = get_child(person, "interests")
-        profile.summary = get_child(person, "summary")
-        profile.picture_url = profile._unescape(get_child(person, "picture-url"))
-        profile.current_status = get_child(person, "current-status")
-        profile.current_share = get_child(person, "current-share")
-        profile.num_connections = get_child(person, "num-connections")
-        profile.num_connections_capped = get_child(person, "num-connections-capped")
-        profile.public_url = profile._unescape(get_child(person, "public-profile-url"))
-
-        location = person.getElementsByTagName("location")
-        if location:
-            profile.location = Location.create(location[0])
-
-        relation_to_viewer = person.getElementsByTagName("relation-to-viewer")
-        if relation_to_viewer:
-            relation_to_viewer = relation_to_viewer[0]
-            profile.relation_to_viewer = RelationToViewer.create(relation_to_viewer)
-
-        # Create connections
-        connections = person.getElementsByTagName("connections")
-        if connections:
-            connections = connections[0]
-            if not profile.num_connections and connections.hasAttribute("total"):
-                profile.num_connections = int(connections.attributes["total"].value)
-            profile.connections = parse_connections(connections)
-
-        # create positions
-        positions = person.getElementsByTagName("positions")
-
-        if positions:
-            positions = positions[0]
-            positions = positions.getElementsByTagName("position")
-            # TODO get the total
-            for position in positions:
-                profile.positions.append(Position.create(position))
-
-        # TODO Last field working on is - publications
-
-        private_profile = person.getElementsByTagName("site-standard-profile-request")
-        if private_profile:
-            private_profile = private_profile[0]
-        profile.private_url = get_child(private_profile, "url")
-
-        # create skills
-        skills = person.getElementsByTagName("skills")
-        if skills:
-            skills = skills[0]
-            children = skills.getElementsByTagName('skill')
-            for child in children:
-                if not child.getElementsByTagName('id'):
-                    profile.skills.append(get_child(child, 'name'))
-
-        # create languages
-        languages = person.getElementsByTagName("languages")
-        if languages:
-            languages = languages[0]
-            children = languages.getElementsByTagName('language')
-            for child in children:
-                if not child.getElementsByTagName('id'):
-                    profile.languages.append(get_child(child, 'name'))
-
-        # create educations
-        educations = person.getElementsByTagName("educations")
-        if educations:
-            educations = educations[0]
-            profile.educations = Education.create(educations)
+        if lazy:
+            profile = LazyProfile(person, intern_pool)
+        else:
+            profile = Profile()
+            for name, decode in PROFILE_DECODERS:
+                setattr(profile, name, decode(person))
+            if intern_pool is not None:
+                intern_pool.intern_profile(profile)
 
         # For debugging
         if debug:
@@ -436,9 +420,129 @@ class Profile(LinkedInModel):
         return profile
 
     def _unescape(self, url):
-        if url:
-            return unescape(url)
-        return url
+        return _unescape(url)
+
+class LazyProfile(Profile):
+    """
+    A Profile that keeps a reference to its <person> element and decodes each
+    field, nested lists included, on first access. The decoded value replaces
+    the lookup, so later reads are plain attribute reads.
+    """
+    __slots__ = ("_person", "_intern_pool")
+
+    def __init__(self, person, intern_pool = None):
+        self._person = person
+        self._intern_pool = intern_pool
+
+    def __getattr__(self, name):
+        # Only called for the slots that were not decoded yet.
+        decode = PROFILE_DECODERS_BY_NAME.get(name)
+        if decode is None:
+            raise AttributeError(name)
+        value = decode(self._person)
+        if self._intern_pool is not None:
+            value = self._intern_pool.intern_field(name, value)
+        setattr(self, name, value)
+        return value
+
+def _unescape(url):
+    if url:
+        return unescape(url)
+    return url
+
+def _text_field(tag_name, unescape_url = False):
+    if unescape_url:
+        return lambda person: _unescape(get_child(person, tag_name))
+    return lambda person: get_child(person, tag_name)
+
+def _first(person, tag_name):
+    elements = person.getElementsByTagName(tag_name)
+    if elements:
+        return elements[0]
+    return None
+
+def _profile_num_connections(person):
+    num_connections = get_child(person, "num-connections")
+    connections = _first(person, "connections")
+    if connections is not None and not num_connections and connections.hasAttribute("total"):
+        num_connections = int(connections.attributes["total"].value)
+    return num_connections
+
+def _profile_location(person):
+    location = _first(person, "location")
+    if location is not None:
+        return Location.create(location)
+    return None
+
+def _profile_relation_to_viewer(person):
+    relation_to_viewer = _first(person, "relation-to-viewer")
+    if relation_to_viewer is not None:
+        return RelationToViewer.create(relation_to_viewer)
+    return None
+
+def _profile_connections(person):
+    connections = _first(person, "connections")
+    if connections is not None:
+        return parse_connections(connections)
+    return []
+
+def _profile_positions(person):
+    positions = _first(person, "positions")
+    if positions is None:
+        return []
+    # TODO get the total
+    return [Position.create(position) for position in positions.getElementsByTagName("position")]
+
+def _profile_private_url(person):
+    # TODO Last field working on is - publications
+    return get_child(_first(person, "site-standard-profile-request"), "url")
+
+def _named_list(list_tag, item_tag):
+    def decode(person):
+        parent = _first(person, list_tag)
+        if parent is None:
+            return []
+        return [get_child(child, "name") for child in parent.getElementsByTagName(item_tag)
+                if not child.getElementsByTagName("id")]
+    return decode
+
+def _profile_educations(person):
+    educations = _first(person, "educations")
+    if educations is not None:
+        return Education.create(educations)
+    return []
+
+# (attribute, decoder) pairs of Profile, in the order Profile.create decodes them.
+PROFILE_DECODERS = [
+    ("id", _text_field("id")),
+    ("first_name", _text_field("first-name")),
+    ("last_name", _text_field("last-name")),
+    ("headline", _text_field("headline")),
+    ("distance", _text_field("distance")),
+    ("specialties", _text_field("specialties")),
+    ("proposal_comments", _text_field("proposal-comments")),
+    ("associations", _text_field("associations")),
+    ("industry", _text_field("industry")),
+    ("honors", _text_field("honors")),
+    ("interests", _text_field("interests")),
+    ("summary", _text_field("summary")),
+    ("picture_url", _text_field("picture-url", unescape_url = True)),
+    ("current_status", _text_field("current-status")),
+    ("current_share", _text_field("current-share")),
+    ("num_connections", _profile_num_connections),
+    ("num_connections_capped", _text_field("num-connections-capped")),
+    ("public_url", _text_field("public-profile-url", unescape_url = True)),
+    ("location", _profile_location),
+    ("relation_to_viewer", _profile_relation_to_viewer),
+    ("connections", _profile_connections),
+    ("positions", _profile_positions),
+    ("private_url", _profile_private_url),
+    ("skills", _named_list("skills", "skill")),
+    ("languages", _named_list("languages", "language")),
+    ("educations", _profile_educations),
+    ("xml_string", lambda person: None),
+]
+PROFILE_DECODERS_BY_NAME = dict(PROFILE_DECODERS)
 
 def create_person_attrs(update,person,field="person"):
     name = "%s %s"%(get_child_xml(person,"first-name"),get_child_xml(person,"last-name"))
@@ -452,6 +556,8 @@ def create_person_attrs(update,person,field="person"):
     return update
 
 class Connection(object):
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline")
+
     def __init__(self):
         self.person_name = None # first name + last name
         self.person_id = None
@@ -469,6 +575,8 @@ class CONN(object):
     CONN updates contain a update-content/connections node that describe the member that was recently connected to. update-content/person indicates the first degree connection making the new connection.
     "John Irving is now connected to Paul Auster."
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "connections")
+
     def __init__(self):
         self.person_name = None # first name + last name
         self.person_id = None
@@ -496,6 +604,9 @@ class NCON(object):
     NCON updates contain a update-content/person node describing the member who recently became a connection to the requestor.
     "John Irving is now a connection."
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "person1_name",
+                 "person1_id", "person1_public_url", "person1_headline")
+
     def __init__(self):
         self.person_name = None # first name + last name
         self.person_id = None
@@ -517,6 +628,8 @@ class CCEM(object):
     CCEM updates are infrequent updates where the requestor has someone in their uploaded address book who has just recently became a member of LinkedIn. They aren't necessarily connected to this individual yet, but it is likely they'll want to connect. The update-content/person node in this update indicates the recent LinkedIn member.
     "Gertrude Stein has joined LinkedIn."
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline")
+
     def __init__(self):
         self.person_name = None # first name + last name
         self.person_id = None
@@ -537,6 +650,12 @@ class SHAR(object):
     """
     Share updates are generated when a member shares or reshares an item. Shares are a more sophisticated form of status updates. They can contain text, but also an optional URL and photo. In general, you should expect at least a comment or a URL, or both, but neither one is mandatory if the other is provided.
     """
+    __slots__ = ("sharer_name", "sharer_id", "sharer_headline", "sharer_public_url",
+                 "original_sharer_name", "original_sharer_id", "original_sharer_headline", "share_id",
+                 "share_timestamp", "share_comment", "share_content_url", "share_content_title",
+                 "share_service_provider", "share_application", "share_pic_url",
+                 "original_sharer_public_url")
+
     def __init__(self):
         self.sharer_name = None
         self.sharer_id = None
@@ -582,6 +701,8 @@ class STAT(object):
     Status Updates are the result of first degree connections setting their status. While update-content/person will (as always) tell you about the member who made the update, update-content/person/current-status will contain the actual string the member has their status updated to. These strings will frequently contain URLs and are frequently HTML entity-encoded.
     "Taylor Singletary helping developers http://developers.linkedin.com"
     """
+    __slots__ = ("person_name", "person_id", "person_headline", "person_public_url", "current_status")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -604,6 +725,14 @@ class VIRL(object):
     """
     Viral updates include comments and likes.
     """
+    __slots__ = ("person_name", "person_id", "person_headline", "person_public_url", "action_code",
+                 "original_timestamp", "original_update_key", "original_update_type",
+                 "update_person_id", "update_person_name", "update_person_headline", "update_share_id",
+                 "update_share_timestamp", "update_share_visibility_code", "update_share_comment",
+                 "update_share_service_provider_name", "update_share_author_id",
+                 "update_share_author_name", "update_share_author_headline",
+                 "update_person_picture_url", "update_person_public_url")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -667,6 +796,9 @@ class JGRP(object):
     """
     Join group update. This update notifies that a user has joined a group.
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "group_id",
+                 "group_name", "group_request_url")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -698,6 +830,9 @@ class QSTN(object):
     "John Doe asked a question: 'What do people think of the new IAB Ts&Cs 3.0?'"
 
     """
+    __slots__ = ("question_id", "question_title", "author_name", "author_id", "author_public_url",
+                 "author_headline", "categories", "question_web_url", "author_distance_to_viewer")
+
     def __init__(self):
         self.question_id = None
         self.question_title = None
@@ -726,6 +861,9 @@ class QSTN(object):
 
 
 class Answer(object):
+    __slots__ = ("answer_id", "answer_web_url", "author_name", "author_id", "author_public_url",
+                 "author_headline")
+
     def __init__(self):
         self.answer_id = None
         self.answer_web_url = None
@@ -748,6 +886,8 @@ class ANSW(object):
         Answer update.
         "John Doe answered: 'How hard is it to develop an application using the LinkedIn API for this simple function'"
     """
+    __slots__ = ("question", "answers")
+
     def __init__(self):
         self.question = None
         self.answers = []
@@ -764,6 +904,8 @@ class ANSW(object):
         return "<a href=\"%s\">%s</a> answered: '%s'"%(self.author_public_url,self.author_name,self.question_title)
 
 class Activity(object):
+    __slots__ = ("body", "app_id")
+
     def __init__(self):
         self.body = None
         self.app_id = None
@@ -780,6 +922,8 @@ class APPS(object):
         APP update.
         &lt;a href="http://www.linkedin.com//profile?viewProfile=&amp;key=1234"&gt;John Irving&lt;/a&gt; is reading &lt;a
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "activities")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -800,12 +944,15 @@ class APPS(object):
 
 class APPM(APPS):
     """ completely the same as APPS """
+    __slots__ = ()
 
 class PICU(object):
     """
     Profile update
     This kind of update indicates that a first degree connection has a new profile picture.
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "pic_url")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -825,6 +972,8 @@ class PICU(object):
         return "<a href=\"%s\">%s</a> has a new profile picture <a href=\"%s\">%s</a>"%(self.person_public_url,self.person_name,self.pic_url,self.pic_url)
 
 class PositionUpd(object):
+    __slots__ = ("id", "title", "company_id", "company_name", "company_type_code", "company_type_name")
+
     def __init__(self):
         self.id = None
         self.title = None
@@ -835,7 +984,7 @@ class PositionUpd(object):
 
     @staticmethod
     def create(xml):
-        update = Position()
+        update = PositionUpd()
         update.id = get_child_xml(xml,"id")
         update.title = get_child_xml(xml,"title")
         company = xml.find("company")
@@ -850,6 +999,8 @@ class PROF(object):
     """
     PROF/PRFU profile update. Indicates when a first degree connection has updated their profile in some way.
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "positions")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -872,6 +1023,9 @@ class PRFX(object):
     """
     Indicates that a first degree connection has updated their extended profile data.
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "picture_url",
+                 "twitter_accounts")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -896,6 +1050,9 @@ class Recommendation(object):
     """
     a recommendation placeholder
     """
+    __slots__ = ("recommendation_id", "recommendation_type", "recommendation_snippet",
+                 "recommendee_name", "recommendee_id", "recommendee_public_url", "recommendee_headline")
+
     def __init__(self):
         self.recommendation_id = None
         self.recommendation_type = None
@@ -919,6 +1076,8 @@ class PREC(object):
     """
     "John Irving recommends Richard Brautigan: 'Richard is my favorite author...'"
     """
+    __slots__ = ("person_name", "person_id", "person_public_url", "person_headline", "recommendations")
+
     def __init__(self):
         self.person_name = None
         self.person_id = None
@@ -944,10 +1103,53 @@ class SVPR(PREC):
     """
     in essence its the same as PREC
     """
+    __slots__ = ()
+
+class UpdateHandler(object):
+    """
+    How the payload of one update type is built and who its source is.
+    'create' builds the payload from the <update-content> element, 'source'
+    returns the (id, name) of the member behind a payload.
+    """
+    __slots__ = ("update_type", "create", "source")
+
+    def __init__(self, update_type, create, source = None):
+        self.update_type = update_type
+        self.create = create
+        self.source = source
+
+# update type -> UpdateHandler, looked up once per update by Update.create
+UPDATE_HANDLERS = {}
+
+def register_update_handler(update_type, create, source = None):
+    """
+    Registers, or replaces, the handler of an update type. The types without a
+    built-in handler (JOBP, CMPY, MSFC) can be decoded this way:
+
+        register_update_handler("JOBP", JobPosting.create, attrgetter("poster_id", "poster_name"))
+    """
+    UPDATE_HANDLERS[update_type] = UpdateHandler(update_type, create, source)
+
+_person_source = attrgetter("person_id", "person_name")
+for _update_class, _source in [(CONN, _person_source), (NCON, attrgetter("person1_id", "person1_name")),
+                               (CCEM, _person_source), (SHAR, attrgetter("sharer_id", "sharer_name")),
+                               (STAT, _person_source), (VIRL, _person_source), (JGRP, _person_source),
+                               (QSTN, None), (ANSW, None), (APPS, _person_source), (APPM, _person_source),
+                               (PICU, _person_source), (PROF, _person_source), (PRFX, _person_source),
+                               (PREC, _person_source), (SVPR, _person_source)]:
+    register_update_handler(_update_class.__name__, _update_class.create, _source)
+del _update_class, _source
 
 #TODO: JOBP, CMPY, MSFC
 
 class Update(object):
+    """
+    An item of the network updates feed. The envelope fields are decoded by
+    create, the type specific payload ('update') only when it is first read.
+    """
+    __slots__ = ("timestamp", "is_commentable", "is_likeable", "is_liked", "update_type", "update_key",
+                 "num_likes", "update_fields", "_update", "_content", "_handler")
+
     def __init__(self):
         self.timestamp = None
         self.is_commentable = None
@@ -957,12 +1159,40 @@ class Update(object):
         self.update_key = None
         self.num_likes = None
         self.update_fields = []
-        self.update = None
+        self._update = None
+        self._content = None # <update-content> element the payload is not built from yet
+        self._handler = None
+
+    def _get_update(self):
+        content = self._content
+        if content is not None:
+            if self._handler is not None:
+                self._update = self._handler.create(content)
+            self._content = None
+        return self._update
+
+    def _set_update(self, update):
+        self._update = update
+        self._content = None
+
+    update = property(_get_update, _set_update)
+
+    def __getstate__(self):
+        state = dict([(x, getattr(self, x)) for x in self.__slots__ if not x.startswith("_")])
+        state["update"] = self.update
+        return state
+
+    def __setstate__(self, state):
+        self._content = None
+        for x, y in state.items():
+            setattr(self, x, y)
+        self._handler = UPDATE_HANDLERS.get(self.update_type)
 
     @staticmethod
     def create(xml_element,update_type):
         update = Update()
         update.update_type = update_type
+        update._handler = UPDATE_HANDLERS.get(update_type)
         update.update_key = get_child_xml(xml_element,"update-key")
         update.timestamp = int(get_child_xml(xml_element,"timestamp"))
         update.is_commentable = str_to_bool(get_child_xml(xml_element,"is-commentable"))
@@ -970,17 +1200,13 @@ class Update(object):
         update.is_liked = str_to_bool(get_child_xml(xml_element,"is-liked"))
         update.num_likes = get_child_xml(xml_element,"num-likes")
         update.update_fields = [get_child_xml(field,"name") for field in get_child_xml(xml_element,"updated-fields",[])]
-        content = xml_element.find("update-content")
-        up = globals().get(update_type,None)
-        if up is not None:
-            update.update = up.create(content)
+        update._content = xml_element.find("update-content")
         return update
 
     def get_source(self):
-        if self.update_type in ("CONN","NCON","CCEM","STAT","VIRL","JGRP","APPS","APPM","PICU","PROF","PRFX","PREC","SVPR"):
-            return self.update.person_id,self.update.person_name
-        elif self.update_type == "SHAR":
-            return self.update.sharer_id,self.update.sharer_name
+        handler = self._handler
+        if handler is not None and handler.source is not None:
+            return handler.source(self.update)
         # this is a special case for update_types that are not yet implemented
         return self.update_type,self.update_type
 
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Iterators over the paginated collections of the API.
+
+LinkedIn returns at most one page of a collection per request, described by
+the total, count and start attributes of the collection element:
+
+    <connections total="1834" count="500" start="0">
+
+    for profile in api.iter_all_connections(page_size = 500):
+        print profile.first_name
+
+    for profile in api.search_cursor({"keywords" : "python"}, fields = ["id", "first-name"],
+                                     concurrency = 4, max_results = 1000):
+        print profile.first_name
+"""
+import sys, threading
+
+from model import Profile
+
+class Page(object):
+    """
+    One page of a collection.
+    """
+    def __init__(self, start, count, total, items):
+        self.start = start
+        self.count = count
+        self.total = total
+        self.items = items
+
+    def __repr__(self):
+        return "Page(start=%d, count=%d, total=%s)" % (self.start, self.count, self.total)
+
+
+class Prefetch(object):
+    """
+    Runs function(*args) on a background thread. result() waits for it and
+    returns its value, or raises its error with the original traceback.
+    """
+    def __init__(self, function, *args):
+        self._function = function
+        self._args = args
+        self._value = None
+        self._exc_info = None
+        self._thread = threading.Thread(target = self._run, name = "linkedin-prefetch")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self._value = self._function(*self._args)
+        except Exception:
+            self._exc_info = sys.exc_info()
+
+    def result(self):
+        self._thread.join()
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._value
+
+
+def read_page(element, start, items):
+    """
+    Builds the Page of a collection element from its total, count and start
+    attributes, falling back on the requested start and the items found.
+    """
+    def attribute(name, default):
+        if element is not None and element.hasAttribute(name):
+            return int(element.getAttribute(name))
+        return default
+    return Page(attribute("start", start), attribute("count", len(items)), attribute("total", None), items)
+
+
+class ConnectionPages(object):
+    """
+    Iterates over all the connections of a member, requesting the pages in
+    sequence. While the caller consumes page N, page N+1 is already being
+    fetched on a background thread.
+
+    Iterating yields Profiles; pages() yields the Page instances. The persons
+    nested in a connection, such as its own connections, are not yielded
+    separately. 'total' is known once the first page arrived.
+    """
+    def __init__(self, api, member_id = None, public_url = None, fields = (), page_size = 500,
+                 prefetch = True):
+        self.api = api
+        self.relative_url = api._connections_url(member_id, public_url, fields)
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.total = None
+
+    def __iter__(self):
+        for page in self.pages():
+            for profile in page.items:
+                yield profile
+
+    def pages(self):
+        pending = None
+        start = 0
+        while True:
+            if pending is not None:
+                page = pending.result()
+            else:
+                page = self.fetch(start)
+            pending = None
+            if page.total is not None:
+                self.total = page.total
+            start = page.start + page.count
+
+            more = page.count > 0 and (self.total is None or start < self.total)
+            if more and self.prefetch:
+                pending = Prefetch(self.fetch, start)
+            yield page
+            if not more:
+                return
+
+    def fetch(self, start):
+        """
+        Requests the page of connections beginning at 'start'.
+        """
+        response = self.api._do_normal_query(self.relative_url, params = {"start" : start, "count" : self.page_size},
+                                             endpoint = "connections")
+        profiles = self.api._parse_people_list(response)
+        return read_page(response.document.documentElement, start, profiles)
+
+
+class SearchCursor(object):
+    """
+    Iterates over the results of a people search. The first page tells the
+    total; the following ones are then requested 'concurrency' at a time on
+    background threads, and their profiles yielded in rank order.
+
+    Iterating yields Profiles; pages() yields the Page instances.
+    """
+    def __init__(self, api, parameters, relative_url, page_size = 25, concurrency = 4, max_results = None):
+        self.api = api
+        self.parameters = dict(parameters or {})
+        self.relative_url = relative_url
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.max_results = max_results
+        self.total = None
+
+    def __iter__(self):
+        for page in self.pages():
+            for profile in page.items:
+                yield profile
+
+    def pages(self):
+        first = self.fetch(0)
+        self.total = first.total
+        if first.total is None or first.count == 0:
+            # Without a total the pages can only be walked one after the other.
+            page = first
+            yield page
+            while page.count > 0 and not self._done(page.start + page.count):
+                page = self.fetch(page.start + page.count)
+                yield page
+            return
+
+        # The server may cap the page size, step by the count it actually returned.
+        starts = iter(xrange(first.start + first.count, self._limit(), first.count))
+        pending = []
+        for start in starts:
+            pending.append(Prefetch(self.fetch, start))
+            if len(pending) == self.concurrency:
+                break
+        yield first
+        while pending:
+            page = pending.pop(0).result()
+            for start in starts:
+                pending.append(Prefetch(self.fetch, start))
+                break
+            yield page
+
+    def fetch(self, start):
+        """
+        Requests the page of results beginning at 'start'.
+        """
+        parameters = dict(self.parameters)
+        parameters["start"] = start
+        parameters["count"] = self.page_size
+        if self.max_results is not None:
+            parameters["count"] = max(0, min(self.page_size, self.max_results - start))
+        response = self.api._do_normal_query(self.relative_url, params = parameters, endpoint = "search")
+        people = response.document.getElementsByTagName("people")
+        people = people and people[0] or None
+        profiles = []
+        if people is not None:
+            for person in people.childNodes:
+                if person.nodeName == "person":
+                    profiles.append(Profile.create(person, self.api._debug, self.api.lazy_profiles,
+                                                   self.api.intern_pool))
+        return read_page(people, start, profiles)
+
+    def _limit(self):
+        limit = self.total
+        if self.max_results is not None:
+            limit = min(limit, self.max_results)
+        return limit
+
+    def _done(self, start):
+        return self.max_results is not None and start >= self.max_results
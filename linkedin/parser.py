@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+"""
+Single pass XML parsing engine for the LinkedIn API responses.
+
+minidom builds a heavy DOM and every getElementsByTagName call on it is a full
+recursive scan of the subtree, which makes Profile.create roughly
+O(fields x nodes). This module drives expat once over the document and builds
+light nodes that index, while parsing, the descendants of the elements the
+model classes query. getElementsByTagName is then a dictionary lookup.
+
+The nodes implement the part of the minidom API the model classes use
+(nodeName, childNodes, nodeValue, getElementsByTagName, hasAttribute,
+attributes, toxml), so Profile.create and its helpers produce the very same
+objects from either tree.
+
+    document = parse_string(xml)
+    profile = Profile.create(document)
+
+    profiles = parse_people(xml) # builds each Profile as soon as its </person> closes
+    for profile in iter_people(chunks): # incremental, the parsed elements are dropped
+        ...
+"""
+import re
+from xml.parsers import expat
+from xml.sax.saxutils import escape
+
+from model import Profile
+
+# Elements the model classes call getElementsByTagName on. Their descendants
+# are indexed by tag name while parsing, the other elements are walked.
+INDEXED_TAGS = frozenset([
+    "person", "connections", "connection", "relation-to-viewer",
+    "location", "country",
+    "positions", "position", "company", "start-date", "end-date",
+    "educations", "education",
+    "skills", "skill", "languages", "language",
+    "site-standard-profile-request",
+    "publication", "publisher", "date",
+    "people", "people-search", "error",
+])
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+# Name of the document element, after the XML declaration, comments and doctype.
+_ROOT_TAG = re.compile(r"(?:\s|<\?.*?\?>|<!--.*?-->|<!DOCTYPE[^>]*>)*<([^\s/>]+)", re.S)
+
+
+class Text(object):
+    __slots__ = ("nodeValue", "parentNode")
+    nodeName = "#text"
+    nodeType = 3
+    childNodes = ()
+
+    def __init__(self, data, parent):
+        self.nodeValue = data
+        self.parentNode = parent
+
+    @property
+    def data(self):
+        return self.nodeValue
+
+    def toxml(self):
+        return escape(self.nodeValue, _ATTRIBUTE_ENTITIES)
+
+
+class CDATASection(Text):
+    __slots__ = ()
+    nodeName = "#cdata-section"
+    nodeType = 4
+
+    def toxml(self):
+        return u"<![CDATA[%s]]>" % self.nodeValue
+
+
+class Comment(Text):
+    __slots__ = ()
+    nodeName = "#comment"
+    nodeType = 8
+
+    def toxml(self):
+        return u"<!--%s-->" % self.nodeValue
+
+
+class Attr(object):
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    @property
+    def nodeValue(self):
+        return self.value
+
+
+class Element(object):
+    """
+    An element of the parsed document.
+    """
+    __slots__ = ("nodeName", "childNodes", "parentNode", "_attributes", "_index")
+    nodeType = 1
+    nodeValue = None
+
+    def __init__(self, tag, attributes, parent, indexed):
+        self.nodeName = tag
+        self.childNodes = []
+        self.parentNode = parent
+        self._attributes = attributes
+        self._index = {} if indexed else None
+
+    @property
+    def tagName(self):
+        return self.nodeName
+
+    @property
+    def attributes(self):
+        return dict([(name, Attr(name, value)) for name, value in self._attributes.items()])
+
+    def hasAttribute(self, name):
+        return name in self._attributes
+
+    def getAttribute(self, name):
+        return self._attributes.get(name, u"")
+
+    def getElementsByTagName(self, tag):
+        """
+        Descendants with the given tag name in document order, like minidom.
+        """
+        if self._index is not None:
+            return list(self._index.get(tag, ()))
+        result = []
+        self._collect(tag, result)
+        return result
+
+    def _collect(self, tag, result):
+        for child in self.childNodes:
+            if child.nodeType == 1:
+                if child.nodeName == tag:
+                    result.append(child)
+                child._collect(tag, result)
+
+    def toxml(self):
+        parts = []
+        self._write(parts)
+        return u"".join(parts)
+
+    def _write(self, parts):
+        parts.append(u"<" + self.nodeName)
+        for name in sorted(self._attributes):
+            parts.append(u' %s="%s"' % (name, escape(self._attributes[name], _ATTRIBUTE_ENTITIES)))
+        if not self.childNodes:
+            parts.append(u"/>")
+            return
+        parts.append(u">")
+        for child in self.childNodes:
+            if child.nodeType == 1:
+                child._write(parts)
+            else:
+                parts.append(child.toxml())
+        parts.append(u"</%s>" % self.nodeName)
+
+
+class Document(Element):
+    __slots__ = ()
+    nodeType = 9
+
+    def __init__(self):
+        Element.__init__(self, "#document", {}, None, True)
+
+    @property
+    def documentElement(self):
+        for child in self.childNodes:
+            if child.nodeType == 1:
+                return child
+        return None
+
+    def toxml(self):
+        return u'<?xml version="1.0" ?>' + Element.toxml(self.documentElement)
+
+
+class TreeBuilder(object):
+    """
+    expat handlers building the indexed tree. 'on_start(element)' is called when
+    an element opens and 'on_end(element)' when it closes, once all its
+    descendants are known.
+    """
+    def __init__(self, on_start = None, on_end = None):
+        self.document = Document()
+        self._on_start = on_start
+        self._on_end = on_end
+        self._current = self.document
+        self._indexed = [self.document] # open elements that index their descendants
+        self._text = None  # character data of the text node being built
+        self._text_class = Text
+
+        self.parser = expat.ParserCreate()
+        self.parser.buffer_text = True
+        self.parser.ordered_attributes = False
+        self.parser.StartElementHandler = self.start_element
+        self.parser.EndElementHandler = self.end_element
+        self.parser.CharacterDataHandler = self.character_data
+        self.parser.StartCdataSectionHandler = self.start_cdata
+        self.parser.EndCdataSectionHandler = self.end_cdata
+        self.parser.CommentHandler = self.comment
+
+    def feed(self, data, final = False):
+        self.parser.Parse(data, final)
+
+    def parse(self, data):
+        self.feed(data, True)
+        return self.document
+
+    def clear(self, element):
+        """
+        Drops a closed element and the text before it from the tree, and
+        empties the indexes of the open elements, so that streaming consumers
+        keep memory flat. Those open elements can no longer be queried.
+        """
+        del element.parentNode.childNodes[:]
+        element.parentNode = None
+        for ancestor in self._indexed:
+            ancestor._index.clear()
+
+    def start_element(self, tag, attributes):
+        if self._text is not None:
+            self._flush_text()
+        parent = self._current
+        indexed = tag in INDEXED_TAGS
+        element = Element(tag, attributes, parent, indexed)
+        parent.childNodes.append(element)
+        for ancestor in self._indexed:
+            index = ancestor._index
+            if tag in index:
+                index[tag].append(element)
+            else:
+                index[tag] = [element]
+        if indexed:
+            self._indexed.append(element)
+        self._current = element
+        if self._on_start is not None:
+            self._on_start(element)
+
+    def end_element(self, tag):
+        if self._text is not None:
+            self._flush_text()
+        element = self._current
+        if element._index is not None:
+            self._indexed.pop()
+        self._current = element.parentNode
+        if self._on_end is not None:
+            self._on_end(element)
+
+    def character_data(self, data):
+        if self._current is self.document:
+            return
+        if self._text is None:
+            self._text = data
+        else:
+            self._text += data
+
+    def start_cdata(self):
+        if self._text is not None:
+            self._flush_text()
+        self._text_class = CDATASection
+        self._text = u""
+
+    def end_cdata(self):
+        self._flush_text()
+        self._text_class = Text
+
+    def comment(self, data):
+        if self._text is not None:
+            self._flush_text()
+        self._current.childNodes.append(Comment(data, self._current))
+
+    def _flush_text(self):
+        data = self._text
+        self._text = None
+        children = self._current.childNodes
+        if self._text_class is Text and children and children[-1].__class__ is Text:
+            children[-1].nodeValue += data
+        elif data:
+            children.append(self._text_class(data, self._current))
+
+
+class Response(object):
+    """
+    The body of an API response, parsed at most once.
+
+    The error envelope is detected by sniffing the name of the document element,
+    only <error> documents are parsed for that. The 'document' tree of the
+    Profile builders is built on first use and kept; the Update builders stream
+    'data' through updates.iter_updates instead.
+    """
+    def __init__(self, data):
+        self.data = data or ""
+        self._document = None
+
+    @property
+    def root_tag(self):
+        match = _ROOT_TAG.match(self.data.lstrip("\xef\xbb\xbf"))
+        if match is None:
+            return None
+        return match.group(1)
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = parse_string(self.data)
+        return self._document
+
+    @property
+    def error(self):
+        """
+        The message of an <error> response, None for any other response.
+        """
+        if self.root_tag != "error":
+            return None
+        messages = self.document.getElementsByTagName("message")
+        if messages and messages[0].childNodes:
+            return messages[0].childNodes[0].nodeValue
+        return "Unknown error"
+
+    def __len__(self):
+        return len(self.data)
+
+    def __str__(self):
+        return self.data
+
+
+def parse_string(xml):
+    """
+    Parses a whole document, the counterpart of minidom.parseString.
+    """
+    return TreeBuilder().parse(xml)
+
+def parse_people(xml, debug = False, lazy = False, intern_pool = None):
+    """
+    Builds a Profile for every <person> of the document, nested ones included,
+    in document order like document.getElementsByTagName("person") would.
+    Each Profile is built while parsing, as soon as its person element closes.
+    """
+    people = _PeopleBuilder(debug, lazy, intern_pool = intern_pool)
+    people.builder.parse(xml)
+    return people.ready()
+
+def iter_people(chunks, debug = False, lazy = False, intern_pool = None):
+    """
+    Incremental parse_people over an iterable of string chunks, such as an HTTP
+    response body read from the socket. The Profiles are yielded as soon as
+    their top level </person> closes, followed by the ones nested in it, and
+    the parsed elements are dropped. An <error> document raises ErrorResponse.
+    """
+    people = _PeopleBuilder(debug, lazy, clear = True, intern_pool = intern_pool)
+    for chunk in chunks:
+        people.builder.feed(chunk)
+        for profile in people.ready():
+            yield profile
+    people.builder.feed("", True)
+    document_element = people.builder.document.documentElement
+    if document_element is not None and document_element.nodeName == "error":
+        raise ErrorResponse(document_element.toxml().encode("utf-8"))
+    for profile in people.ready():
+        yield profile
+
+
+class ErrorResponse(Exception):
+    """
+    Raised by iter_people when the API answered with an <error> document.
+    """
+    def __init__(self, xml):
+        Exception.__init__(self, xml)
+        self.xml = xml
+
+
+class _PeopleBuilder(object):
+    """
+    Builds the Profiles of the person elements while the TreeBuilder parses.
+    A slot is reserved when a person opens so that the Profiles come out in
+    document order although the nested persons close first.
+    """
+    def __init__(self, debug, lazy = False, clear = False, intern_pool = None):
+        self.debug = debug
+        self.lazy = lazy
+        self.intern_pool = intern_pool
+        self.builder = TreeBuilder(self.on_start, self.on_end)
+        self._clear = clear
+        self._profiles = []
+        self._handed_out = 0 # number of slots ready() removed from the list
+        self._slots = {}
+        self._depth = 0 # number of open person elements
+        self._complete = 0 # number of slots whose top level person closed
+
+    def on_start(self, element):
+        if element.nodeName == "person":
+            self._slots[id(element)] = self._handed_out + len(self._profiles)
+            self._profiles.append(None)
+            self._depth += 1
+
+    def on_end(self, element):
+        if element.nodeName == "person":
+            slot = self._slots.pop(id(element)) - self._handed_out
+            self._profiles[slot] = Profile.create(element, self.debug, self.lazy, self.intern_pool)
+            self._depth -= 1
+            if not self._depth:
+                self._complete = len(self._profiles)
+                if self._clear:
+                    self.builder.clear(element)
+
+    def ready(self):
+        """
+        Returns the Profiles of the top level persons closed so far and of the
+        persons nested in them.
+        """
+        profiles = self._profiles[:self._complete]
+        del self._profiles[:self._complete]
+        self._handed_out += self._complete
+        self._complete = 0
+        return [profile for profile in profiles if profile is not None]
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Keep-alive HTTPS connection pooling for the LinkedIn API.
+
+Every LinkedIn instance in the process talks to the API endpoint through the
+same pool, so the TCP and TLS handshakes are paid once per socket instead of
+once per API call.
+
+    from linkedin import pool
+    pool.configure(pool_size = 20, idle_timeout = 60)
+"""
+import httplib, socket, select, threading, time
+
+DEFAULT_POOL_SIZE    = 10   # live connections per endpoint
+DEFAULT_IDLE_TIMEOUT = 30.0 # seconds an idle socket is trusted to be alive
+
+_settings = {"pool_size": DEFAULT_POOL_SIZE,
+             "idle_timeout": DEFAULT_IDLE_TIMEOUT,
+             "timeout": None}
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Methods whose request may be sent twice without harm.
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class HTTPSConnectionPool(object):
+    """
+    A bounded, thread-safe pool of keep-alive HTTPS connections to one host.
+
+    At most 'pool_size' connections are open at the same time; callers block
+    until one is released. Idle connections older than 'idle_timeout' seconds,
+    or whose socket was closed by the server, are dropped on checkout.
+    A request that fails on a reused socket is sent again once on a fresh one,
+    when the failure came before the request was written out or the method is
+    idempotent: a POST the server may have received is never sent twice.
+    """
+    connection_class = httplib.HTTPSConnection
+
+    def __init__(self, host, pool_size = DEFAULT_POOL_SIZE,
+                 idle_timeout = DEFAULT_IDLE_TIMEOUT, timeout = None):
+        self.host = host
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._idle = [] # (connection, last used) pairs, most recent last
+        self._in_use = 0
+        self._condition = threading.Condition(threading.Lock())
+
+    def request(self, method, url, body = None, headers = None):
+        """
+        Performs the request on a pooled connection.
+        @Returns: (response, data) where data is the whole response body.
+        """
+        if not headers: headers = {}
+
+        connection, reused = self._acquire()
+        try:
+            connection, response = self._open(connection, reused, method, url, body, headers)
+            data = response.read()
+        except:
+            connection.close()
+            self._release(None)
+            raise
+
+        if response.will_close:
+            connection.close()
+            connection = None
+        self._release(connection)
+        return response, data
+
+    def stream(self, method, url, body = None, headers = None, chunk_size = 16384, on_response = None):
+        """
+        Performs the request on a pooled connection and yields the response body
+        in chunks of at most 'chunk_size' bytes as they arrive from the socket.
+        The connection goes back to the pool once the body is consumed. If the
+        generator is closed early the connection, whose body was left unread,
+        is closed instead.
+        'on_response(response)' is called with the status and headers read,
+        before any of the body is yielded; it may read the body and raise to
+        refuse the response.
+        """
+        if not headers: headers = {}
+
+        connection, reused = self._acquire()
+        try:
+            connection, response = self._open(connection, reused, method, url, body, headers)
+        except:
+            connection.close()
+            self._release(None)
+            raise
+
+        finished = False
+        try:
+            if on_response is not None:
+                on_response(response)
+            while True:
+                data = response.read(chunk_size)
+                if not data:
+                    break
+                yield data
+            finished = True
+        finally:
+            if not finished or response.will_close:
+                connection.close()
+                connection = None
+            self._release(connection)
+
+    def resize(self, pool_size = None, idle_timeout = None):
+        self._condition.acquire()
+        try:
+            if pool_size is not None:
+                self.pool_size = pool_size
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+            while len(self._idle) > self.pool_size:
+                self._idle.pop(0)[0].close()
+            self._condition.notifyAll()
+        finally:
+            self._condition.release()
+
+    def close(self):
+        """
+        Closes every idle connection. Connections in use are closed when released.
+        """
+        self._condition.acquire()
+        try:
+            idle, self._idle = self._idle, []
+        finally:
+            self._condition.release()
+        for connection, last_used in idle:
+            connection.close()
+
+    def num_idle(self):
+        return len(self._idle)
+
+    def num_in_use(self):
+        return self._in_use
+
+    def _open(self, connection, reused, method, url, body, headers):
+        """
+        Sends the request and reads the response status and headers.
+        @Returns: the connection used, a fresh one when the reused one was
+        found closed, and the response
+        """
+        written = False
+        try:
+            connection.request(method, url, body = body, headers = headers)
+            written = True
+            return connection, connection.getresponse()
+        except (httplib.HTTPException, socket.error):
+            connection.close()
+            if not reused or (written and method not in IDEMPOTENT_METHODS):
+                raise
+
+        # The server closed the keep-alive socket under us, reconnect.
+        connection = self._new_connection()
+        try:
+            connection.request(method, url, body = body, headers = headers)
+            return connection, connection.getresponse()
+        except:
+            connection.close()
+            raise
+
+    def _new_connection(self):
+        if self.timeout is None:
+            return self.connection_class(self.host)
+        return self.connection_class(self.host, timeout = self.timeout)
+
+    def _acquire(self):
+        self._condition.acquire()
+        try:
+            while self._in_use >= self.pool_size:
+                self._condition.wait()
+            self._in_use += 1
+
+            now = time.time()
+            while self._idle:
+                connection, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout and not self._is_dropped(connection):
+                    return connection, True
+                connection.close()
+        finally:
+            self._condition.release()
+        return self._new_connection(), False
+
+    def _release(self, connection):
+        self._condition.acquire()
+        try:
+            self._in_use -= 1
+            if connection is not None:
+                if len(self._idle) < self.pool_size:
+                    self._idle.append((connection, time.time()))
+                else:
+                    connection.close()
+            self._condition.notify()
+        finally:
+            self._condition.release()
+
+    def _is_dropped(self, connection):
+        """
+        An idle keep-alive socket should have nothing to read. If it is readable
+        the server either closed it or sent garbage, both make it unusable.
+        """
+        sock = getattr(connection, "sock", None)
+        if sock is None:
+            return True
+        try:
+            return bool(select.select([sock], [], [], 0.0)[0])
+        except (select.error, socket.error, ValueError):
+            return True
+
+
+def get_pool(host):
+    """
+    Returns the process wide connection pool of the given host.
+    """
+    _pools_lock.acquire()
+    try:
+        connection_pool = _pools.get(host)
+        if connection_pool is None:
+            connection_pool = HTTPSConnectionPool(host, **_settings)
+            _pools[host] = connection_pool
+        return connection_pool
+    finally:
+        _pools_lock.release()
+
+def configure(pool_size = None, idle_timeout = None, timeout = None):
+    """
+    Changes the settings of every pool, the existing ones included.
+    @pool_size: maximum number of live connections per endpoint
+    @idle_timeout: seconds after which an idle connection is discarded
+    @timeout: socket timeout of new connections, None for the system default
+    """
+    _pools_lock.acquire()
+    try:
+        if pool_size is not None:
+            _settings["pool_size"] = pool_size
+        if idle_timeout is not None:
+            _settings["idle_timeout"] = idle_timeout
+        if timeout is not None:
+            _settings["timeout"] = timeout
+        pools = _pools.values()
+    finally:
+        _pools_lock.release()
+
+    for connection_pool in pools:
+        connection_pool.timeout = _settings["timeout"]
+        connection_pool.resize(pool_size, idle_timeout)
+
+def close_all():
+    _pools_lock.acquire()
+    try:
+        pools = _pools.values()
+    finally:
+        _pools_lock.release()
+    for connection_pool in pools:
+        connection_pool.close()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Retries of the failed API calls and a circuit breaker in front of the API.
+
+A RetryPolicy calls the API again after a transient failure, a socket error,
+a broken HTTP exchange or a 5xx status, waiting an exponential delay with
+full jitter between the attempts. Only the idempotent calls, the GETs, are
+retried. The retries are drawn from a budget that each call refills by
+'budget_ratio', so that during an outage the retries stay a small share of
+the calls instead of multiplying them.
+
+Its CircuitBreaker opens after 'failure_threshold' failures in a row: while
+open every call fails at once with CircuitOpen, then after 'reset_timeout'
+seconds a single probe call is let through, which closes the breaker when it
+succeeds and opens it again when it fails.
+
+    from linkedin.retry import RetryPolicy, CircuitBreaker
+    api.retry_policy = RetryPolicy(max_attempts = 4, base_delay = 0.5, max_delay = 10,
+                                   breaker = CircuitBreaker(failure_threshold = 10, reset_timeout = 30))
+"""
+import httplib, random, socket, threading, time
+
+# HTTP statuses of the failures worth another attempt.
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class ServerError(Exception):
+    """
+    A response with one of the RETRY_STATUSES. 'data' is its body, an error
+    document of LinkedIn or the page of a proxy.
+    """
+    def __init__(self, status, data):
+        Exception.__init__(self, "HTTP %d" % status)
+        self.status = status
+        self.data = data
+
+class CircuitOpen(Exception):
+    """
+    A call refused by an open CircuitBreaker, 'retry_after' seconds before the
+    next probe.
+    """
+    def __init__(self, retry_after):
+        Exception.__init__(self, "LinkedIn API unavailable, circuit open for %.1f more seconds" % retry_after)
+        self.retry_after = retry_after
+
+# Failures another attempt may not hit.
+TRANSIENT_ERRORS = (socket.error, httplib.HTTPException, ServerError)
+
+
+class CircuitBreaker(object):
+    """
+    Thread-safe breaker, shared by every call of the policy it belongs to.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold = 5, reset_timeout = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0 # in a row
+        self._opened = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before(self):
+        """
+        Lets a call through, or raises CircuitOpen. Once the reset timeout is
+        over, the first caller becomes the probe and the other ones keep
+        failing fast until it is done.
+        """
+        self._lock.acquire()
+        try:
+            if self.state == self.CLOSED:
+                return
+            remaining = self._opened + self.reset_timeout - time.time()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpen(max(remaining, 0))
+        finally:
+            self._lock.release()
+
+    def success(self):
+        self._lock.acquire()
+        try:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+        finally:
+            self._lock.release()
+
+    def release(self):
+        """
+        Ends a call that did not tell whether the API is up, such as one refused
+        before it was sent.
+        """
+        self._lock.acquire()
+        try:
+            self._probing = False
+        finally:
+            self._lock.release()
+
+    def failure(self):
+        self._lock.acquire()
+        try:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened = time.time()
+                self._probing = False
+        finally:
+            self._lock.release()
+
+
+class RetryPolicy(object):
+    """
+    Up to 'max_attempts' attempts per idempotent call, the n-th retry waiting
+    a random delay between 0 and min(max_delay, base_delay * 2 ** (n - 1)) seconds.
+    The budget holds at most 'budget' retries and gains 'budget_ratio' of a
+    retry per call; a failure arriving with an empty budget is not retried.
+    """
+    def __init__(self, max_attempts = 3, base_delay = 0.5, max_delay = 10.0, budget = 10,
+                 budget_ratio = 0.2, breaker = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.budget_ratio = budget_ratio
+        self.breaker = breaker or CircuitBreaker()
+
+        self._balance = float(budget)
+        self._lock = threading.Lock()
+
+        self.retries = 0
+        self.exhausted = 0 # failures not retried for lack of budget
+
+    def call(self, function, args = (), idempotent = True, answers = ()):
+        """
+        Calls function(*args) until it succeeds, it fails with an error that is
+        not transient, or the attempts or the budget are spent. The 'answers'
+        are the errors carrying a response of the API, such as a 4xx: they tell
+        that the API is up and close the breaker like a success. Any other error
+        is a call that did not reach the API.
+        @Returns: the result of the function
+        """
+        self._deposit()
+        attempt = 0
+        while True:
+            self.breaker.before()
+            try:
+                result = function(*args)
+            except TRANSIENT_ERRORS:
+                self.breaker.failure()
+                attempt += 1
+                if not idempotent or attempt >= self.max_attempts or not self._withdraw():
+                    raise
+                self._sleep(self.delay(attempt))
+                continue
+            except answers:
+                self.breaker.success()
+                raise
+            except:
+                self.breaker.release()
+                raise
+            self.breaker.success()
+            return result
+
+    def delay(self, attempt):
+        """
+        Seconds to wait before the retry number 'attempt', from 1.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def stats(self):
+        return {"retries" : self.retries, "exhausted" : self.exhausted, "budget" : self._balance,
+                "circuit" : self.breaker.state}
+
+    def _deposit(self):
+        self._lock.acquire()
+        try:
+            self._balance = min(self.budget, self._balance + self.budget_ratio)
+        finally:
+            self._lock.release()
+
+    def _withdraw(self):
+        self._lock.acquire()
+        try:
+            if self._balance < 1:
+                self.exhausted += 1
+                return False
+            self._balance -= 1
+            self.retries += 1
+            return True
+        finally:
+            self._lock.release()
+
+    def _sleep(self, seconds):
+        time.sleep(seconds)
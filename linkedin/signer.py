@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+HMAC-SHA1 signing of the OAuth 1.0a requests.
+
+A Signer is made once per (consumer secret, token secret) pair: it quotes the
+key and keys the HMAC once, and only copies the keyed state for each request.
+The quoted form of the constant oauth parameters is computed once as well.
+
+    signer = Signer(api_secret, token_secret, {"oauth_consumer_key" : api_key, ...})
+    query_dict["oauth_signature"] = signer.sign("GET", url, query_dict)
+"""
+import binascii, hashlib, hmac, os, string, urllib
+
+# The characters OAuth leaves unquoted.
+UNRESERVED = string.ascii_letters + string.digits + "-._~"
+
+def quote(value):
+    """
+    Percent-encodes a value as OAuth does, UTF-8 first for unicode. Values
+    made of unreserved characters only, such as the nonces, the timestamps
+    and most parameter names, are returned as they are.
+    """
+    if isinstance(value, unicode):
+        value = value.encode("utf-8")
+    elif not isinstance(value, str):
+        value = str(value)
+    if not value.translate(None, UNRESERVED):
+        return value
+    return urllib.quote(value, safe = '~')
+
+def nonce(length = 20):
+    """
+    A random string of 'length' hexadecimal digits.
+    """
+    return binascii.hexlify(os.urandom((length + 1) // 2))[:length]
+
+class Signer(object):
+    """
+    Signs the requests of one consumer secret and token secret.
+    'constants' are the oauth parameters whose values are the same for every
+    request, such as oauth_consumer_key, quoted once here.
+    """
+    def __init__(self, consumer_secret, token_secret = None, constants = None):
+        self.key = quote(consumer_secret) + "&"
+        if token_secret:
+            self.key += quote(token_secret)
+        self._hmac = hmac.new(self.key, digestmod = hashlib.sha1)
+        self._quoted = {}
+        self._names = {} # quoted parameter names, few and repeated
+        for name, value in (constants or {}).items():
+            self._quoted[(name, value)] = (quote(name), quote(value))
+
+    def pairs(self, query_dict):
+        """
+        The quoted (name, value) pairs of the parameters, sorted as OAuth signs
+        them. A list or tuple value stands for the parameter repeated.
+        """
+        quoted = self._quoted
+        names = self._names
+        pairs = []
+        for name, value in query_dict.iteritems():
+            if isinstance(value, (list, tuple)):
+                pairs.extend([(quote(name), quote(item)) for item in value])
+                continue
+            try:
+                pair = quoted.get((name, value))
+            except TypeError: # unhashable values are quoted on each call
+                pair = None
+            if pair is None:
+                quoted_name = names.get(name)
+                if quoted_name is None:
+                    quoted_name = names[name] = quote(name)
+                pair = (quoted_name, quote(value))
+            pairs.append(pair)
+        pairs.sort()
+        return pairs
+
+    def base_string(self, method, url, query_dict):
+        query_string = "&".join(["%s=%s" % pair for pair in self.pairs(query_dict)])
+        return "&".join([quote(method), quote(url), quote(query_string)])
+
+    def sign(self, method, url, query_dict):
+        """
+        @Returns: the base64 HMAC-SHA1 signature of the request
+        """
+        hashed = self._hmac.copy()
+        hashed.update(self.base_string(method, url, query_dict))
+        return binascii.b2a_base64(hashed.digest())[:-1]
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+Client side throttling of the API calls.
+
+LinkedIn throttles each call type per application and per member, by the
+second and by the day. A RateLimiter holds the calls back before they are
+sent instead: each relative url is classified in one of BUCKETS, then has to
+pass the token buckets (calls per second, with bursts) and the daily quotas
+configured for its type, for the whole application and for the access token.
+
+    from linkedin.throttle import RateLimiter, QuotaLedger
+    api.rate_limiter = RateLimiter(
+        app_rates = {"profile" : (50, 100)},   # 50 calls per second, bursts of 100
+        token_rates = {"search" : (1, 5)},     # per member
+        app_quotas = {"profile" : 100000},     # calls per day, the days being UTC ones
+        token_quotas = {"search" : 100, "mailbox" : 10},
+        ledger = QuotaLedger("/var/lib/linkedin/quotas.db")) # daily counts survive restarts
+
+A call over a rate waits for its turn, or raises Throttled when the limiter
+does not block or when the wait is longer than max_wait. A call over a daily
+quota raises Throttled right away. LinkedIn.rate_limiter raises them as
+RateLimitError.
+"""
+import hashlib, re, threading, time
+
+from cache import LocalConnections
+
+BUCKETS = ("profile", "connections", "search", "updates", "mailbox", "shares")
+
+_SELECTOR = re.compile(r":+\(.*$")
+
+def classify(relative_url):
+    """
+    @Returns: the throttle bucket of an API url, None for the urls that are
+    not throttled such as the OAuth ones
+    """
+    path = _SELECTOR.sub("", relative_url.split("?", 1)[0])
+    if path.startswith("/v1/people-search"):
+        return "search"
+    if not path.startswith("/v1/people"):
+        return None
+    if "/network" in path:
+        return "updates"
+    if path.endswith("/mailbox"):
+        return "mailbox"
+    if path.endswith("/shares") or path.endswith("/current-status"):
+        return "shares"
+    if path.endswith("/connections"):
+        return "connections"
+    return "profile"
+
+def today():
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+def seconds_to_midnight():
+    """
+    Seconds until the next UTC day, when the daily quotas start over.
+    """
+    now = time.time()
+    return 86400 - now % 86400
+
+def _scope(access_token):
+    # The tokens never reach the ledger file.
+    return "token:" + hashlib.sha1(access_token or "").hexdigest()
+
+
+class Throttled(Exception):
+    """
+    A call held back by the RateLimiter. 'limit' is "rate" or "quota",
+    'retry_after' the seconds after which the call would pass.
+    """
+    def __init__(self, bucket, limit, scope, retry_after):
+        Exception.__init__(self, "%s %s limit of the %s reached, retry in %.1f seconds" % (
+            bucket, limit, scope, retry_after))
+        self.bucket = bucket
+        self.limit = limit
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class TokenBucket(object):
+    """
+    'rate' calls per second on average, up to 'capacity' at once.
+    """
+    def __init__(self, rate, capacity = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.time()
+
+    def delay(self, now):
+        """
+        Seconds to wait for a token, 0 when one is available.
+        """
+        # 'now' may be read just before the bucket was made.
+        self.tokens = min(self.capacity, self.tokens + max(now - self.updated, 0) * self.rate)
+        self.updated = max(now, self.updated)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def give_back(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def full(self, now):
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class QuotaLedger(object):
+    """
+    Counts of the calls per day, scope ("app" or an access token) and bucket.
+    They are kept in memory, or in a sqlite file when a path is given so that
+    they survive restarts and are shared by the processes of the host. The
+    counts of the past days are dropped.
+    """
+    def __init__(self, path = None, timeout = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._counts = {} # (day, scope, bucket) -> count, without path
+        self._day = None
+        self._lock = threading.Lock()
+        if path is not None:
+            # Autocommit, consume opens its own transactions.
+            self._connections = LocalConnections(path, ("PRAGMA journal_mode = WAL",),
+                                                 timeout = timeout, isolation_level = None)
+            connection = self._connection()
+            connection.execute("""CREATE TABLE IF NOT EXISTS quotas (
+                                      day TEXT,
+                                      scope TEXT,
+                                      bucket TEXT,
+                                      count INTEGER,
+                                      PRIMARY KEY (day, scope, bucket))""")
+
+    def consume(self, bucket, quotas, day = None):
+        """
+        Counts one call of the bucket in every scope of 'quotas', a list of
+        (scope, quota) pairs, if none of them has reached its quota.
+        @Returns: None when the call was counted, else the first exhausted scope
+        """
+        day = day or today()
+        if self.path is None:
+            self._lock.acquire()
+            try:
+                if day != self._day:
+                    self._counts = dict([(key, count) for key, count in self._counts.items() if key[0] >= day])
+                    self._day = day
+                for scope, quota in quotas:
+                    if self._counts.get((day, scope, bucket), 0) >= quota:
+                        return scope
+                for scope, quota in quotas:
+                    key = (day, scope, bucket)
+                    self._counts[key] = self._counts.get(key, 0) + 1
+                return None
+            finally:
+                self._lock.release()
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE") # no other process counts in between
+        try:
+            if day != self._day:
+                connection.execute("DELETE FROM quotas WHERE day < ?", (day,))
+                self._day = day
+            for scope, quota in quotas:
+                if self._count(connection, day, scope, bucket) >= quota:
+                    connection.execute("ROLLBACK")
+                    return scope
+            for scope, quota in quotas:
+                connection.execute("INSERT OR REPLACE INTO quotas (day, scope, bucket, count) VALUES (?, ?, ?, ?)",
+                                   (day, scope, bucket, self._count(connection, day, scope, bucket) + 1))
+            connection.execute("COMMIT")
+            return None
+        except:
+            connection.execute("ROLLBACK")
+            raise
+
+    def count(self, scope, bucket, day = None):
+        """
+        The calls of the bucket counted for a scope on a day, today by default.
+        """
+        day = day or today()
+        if self.path is None:
+            return self._counts.get((day, scope, bucket), 0)
+        return self._count(self._connection(), day, scope, bucket)
+
+    def _count(self, connection, day, scope, bucket):
+        row = connection.execute("SELECT count FROM quotas WHERE day = ? AND scope = ? AND bucket = ?",
+                                 (day, scope, bucket)).fetchone()
+        return row and row[0] or 0
+
+    def _connection(self):
+        return self._connections.get()
+
+
+class RateLimiter(object):
+    """
+    Token buckets and daily quotas per call type, for the whole application
+    and per access token. The rates are (calls per second, burst) pairs and
+    the quotas calls per UTC day, both in dicts keyed by bucket name; the
+    call types missing from them are not limited.
+    """
+    # Beyond this many token buckets, the full ones, of idle tokens, are dropped.
+    MAX_TOKEN_BUCKETS = 10000
+
+    def __init__(self, app_rates = None, token_rates = None, app_quotas = None, token_quotas = None,
+                 ledger = None, block = True, max_wait = None):
+        self.app_rates = dict(app_rates or {})
+        self.token_rates = dict(token_rates or {})
+        self.app_quotas = dict(app_quotas or {})
+        self.token_quotas = dict(token_quotas or {})
+        self.ledger = ledger or QuotaLedger()
+        self.block = block
+        self.max_wait = max_wait # seconds a blocked call may wait, None for no limit
+
+        self._app_buckets = {}
+        self._token_buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, relative_url, access_token = None, block = None):
+        """
+        Waits until the call of the url may be sent and counts it, or raises
+        Throttled. 'block' overrides the block of the limiter for this call.
+        @Returns: the bucket of the url
+        """
+        if block is None:
+            block = self.block
+        bucket = classify(relative_url)
+        if bucket is None:
+            return None
+
+        while True:
+            self._lock.acquire()
+            try:
+                now = time.time()
+                token_buckets = self._buckets(bucket, access_token, now)
+                delays = [(token_bucket.delay(now), scope) for scope, token_bucket in token_buckets]
+                delay, scope = max(delays or [(0, None)])
+                if not delay:
+                    for scope, token_bucket in token_buckets:
+                        token_bucket.take()
+                    break
+            finally:
+                self._lock.release()
+            if not block or (self.max_wait is not None and delay > self.max_wait):
+                raise Throttled(bucket, "rate", scope, delay)
+            self._sleep(delay)
+
+        quotas = []
+        if bucket in self.app_quotas:
+            quotas.append(("app", self.app_quotas[bucket]))
+        if bucket in self.token_quotas:
+            quotas.append((_scope(access_token), self.token_quotas[bucket]))
+        if quotas:
+            exhausted = self.ledger.consume(bucket, quotas)
+            if exhausted is not None:
+                # The call is not sent, its rate tokens go to the next ones.
+                self._lock.acquire()
+                try:
+                    for scope, token_bucket in token_buckets:
+                        token_bucket.give_back()
+                finally:
+                    self._lock.release()
+                raise Throttled(bucket, "quota", exhausted == "app" and "app" or "token", seconds_to_midnight())
+        return bucket
+
+    def usage(self, bucket, access_token = None):
+        """
+        The calls of the bucket counted today for the application, or for an access token.
+        """
+        return self.ledger.count(access_token is None and "app" or _scope(access_token), bucket)
+
+    def _buckets(self, bucket, access_token, now):
+        result = []
+        if bucket in self.app_rates:
+            token_bucket = self._app_buckets.get(bucket)
+            if token_bucket is None:
+                token_bucket = self._app_buckets[bucket] = TokenBucket(*self.app_rates[bucket])
+            result.append(("app", token_bucket))
+        if bucket in self.token_rates:
+            key = (access_token, bucket)
+            token_bucket = self._token_buckets.get(key)
+            if token_bucket is None:
+                if len(self._token_buckets) >= self.MAX_TOKEN_BUCKETS:
+                    for old_key, old_bucket in self._token_buckets.items():
+                        if old_bucket.full(now):
+                            del self._token_buckets[old_key]
+                token_bucket = self._token_buckets[key] = TokenBucket(*self.token_rates[bucket])
+            result.append(("token", token_bucket))
+        return result
+
+    def _sleep(self, seconds):
+        time.sleep(seconds)
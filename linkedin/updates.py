@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental parsing of the network updates feed.
+
+The feed lists the updates newest first. iter_updates parses it while it is
+read from the socket and builds each Update as soon as its element closes, so
+a caller can stop at the first update it has already seen without reading or
+parsing the rest of the feed.
+
+    for update in api.get_new_updates(): # only the updates since the last call
+        print update.update_key
+
+    api.get_updates(types = ["SHAR", "CONN", "PROF"])
+"""
+from xml.etree import cElementTree
+
+from model import Update, get_child_xml
+from parser import ErrorResponse
+
+class HighWaterMark(object):
+    """
+    The newest point of the feed seen so far: the timestamp of the newest update
+    and the keys of the updates carrying that timestamp, since several updates
+    can share one millisecond.
+    """
+    def __init__(self, timestamp = None, keys = ()):
+        self.timestamp = timestamp
+        self.keys = set(keys)
+
+    def seen(self, timestamp, update_key):
+        """
+        True for the updates at or below the mark. The feed being sorted newest
+        first, every update after a seen one was seen too.
+        """
+        if self.timestamp is None:
+            return False
+        return timestamp < self.timestamp or (timestamp == self.timestamp and update_key in self.keys)
+
+    def advance(self, updates):
+        """
+        Returns the mark moved past the given updates.
+        """
+        mark = HighWaterMark(self.timestamp, self.keys)
+        for update in updates:
+            if mark.timestamp is None or update.timestamp > mark.timestamp:
+                mark.timestamp = update.timestamp
+                mark.keys = set([update.update_key])
+            elif update.timestamp == mark.timestamp:
+                mark.keys.add(update.update_key)
+        return mark
+
+    def __repr__(self):
+        return "HighWaterMark(%r, %r)" % (self.timestamp, sorted(self.keys))
+
+
+class _ChunkReader(object):
+    """
+    File-like view of an iterable of string chunks, for iterparse.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+
+    def read(self, size = -1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += self._chunks.next()
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def close(self):
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def iter_updates(chunks, mark = None, types = None):
+    """
+    Parses an updates feed read in chunks and yields its Update instances in
+    feed order, each one as soon as its element closes. With a HighWaterMark,
+    parsing and reading stop at the first update the mark has seen. With a
+    collection of update types, the other updates are dropped before any
+    Update is built for them. The children of the document element other
+    than <update> are dropped.
+    An <error> document raises parser.ErrorResponse.
+    """
+    if types is not None:
+        types = frozenset(types)
+    reader = _ChunkReader(chunks)
+    root = None
+    depth = 0
+    try:
+        for event, element in cElementTree.iterparse(reader, events = ("start", "end")):
+            if event == "start":
+                depth += 1
+                if root is None:
+                    root = element
+                continue
+            depth -= 1
+            if depth != 1 or root.tag == "error":
+                continue
+            if element.tag != "update":
+                root.remove(element)
+                continue
+            if mark is not None:
+                timestamp = get_child_xml(element, "timestamp")
+                if timestamp is not None and mark.seen(int(timestamp), get_child_xml(element, "update-key")):
+                    return
+            update_type = get_child_xml(element, "update-type")
+            update = None
+            if types is None or update_type in types:
+                update = Update.create(element, update_type)
+            root.remove(element)
+            if update is not None:
+                yield update
+        if root is not None and root.tag == "error":
+            raise ErrorResponse(cElementTree.tostring(root))
+    finally:
+        reader.close()
@@ -0,0 +1,81 @@
+import unittest
+import datetime
+from linkedin.linkedin import *
+from linkedin.batch import ProfileBatch
+from benchmarks.payloads import connections_xml
+
+try:
+    import numpy
+    from linkedin import analytics
+except ImportError:
+    numpy = None
+
+TODAY = datetime.date(2012, 6, 1)
+
+def months(start, end):
+    end = end or TODAY
+    return (end.year - start.year) * 12 + end.month - start.month
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class AnalyticsTest(unittest.TestCase):
+
+    def setUp(self):
+        api = LinkedIn("key", "secret", "http://localhost")
+        api._access_token = "token"
+        api._access_token_secret = "token secret"
+        api._https_connection = lambda method, relative_url, query_dict, body=None: connections_xml(300)
+        self.profiles = api.get_connections()
+        self.batch = api.get_connections(columnar = True)
+
+    def counts(self, values):
+        counts = {}
+        for value in values:
+            counts[value] = counts.get(value, 0) + 1
+        return sorted(counts.items(), key = lambda item: (-item[1], item[0]))
+
+    def test_histograms(self):
+        self.assertEquals(self.counts([p.industry for p in self.profiles]), analytics.industry_histogram(self.batch))
+        self.assertEquals(self.counts([p.location.name for p in self.profiles])[:3],
+                          analytics.location_histogram(self.profiles, by = "name", top = 3))
+        self.assertEquals(self.counts([p.location.country_code for p in self.profiles]),
+                          analytics.location_histogram(self.batch))
+
+    def test_tenure(self):
+        tenures = [months(p.start_date, p.end_date) for profile in self.profiles for p in profile.positions]
+        result = analytics.tenure_distribution(self.batch, today = TODAY)
+        self.assertEquals(len(tenures), result["count"])
+        self.assertAlmostEquals(float(sum(tenures)) / len(tenures), result["mean"])
+        self.assertEquals((min(tenures), max(tenures)), (result["min"], result["max"]))
+        self.assertEquals(len(tenures), sum(result["histogram"][0]))
+
+        current = analytics.tenure_distribution(self.profiles, current = True, today = TODAY)
+        self.assertEquals(len(self.profiles), current["count"])
+
+    def test_career_length(self):
+        careers = [months(min([p.start_date for p in profile.positions]),
+                          max([p.end_date or TODAY for p in profile.positions]))
+                   for profile in self.profiles]
+        result = analytics.career_length_distribution(self.batch, today = TODAY)
+        self.assertEquals(len(careers), result["count"])
+        self.assertAlmostEquals(float(sum(careers)) / len(careers), result["mean"])
+        self.assertEquals(max(careers), result["max"])
+
+    def test_members_without_positions(self):
+        batch = ProfileBatch.from_profiles([Profile(), self.profiles[0], Profile()])
+        self.assertEquals(1, analytics.career_length_distribution(batch, today = TODAY)["count"])
+        self.assertEquals(0, analytics.career_length_distribution([Profile()])["count"])
+        self.assertEquals([], analytics.current_employers([Profile()]))
+
+    def test_current_employers(self):
+        expected = self.counts([p.company.name for profile in self.profiles for p in profile.positions
+                                if p.is_current])
+        self.assertEquals(expected, analytics.current_employers(self.batch))
+
+        profile = self.profiles[0]
+        company = [p for p in profile.positions if p.is_current][0].company.name
+        profile.positions.append(profile.positions[0])
+        counts = dict(analytics.current_employers([profile]))
+        self.assertEquals({company : 1}, counts)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from linkedin.asynchronous import *
+from linkedin.linkedin import LinkedinError, HTTPError, RateLimitError
+from linkedin.throttle import RateLimiter
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person>
+  <id>sqvX__QhX3</id>
+  <first-name>Iftach</first-name>
+  <last-name>Bar</last-name>
+</person>"""
+
+ERROR = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<error>
+  <status>404</status>
+  <message>Couldn't find member</message>
+</error>"""
+
+class CannedRequest(object):
+    responses = []
+    sent = []
+
+    def __init__(self, host, request, on_done, socket_map, timeout):
+        CannedRequest.sent.append(request)
+        status, body = parse_http_response(CannedRequest.responses.pop(0))
+        on_done(status, body, None)
+
+class ParseHttpResponseTest(unittest.TestCase):
+
+    def test_plain_body(self):
+        status, body = parse_http_response("HTTP/1.1 200 OK\r\nContent-Length: 3\r\n\r\nabc")
+        self.assertEquals(200, status)
+        self.assertEquals("abc", body)
+
+    def test_chunked_body(self):
+        raw = "HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n2;x=y\r\nde\r\n0\r\n\r\n"
+        status, body = parse_http_response(raw)
+        self.assertEquals("abcde", body)
+
+    def test_incomplete(self):
+        self.assertRaises(LinkedinError, parse_http_response, "HTTP/1.1 200 OK\r\n")
+
+class AsyncLinkedInTest(unittest.TestCase):
+
+    def setUp(self):
+        CannedRequest.responses = []
+        CannedRequest.sent = []
+        self.api = AsyncLinkedIn("key", "secret", "http://localhost")
+        self.api.request_class = CannedRequest
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+
+    def test_get_profile(self):
+        CannedRequest.responses.append("HTTP/1.1 200 OK\r\n\r\n" + PROFILE)
+        result = self.api.get_profile(member_id = "sqvX__QhX3", fields = ["id", "first-name"])
+        self.assertTrue(result.done())
+        self.assertEquals("Iftach", result.result().first_name)
+        self.assertTrue(CannedRequest.sent[0].startswith("GET /v1/people/id=sqvX__QhX3:(id,first-name) HTTP/1.1\r\n"))
+        self.assertTrue("Authorization: OAuth realm=" in CannedRequest.sent[0])
+
+    def test_error_is_raised_by_result(self):
+        CannedRequest.responses.append("HTTP/1.1 404 Not Found\r\n\r\n" + ERROR)
+        result = self.api.get_profile()
+        self.assertRaises(LinkedinError, result.result)
+
+    def test_failed_status_is_raised_by_result(self):
+        CannedRequest.responses.append("HTTP/1.1 502 Bad Gateway\r\n\r\n<html><body>502 Bad Gateway</body></html>")
+        result = self.api.get_profile()
+        try:
+            result.result()
+            self.fail()
+        except HTTPError, error:
+            self.assertEquals(502, error.status)
+
+    def test_post_body(self):
+        CannedRequest.responses.append("HTTP/1.1 201 Created\r\n\r\n")
+        calls = []
+        result = self.api.set_status("Testing linkedin API")
+        result.add_callback(calls.append)
+        self.assertEquals([result], calls)
+        self.assertEquals(None, result.result())
+        self.assertTrue(CannedRequest.sent[0].startswith("PUT /v1/people/~/current-status HTTP/1.1\r\n"))
+        self.assertTrue(CannedRequest.sent[0].endswith("<current-status>Testing linkedin API</current-status>"))
+
+    def test_rate_limit_fails_the_result(self):
+        self.api.rate_limiter = RateLimiter(app_rates = {"profile" : (0.001, 1)})
+        self.api.rate_limiter._sleep = self.fail # the loop thread never waits
+        CannedRequest.responses.append("HTTP/1.1 200 OK\r\n\r\n" + PROFILE)
+        self.assertEquals("Iftach", self.api.get_profile().result().first_name)
+        result = self.api.get_profile()
+        self.assertTrue(result.done())
+        try:
+            result.result()
+            self.fail()
+        except RateLimitError, error:
+            self.assertTrue(error.retry_after > 0)
+        self.assertEquals(1, len(CannedRequest.sent))
+
+    def test_pending_result(self):
+        result = AsyncResult()
+        self.assertFalse(result.done())
+        self.assertRaises(LinkedinError, result.result)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from array import array
+from linkedin.linkedin import *
+from linkedin.batch import ProfileBatch, MISSING
+from benchmarks.payloads import connections_xml
+
+EDUCATIONS = """<connections total="2">
+<person>
+  <id>a</id>
+  <first-name>Ada</first-name>
+  <educations total="2">
+    <education><id>1</id><school-name>MIT</school-name><degree>BS</degree>
+      <start-date><year>1990</year></start-date><end-date><year>1994</year></end-date></education>
+    <education><id>2</id><school-name>Stanford</school-name></education>
+  </educations>
+</person>
+<person><id>b</id><first-name>Bob</first-name></person>
+</connections>"""
+
+class ProfileBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.response = connections_xml(50)
+        self.api._https_connection = lambda method, relative_url, query_dict, body=None: self.response
+
+    def test_columns_match_the_profiles(self):
+        profiles = self.api.get_connections()
+        batch = self.api.get_connections(columnar = True)
+        self.assertEquals(50, len(batch))
+        self.assertEquals([p.id for p in profiles], batch.id)
+        self.assertEquals([p.industry for p in profiles], batch.industry)
+        self.assertEquals([p.location.country_code for p in profiles], batch.location_country_code)
+        self.assertEquals(array("l", [int(p.num_connections) for p in profiles]), batch.num_connections)
+        self.assertEquals([p.private_url for p in profiles], batch.private_url)
+
+        offsets = batch.position_offsets
+        self.assertEquals(51, len(offsets))
+        self.assertEquals(sum([len(p.positions) for p in profiles]), len(batch.positions))
+        for i, profile in enumerate(profiles):
+            self.assertEquals([position.company.name for position in profile.positions],
+                              batch.positions.company_name[offsets[i]:offsets[i + 1]])
+
+    def test_rows_are_profiles(self):
+        profiles = self.api.get_connections()
+        batch = self.api.get_connections(columnar = True)
+        for profile, row in zip(profiles, batch):
+            self.assertEquals((profile.first_name, profile.location.name, int(profile.num_connections)),
+                              (row.first_name, row.location.name, row.num_connections))
+            self.assertEquals([(p.id, p.title, p.is_current, p.start_date, p.end_date, p.company.id)
+                               for p in profile.positions],
+                              [(p.id, p.title, p.is_current, p.start_date, p.end_date, p.company.id)
+                               for p in row.positions])
+        self.assertEquals(profiles[-1].id, batch[-1].id)
+        self.assertRaises(IndexError, lambda: batch[50])
+
+    def test_educations(self):
+        self.response = EDUCATIONS
+        batch = self.api.get_search({"keywords" : "ada"}, columnar = True)
+        self.assertEquals(array("l", [0, 2, 2]), batch.education_offsets)
+        self.assertEquals(["MIT", "Stanford"], batch.educations.school_name)
+        self.assertEquals(array("l", [1990, MISSING]), batch.educations.start_year)
+        self.assertEquals(MISSING, batch.num_connections[1])
+        self.assertEquals(None, batch[1].location)
+        education = batch[0].educations[0]
+        self.assertEquals(("BS", 1994), (education.degree, education.end_date.year))
+
+    def test_profile_decoders_are_shared(self):
+        self.response = """<connections total="1"><person><id>c</id>
+          <public-profile-url>http://www.linkedin.com/in/c?a=1&amp;amp;b=2</public-profile-url>
+          <connections total="42"><connection><person><id>d</id></person></connection></connections>
+        </person></connections>"""
+        profile = self.api.get_connections()[0]
+        batch = self.api.get_connections(columnar = True)
+        self.assertEquals(42, profile.num_connections)
+        self.assertEquals(42, batch.num_connections[0])
+        self.assertEquals(profile.public_url, batch.public_url[0])
+
+    def test_from_profiles(self):
+        batch = self.api.get_connections(columnar = True)
+        copy = ProfileBatch.from_profiles(self.api.get_connections())
+        self.assertEquals(batch.columns, copy.columns)
+        # the Profiles lost which months were missing, model.parse_date made them January
+        del batch.positions.columns["end_month"], copy.positions.columns["end_month"]
+        self.assertEquals(batch.positions.columns, copy.positions.columns)
+        self.assertEquals(batch.position_offsets, copy.position_offsets)
+
+    def test_to_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            return
+        batch = self.api.get_connections(columnar = True)
+        columns = batch.to_numpy()
+        columns["num_connections"][0] = 7
+        self.assertEquals(7, batch.num_connections[0])
+        self.assertEquals(batch.industry, list(columns["industry"]))
+        self.assertEquals(len(batch.positions), len(columns["positions.company_name"]))
+
+if __name__ == "__main__":
+    unittest.main()
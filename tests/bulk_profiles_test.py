@@ -0,0 +1,68 @@
+import unittest
+import re
+from linkedin.linkedin import *
+
+PEOPLE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<people total="%d">%s</people>"""
+
+PERSON = """
+  <person>
+    <id>%s</id>
+    <first-name>First %s</first-name>
+    <connections total="1">
+      <connection><person><id>nested</id></person></connection>
+    </connections>
+  </person>"""
+
+ERROR = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<error>
+  <status>400</status>
+  <message>Invalid member id {bad}</message>
+</error>"""
+
+class BulkProfilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.urls = []
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = self._fake_connection
+
+    def _fake_connection(self, method, relative_url, query_dict, body=None):
+        self.urls.append(relative_url)
+        ids = re.match(r"/v1/people::\((.*)\):", relative_url).group(1)
+        ids = [member_id[3:] for member_id in ids.split(",")]
+        if "bad" in ids:
+            return ERROR
+        ids = [member_id for member_id in ids if member_id != "gone"]
+        return PEOPLE % (len(ids), "".join([PERSON % (member_id, member_id) for member_id in ids]))
+
+    def test_single_chunk(self):
+        profiles = self.api.get_profiles(["a1", "b2", "a1"], fields=["first-name"])
+        self.assertEquals(["/v1/people::(id=a1,id=b2):(id,first-name)"], self.urls)
+        self.assertEquals(["a1", "b2"], sorted(profiles.keys()))
+        self.assertEquals("First b2", profiles["b2"].first_name)
+        self.assertEquals([], profiles.failures)
+        self.assertEquals([], profiles.missing)
+
+    def test_chunks_fit_url_length(self):
+        self.api.MAX_URL_LENGTH = 60
+        ids = ["member%02d" % i for i in range(20)]
+        profiles = self.api.get_profiles(ids, fields=["id"])
+        self.assertTrue(len(self.urls) > 1)
+        for url in self.urls:
+            self.assertTrue(len(url) <= 60, url)
+        self.assertEquals(sorted(ids), sorted(profiles.keys()))
+
+    def test_partial_failure(self):
+        self.api.MAX_URL_LENGTH = 35
+        profiles = self.api.get_profiles(["ok1", "ok2", "ok3", "bad", "ok4", "gone"], fields=["id"])
+        self.assertEquals(1, len(profiles.failures))
+        self.assertTrue("bad" in profiles.failed_ids())
+        self.assertTrue(isinstance(profiles.failures[0][1], LinkedinError))
+        self.assertEquals(["gone"], profiles.missing)
+        self.assertEquals(["ok1", "ok2", "ok4"], sorted(profiles.keys()))
+
+if __name__ == "__main__":
+    unittest.main()
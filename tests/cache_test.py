@@ -0,0 +1,134 @@
+import unittest
+import time
+from linkedin.cache import ResponseCache
+from linkedin.linkedin import *
+from linkedin import pool
+
+SEARCH = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<people-search><people total="1"><person><id>%s</id></person></people></people-search>"""
+
+BAD_GATEWAY = "<html><body><h1>502 Bad Gateway</h1></body></html>"
+
+class FakeResponse(object):
+    def __init__(self, status):
+        self.status = status
+
+class FakePool(object):
+    # Answers with the next of self.answers, (status, body) pairs.
+    def __init__(self, answers):
+        self.answers = answers
+        self.requests = 0
+
+    def request(self, method, url, body = None, headers = None):
+        self.requests += 1
+        status, data = self.answers.pop(0)
+        return FakeResponse(status), data
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person><id>%s</id><first-name>First</first-name></person>"""
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_lru_eviction_by_entries(self):
+        cache = ResponseCache(max_entries = 2)
+        cache.set("a", "1", "profile")
+        cache.set("b", "2", "profile")
+        cache.get("a")
+        cache.set("c", "3", "profile")
+        self.assertEquals("1", cache.get("a"))
+        self.assertEquals(None, cache.get("b"))
+        self.assertEquals("3", cache.get("c"))
+        self.assertEquals(1, cache.stats()["evictions"])
+
+    def test_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes = 10)
+        cache.set("a", "x" * 6, "profile")
+        cache.set("b", "y" * 6, "profile")
+        self.assertEquals(None, cache.get("a"))
+        self.assertEquals(6, cache.stats()["bytes"])
+        cache.set("c", "z" * 11, "profile")
+        self.assertEquals(None, cache.get("c"))
+
+    def test_ttl_per_endpoint(self):
+        cache = ResponseCache(ttls = {"search" : 0.05, "connections" : 0})
+        cache.set("a", "1", "search")
+        cache.set("b", "2", "profile")
+        cache.set("c", "3", "connections")
+        time.sleep(0.06)
+        self.assertEquals(None, cache.get("a"))
+        self.assertEquals("2", cache.get("b"))
+        self.assertEquals(None, cache.get("c"))
+        stats = cache.stats()
+        self.assertEquals((1, 2, 1), (stats["hits"], stats["misses"], stats["expirations"]))
+
+    def test_key(self):
+        self.assertEquals(ResponseCache.key("t", "/v1/people/~", {"a" : 1, "b" : 2}),
+                          ResponseCache.key("t", "/v1/people/~", {"b" : 2, "a" : 1}))
+        self.assertNotEquals(ResponseCache.key("t", "/v1/people/~"), ResponseCache.key("u", "/v1/people/~"))
+        self.assertEquals(ResponseCache.key("t", "/v1/people-search", {"facet" : ["network,F", "industry,4"]}),
+                          ResponseCache.key("t", "/v1/people-search", {"facet" : ("industry,4", "network,F")}))
+        hash(ResponseCache.key("t", "/v1/people-search", {"facet" : []}))
+
+class CachedQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.urls = []
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = self._fake_connection
+        self.api.cache = ResponseCache()
+
+    def _fake_connection(self, method, relative_url, query_dict, body=None):
+        self.urls.append(relative_url)
+        if "bad" in relative_url:
+            return "<error><message>Not found</message></error>"
+        if "people-search" in relative_url:
+            return SEARCH % len(self.urls)
+        return PROFILE % len(self.urls)
+
+    def test_hit_skips_the_request(self):
+        self.assertEquals("1", self.api.get_profile(member_id = "42").id)
+        self.assertEquals("1", self.api.get_profile(member_id = "42").id)
+        self.assertEquals(1, len(self.urls))
+        self.assertEquals("2", self.api.get_profile(member_id = "42", fields = ["id"]).id)
+        self.api._access_token = "other token"
+        self.assertEquals("3", self.api.get_profile(member_id = "42").id)
+
+    def test_errors_and_writes_are_not_cached(self):
+        self.assertRaises(LinkedinError, self.api.get_profile, member_id = "bad")
+        self.assertRaises(LinkedinError, self.api.get_profile, member_id = "bad")
+        self.api.clear_status()
+        self.api.clear_status()
+        self.assertEquals(4, len(self.urls))
+        self.assertEquals(0, len(self.api.cache))
+
+    def test_repeated_parameters(self):
+        self.api.get_search({"facet" : ["industry,4", "network,F"]})
+        self.api.get_search({"facet" : ["network,F", "industry,4"]})
+        self.api.get_search({"facet" : ["network,F"]})
+        self.assertEquals(2, len(self.urls))
+
+    def test_failed_statuses_are_not_cached(self):
+        fake_pool = FakePool([(502, BAD_GATEWAY), (200, PROFILE % "ok")])
+        api = LinkedIn("key", "secret", "http://localhost")
+        api._access_token, api._access_token_secret = "token", "token secret"
+        api.cache = ResponseCache()
+        get_pool = pool.get_pool
+        pool.get_pool = lambda host: fake_pool
+        try:
+            try:
+                api.get_profile()
+                self.fail()
+            except HTTPError, error:
+                self.assertEquals(502, error.status)
+                self.assertEquals("HTTP 502", error._error)
+            self.assertEquals(0, len(api.cache))
+            self.assertEquals("ok", api.get_profile().id)
+            self.assertEquals("ok", api.get_profile().id)
+        finally:
+            pool.get_pool = get_pool
+        self.assertEquals(2, fake_pool.requests)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import threading, time
+from linkedin.linkedin import *
+from linkedin.cache import ResponseCache
+from linkedin.coalesce import SingleFlight
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person><id>%s</id><first-name>%s</first-name></person>"""
+
+class FakeLinkedIn(LinkedIn):
+    # Answers once self.release is set, so that the calls pile up meanwhile.
+    def _https_connection(self, method, relative_url, query_dict, body=None):
+        self.requests.append((query_dict["oauth_token"], relative_url))
+        self.release.wait()
+        if self.fail:
+            raise LinkedinError("broken")
+        return PROFILE % (query_dict["oauth_token"], relative_url)
+
+class SingleFlightTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FakeLinkedIn("key", "secret", "http://localhost")
+        self.api._access_token, self.api._access_token_secret = "token", "secret"
+        self.api.requests = self.requests = []
+        self.api.release = self.release = threading.Event()
+        self.api.fail = False
+        self.api.single_flight = SingleFlight()
+
+    def concurrently(self, calls):
+        results = [None] * len(calls)
+        def work(i):
+            try:
+                results[i] = calls[i]()
+            except Exception, error:
+                results[i] = error
+        threads = [threading.Thread(target = work, args = (i,)) for i in range(len(calls))]
+        for thread in threads:
+            thread.start()
+        while self.api.single_flight.stats()["shared"] + self.api.single_flight.stats()["calls"] < len(calls):
+            time.sleep(0.001)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_calls_share_one_request(self):
+        profiles = self.concurrently([self.api.get_profile] * 20)
+        self.assertEquals(1, len(self.requests))
+        self.assertEquals(set(["token"]), set([profile.id for profile in profiles]))
+        # one parsed response, but a profile per caller
+        self.assertEquals(20, len(set([id(profile) for profile in profiles])))
+        self.assertEquals({"calls" : 1, "shared" : 19, "in_flight" : 0}, self.api.single_flight.stats())
+
+        self.api.get_profile()
+        self.assertEquals(2, len(self.requests))
+
+    def test_different_calls_are_not_shared(self):
+        first = self.api.session("first", "secret")
+        second = self.api.session("second", "secret")
+        results = self.concurrently([first.get_profile, second.get_profile, first.get_profile,
+                                     lambda: first.get_profile(member_id = "abc"),
+                                     lambda: first.get_profile_raw("~", params = {"a" : "1"}),
+                                     lambda: first.get_profile_raw("~", params = {"a" : "2"})])
+        self.assertEquals(5, len(self.requests))
+        self.assertEquals(["first", "second", "first"], [profile.id for profile in results[:3]])
+
+    def test_repeated_parameters(self):
+        results = self.concurrently([lambda: self.api.get_profile_raw("~", params = {"a" : ["1", "2"]}),
+                                     lambda: self.api.get_profile_raw("~", params = {"a" : ("2", "1")}),
+                                     lambda: self.api.get_profile_raw("~", params = {"a" : ["1"]})])
+        self.assertEquals(2, len(self.requests))
+
+    def test_errors_are_shared(self):
+        self.api.fail = True
+        results = self.concurrently([self.api.get_profile] * 5)
+        self.assertEquals(1, len(self.requests))
+        for result in results:
+            self.assertTrue(isinstance(result, LinkedinError))
+        self.api.fail = False
+        self.assertEquals("token", self.api.get_profile().id)
+
+    def test_cache_misses_are_fetched_once(self):
+        self.api.cache = ResponseCache()
+        self.concurrently([lambda: self.api.get_profile(member_id = "abc")] * 10)
+        self.api.get_profile(member_id = "abc")
+        self.assertEquals(1, len(self.requests))
+        self.assertEquals(1, self.api.cache.stats()["hits"])
+
+    def test_writes_are_not_coalesced(self):
+        self.release.set()
+        self.api.set_status("hello")
+        self.api.set_status("hello")
+        self.assertEquals(2, len(self.requests))
+        self.assertEquals(0, self.api.single_flight.stats()["calls"])
+
+if __name__ == "__main__":
+    unittest.main()
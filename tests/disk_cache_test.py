@@ -0,0 +1,92 @@
+import unittest
+import os, shutil, tempfile, time
+from multiprocessing import Process
+from linkedin.cache import ResponseCache, DiskCache, TieredCache
+
+def _write(path, count):
+    cache = DiskCache(path)
+    for i in range(count):
+        cache.set(("token", "/v1/people/id=%d" % i, ()), "<person>%d</person>" % i, "profile")
+
+class DiskCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "responses.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_survives_restarts(self):
+        key = DiskCache.key("token", "/v1/people/~", {"a" : "1"})
+        DiskCache(self.path).set(key, "<person>\xc3\xa9</person>", "profile")
+        cache = DiskCache(self.path)
+        self.assertEquals("<person>\xc3\xa9</person>", cache.get(key))
+        self.assertEquals(None, cache.get(DiskCache.key("other token", "/v1/people/~", {"a" : "1"})))
+        self.assertEquals((1, 1), (cache.hits, cache.misses))
+        self.assertFalse("token" in open(self.path, "rb").read())
+
+    def test_ttl(self):
+        cache = DiskCache(self.path, ttls = {"search" : 0.05})
+        cache.set("a", "1", "search")
+        cache.set("b", "2", "connections")
+        time.sleep(0.06)
+        self.assertEquals(None, cache.get("a"))
+        self.assertEquals("2", cache.get("b"))
+        cache.compact()
+        self.assertEquals(1, len(cache))
+        self.assertEquals(2, cache.expirations)
+
+    def test_compaction_keeps_the_newest(self):
+        cache = DiskCache(self.path, max_bytes = 100)
+        for i in range(10):
+            cache.set(str(i), "x" * 20, "profile", fetched = time.time() - 10 + i)
+        cache.compact()
+        self.assertEquals(5, len(cache))
+        self.assertEquals(None, cache.get("4"))
+        self.assertEquals("x" * 20, cache.get("5"))
+        self.assertEquals(5, cache.evictions)
+
+    def test_file_shrinks(self):
+        cache = DiskCache(self.path)
+        for i in range(200):
+            cache.set(("token", "/v1/people/id=%d" % i, ()), "<person>%s</person>" % ("x" * 8000), "profile")
+        full = os.path.getsize(self.path)
+        cache.invalidate()
+        self.assertTrue(os.path.getsize(self.path) < full / 10)
+
+    def test_old_files_get_auto_vacuum(self):
+        import sqlite3
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("CREATE TABLE responses (key TEXT PRIMARY KEY, endpoint TEXT, fetched REAL, "
+                           "size INTEGER, data BLOB)")
+        connection.commit()
+        connection.close()
+        cache = DiskCache(self.path)
+        self.assertEquals(2, cache._connection().execute("PRAGMA auto_vacuum").fetchone()[0])
+
+    def test_shared_by_processes(self):
+        cache = DiskCache(self.path)
+        workers = [Process(target = _write, args = (self.path, 50)) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEquals(0, worker.exitcode)
+        self.assertEquals(50, len(cache))
+        self.assertEquals("<person>7</person>", cache.get(("token", "/v1/people/id=7", ())))
+
+    def test_tiers(self):
+        memory = ResponseCache()
+        disk = DiskCache(self.path)
+        fetched = time.time() - 100
+        disk.set("a", "1", "connections", fetched)
+        cache = TieredCache(memory, disk)
+        self.assertEquals("1", cache.get("a"))
+        self.assertEquals(("1", "connections", fetched), memory.get_entry("a"))
+        cache.set("b", "2", "profile")
+        self.assertEquals("2", disk.get("b"))
+
+if __name__ == "__main__":
+    unittest.main()
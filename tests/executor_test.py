@@ -0,0 +1,64 @@
+import unittest
+import threading, time
+from linkedin.executor import *
+from linkedin.linkedin import LinkedIn, LinkedinError
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person><id>%s</id><first-name>First %s</first-name></person>"""
+
+class ExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = self._fake_connection
+        self.executor = LinkedInExecutor(self.api, workers = 4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _fake_connection(self, method, relative_url, query_dict, body=None):
+        self.lock.acquire()
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.lock.release()
+        member_id = relative_url.split("=")[1]
+        # later ids answer first so that completion order differs from submission order
+        time.sleep(0.05 / int(member_id))
+        self.lock.acquire()
+        self.active -= 1
+        self.lock.release()
+        if member_id == "13":
+            raise LinkedinError("throttled")
+        return PROFILE % (member_id, member_id)
+
+    def test_map_keeps_submission_order(self):
+        calls = [Call.profile(member_id = str(i)) for i in range(1, 9)]
+        profiles = self.executor.map(calls)
+        self.assertEquals([str(i) for i in range(1, 9)], [p.id for p in profiles])
+        self.assertTrue(self.max_active > 1)
+        self.assertTrue(self.max_active <= 4)
+
+    def test_as_completed(self):
+        calls = [Call.profile(member_id = str(i)) for i in range(1, 5)]
+        done = list(self.executor.as_completed(calls))
+        self.assertEquals(4, len(done))
+        self.assertEquals(set(range(4)), set([d.index for d in done]))
+        self.assertEquals("First 3", [d for d in done if d.index == 2][0].result().first_name)
+
+    def test_errors(self):
+        calls = [Call.profile(member_id = "12"), Call.profile(member_id = "13")]
+        self.assertRaises(LinkedinError, self.executor.map, calls)
+        done = sorted(self.executor.as_completed(calls), key = lambda d: d.index)
+        self.assertEquals(None, done[0].error)
+        self.assertTrue(isinstance(done[1].error, LinkedinError))
+
+    def test_call_repr(self):
+        self.assertEquals("get_search({'keywords': 'python'})", repr(Call.search({"keywords" : "python"})))
+
+if __name__ == "__main__":
+    unittest.main()
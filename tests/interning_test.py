@@ -0,0 +1,67 @@
+import unittest
+import threading
+from linkedin.linkedin import *
+from linkedin import parser
+from linkedin.interning import InternPool
+from benchmarks.payloads import connections_xml
+
+class InternPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = lambda method, relative_url, query_dict, body=None: connections_xml(200)
+        self.api.intern_pool = InternPool()
+
+    def shared(self, values):
+        return len(set([id(value) for value in values]))
+
+    def test_repeated_values_are_shared(self):
+        profiles = self.api.get_connections()
+        plain = LinkedIn("key", "secret", "http://localhost")
+        plain._https_connection = self.api._https_connection
+        plain._access_token, plain._access_token_secret = "token", "token secret"
+        expected = plain.get_connections()
+
+        self.assertEquals([(p.industry, p.location.name, p.location.country_code) for p in expected],
+                          [(p.industry, p.location.name, p.location.country_code) for p in profiles])
+        industries = set([p.industry for p in profiles])
+        self.assertEquals(len(industries), self.shared([p.industry for p in profiles]))
+        locations = set([(p.location.name, p.location.country_code) for p in profiles])
+        self.assertEquals(len(locations), self.shared([p.location for p in profiles]))
+        companies = [position.company for p in profiles for position in p.positions]
+        self.assertEquals(len(set([c.name for c in companies])), self.shared(companies))
+
+        stats = self.api.intern_pool.stats()
+        self.assertEquals(len(locations), stats["locations"])
+        self.assertTrue(stats["hits"] > stats["misses"])
+        self.assertTrue(stats["bytes_saved"] > 0)
+
+    def test_streaming_and_lazy_profiles(self):
+        profiles = list(parser.iter_people([connections_xml(50)], intern_pool = self.api.intern_pool))
+        self.api.lazy_profiles = True
+        lazy = self.api.get_connections()
+        self.assertTrue(lazy[0].industry is profiles[0].industry)
+        self.assertTrue(lazy[0].location is profiles[0].location)
+        self.assertEquals(profiles[0].industry, lazy[0].industry)
+
+    def test_threads(self):
+        results = []
+        def connections():
+            results.append(self.api.get_connections())
+        threads = [threading.Thread(target = connections) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(1, self.shared([profiles[7].location for profiles in results]))
+
+    def test_clear(self):
+        pool = InternPool()
+        self.assertTrue(pool.string(u"Internet") is pool.string(u"".join([u"Inter", u"net"])))
+        pool.clear()
+        self.assertEquals(0, pool.stats()["strings"])
+
+if __name__ == "__main__":
+    unittest.main()
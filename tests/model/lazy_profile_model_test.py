@@ -0,0 +1,55 @@
+import unittest
+import pickle
+from linkedin import parser
+from linkedin.model import *
+
+PERSON = """<person><id>42</id><first-name>Ada</first-name><headline>Engineer</headline>
+<picture-url>http://media.linkedin.com/a?b=1&amp;c=2</picture-url>
+<location><name>London</name><country><code>gb</code></country></location>
+<connections total="1"><connection><person><id>7</id><first-name>Charles</first-name></person></connection></connections>
+<positions total="1"><position><id>1</id><title>Engineer</title><is-current>true</is-current>
+<start-date><year>1842</year></start-date><company><name>Analytical</name></company></position></positions>
+<skills><skill><name>Math</name></skill></skills></person>"""
+
+def is_decoded(profile, name):
+    try:
+        Profile.__dict__[name].__get__(profile, LazyProfile)
+        return True
+    except AttributeError:
+        return False
+
+class LazyProfileModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile.create(parser.parse_string(PERSON), lazy = True)
+
+    def test_fields_are_decoded_on_first_access(self):
+        self.assertTrue(isinstance(self.profile, LazyProfile))
+        self.assertFalse(is_decoded(self.profile, "first_name"))
+        self.assertEquals("Ada", self.profile.first_name)
+        self.assertTrue(is_decoded(self.profile, "first_name"))
+        self.assertFalse(is_decoded(self.profile, "positions"))
+        self.assertFalse(is_decoded(self.profile, "connections"))
+        self.assertEquals(1, self.profile.num_connections)
+
+    def test_same_values_as_eager(self):
+        eager = Profile.create(parser.parse_string(PERSON))
+        self.assertEquals(repr(eager), repr(self.profile).replace("LazyProfile", "Profile", 1))
+        self.assertEquals("Analytical", self.profile.positions[0].company.name)
+        self.assertTrue(self.profile.positions is self.profile.positions)
+        self.assertRaises(AttributeError, getattr, self.profile, "unknown")
+
+    def test_assignment_wins(self):
+        self.profile.headline = "Countess"
+        self.assertEquals("Countess", self.profile.headline)
+
+    def test_pickle(self):
+        copy = pickle.loads(pickle.dumps(self.profile))
+        self.assertEquals(repr(self.profile), repr(copy))
+
+    def test_parse_people(self):
+        profiles = parser.parse_people("<people>%s</people>" % PERSON, lazy = True)
+        self.assertEquals(["42", "7"], [p.id for p in profiles])
+
+if __name__ == "__main__":
+    unittest.main()
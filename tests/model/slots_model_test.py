@@ -0,0 +1,41 @@
+import unittest
+import pickle
+from xml.etree import cElementTree
+from linkedin import parser
+from linkedin.model import *
+
+PERSON = """<person><id>42</id><first-name>Ada</first-name>
+<location><name>London</name><country><code>gb</code></country></location>
+<positions total="1"><position><id>1</id><title>Engineer</title>
+<company><name>Analytical</name></company></position></positions></person>"""
+
+class SlotsModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.profile = Profile.create(parser.parse_string(PERSON))
+
+    def test_no_instance_dict(self):
+        for model in (self.profile, self.profile.location, self.profile.positions[0],
+                      self.profile.positions[0].company, Update(), SHAR(), SVPR()):
+            self.assertFalse(hasattr(model, "__dict__"), model)
+        self.assertRaises(AttributeError, setattr, self.profile, "unknown", 1)
+
+    def test_repr(self):
+        self.assertEquals("linkedin.model.Location " + repr({'country_code': u'gb', 'name': u'London'}),
+                          repr(self.profile.location))
+        self.assertTrue("'first_name': u'Ada'" in repr(self.profile))
+        self.assertFalse("last_name" in repr(self.profile))
+
+    def test_pickle(self):
+        for protocol in (0, 2):
+            copy = pickle.loads(pickle.dumps(self.profile, protocol))
+            self.assertEquals(repr(self.profile), repr(copy))
+
+    def test_attributes_set_outside_init(self):
+        xml = cElementTree.fromstring("<position><id>1</id><title>T</title>"
+                                      "<company><id>7</id><name>C</name></company></position>")
+        position = PositionUpd.create(xml)
+        self.assertEquals(("1", "7", "C"), (position.id, position.company_id, position.company_name))
+
+if __name__ == "__main__":
+    unittest.main()
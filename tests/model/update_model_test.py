@@ -0,0 +1,82 @@
+import unittest
+import pickle
+from xml.etree import cElementTree
+from linkedin.model import *
+
+STAT_UPDATE = """<update>
+  <timestamp>1285087000000</timestamp>
+  <update-key>STAT-1</update-key>
+  <update-type>STAT</update-type>
+  <update-content>
+    <person>
+      <id>C4Xk8TAqQN</id>
+      <first-name>Taylor</first-name>
+      <last-name>Singletary</last-name>
+      <headline>Developer Advocate</headline>
+      <current-status>helping developers</current-status>
+      <site-standard-profile-request><url>http://www.linkedin.com/profile?key=1</url></site-standard-profile-request>
+    </person>
+  </update-content>
+  <is-commentable>true</is-commentable>
+  <is-likeable>true</is-likeable>
+</update>"""
+
+JOBP_UPDATE = """<update>
+  <timestamp>1285087000000</timestamp>
+  <update-key>JOBP-1</update-key>
+  <update-type>JOBP</update-type>
+  <update-content><job><id>42</id></job></update-content>
+</update>"""
+
+class UpdateModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = 0
+        self.original = UPDATE_HANDLERS["STAT"]
+        def counting_create(xml_element):
+            self.calls += 1
+            return STAT.create(xml_element)
+        register_update_handler("STAT", counting_create, self.original.source)
+        self.update = Update.create(cElementTree.fromstring(STAT_UPDATE), "STAT")
+
+    def tearDown(self):
+        UPDATE_HANDLERS["STAT"] = self.original
+
+    def test_envelope_is_eager(self):
+        self.assertEquals((1285087000000, "STAT-1", True), (self.update.timestamp, self.update.update_key,
+                                                            self.update.is_commentable))
+        self.assertEquals(0, self.calls)
+
+    def test_payload_is_built_once_on_access(self):
+        self.assertEquals("helping developers", self.update.update.current_status)
+        self.assertEquals(("C4Xk8TAqQN", "Taylor Singletary"), self.update.get_source())
+        self.assertEquals(1, self.calls)
+
+    def test_assignment_and_pickle(self):
+        copy = pickle.loads(pickle.dumps(self.update, 2))
+        self.assertEquals("helping developers", copy.update.current_status)
+        self.update.update = None
+        self.assertEquals(None, self.update.update)
+
+    def test_unknown_type(self):
+        update = Update.create(cElementTree.fromstring(STAT_UPDATE), "XXXX")
+        self.assertEquals(None, update.update)
+        self.assertEquals(("XXXX", "XXXX"), update.get_source())
+
+    def test_custom_handler(self):
+        register_update_handler("JOBP", lambda content: content.find("job").findtext("id"), lambda job: (job, "Job"))
+        try:
+            update = Update.create(cElementTree.fromstring(JOBP_UPDATE), "JOBP")
+            self.assertEquals("42", update.update)
+            self.assertEquals(("42", "Job"), update.get_source())
+        finally:
+            del UPDATE_HANDLERS["JOBP"]
+
+    def test_sources(self):
+        ncon = Update.create(cElementTree.fromstring(STAT_UPDATE.replace("STAT", "NCON")), "NCON")
+        self.assertEquals(("C4Xk8TAqQN", "Taylor Singletary"), ncon.get_source())
+        qstn = Update.create(cElementTree.fromstring(STAT_UPDATE), "QSTN")
+        self.assertEquals(("QSTN", "QSTN"), qstn.get_source())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import re, threading, time
+from linkedin.linkedin import *
+
+PAGE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<connections total="%d" count="%d" start="%d">%s</connections>"""
+
+PERSON = """<person><id>%d</id><connections total="1"><connection><person><id>nested</id></person>
+</connection></connections></person>"""
+
+class ConnectionPagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.total = 23
+        self.requests = []
+        self.fail_at = None
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = self._fake_connection
+
+    def _fake_connection(self, method, relative_url, query_dict, body=None):
+        start = int(re.search(r"start=(\d+)", relative_url).group(1))
+        count = int(re.search(r"count=(\d+)", relative_url).group(1))
+        self.requests.append((start, threading.current_thread().name))
+        if start == self.fail_at:
+            return "<error><message>Throttled</message></error>"
+        ids = range(start, min(start + count, self.total))
+        return PAGE % (self.total, len(ids), start, "".join([PERSON % i for i in ids]))
+
+    def test_all_pages(self):
+        connections = self.api.iter_all_connections(page_size = 10, prefetch = False)
+        self.assertEquals(range(23), [int(p.id) for p in connections])
+        self.assertEquals([0, 10, 20], [start for start, thread in self.requests])
+        self.assertEquals(23, connections.total)
+
+    def test_next_page_is_prefetched(self):
+        pages = self.api.iter_all_connections(page_size = 10).pages()
+        page = pages.next()
+        self.assertEquals((0, 10, 23), (page.start, page.count, page.total))
+        time.sleep(0.1)
+        self.assertEquals([0, 10], [start for start, thread in self.requests])
+        self.assertEquals("linkedin-prefetch", self.requests[1][1])
+        self.assertEquals([10, 20], [page.start for page in pages])
+        self.assertEquals(3, len(self.requests))
+
+    def test_prefetch_error_is_raised(self):
+        self.fail_at = 10
+        connections = iter(self.api.iter_all_connections(page_size = 10))
+        for i in range(10):
+            connections.next()
+        self.assertRaises(LinkedinError, connections.next)
+
+    def test_empty(self):
+        self.total = 0
+        self.assertEquals([], list(self.api.iter_all_connections()))
+        self.assertEquals(1, len(self.requests))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import gc, threading
+import unittest
+from xml.dom import minidom
+from linkedin import parser
+from linkedin.model import Profile
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "model", "example.xml")
+
+EDGE_CASES = """<?xml version="1.0" encoding="UTF-8"?>
+<people total="2">
+  <person><!-- comment --><id>one</id>
+    <first-name>A &amp; B<![CDATA[ <raw> ]]>tail</first-name>
+    <headline></headline>
+    <location><name>Paris &quot;area&quot;</name><country><code>fr</code></country></location>
+    <positions total="1"><position><id>9</id><title>T</title><is-current>true</is-current>
+      <company><name>C</name></company><start-date><year>2008</year><month>2</month></start-date>
+    </position></positions>
+  </person>
+  <person><id>two</id><last-name>\xc3\xa9t\xc3\xa9</last-name></person>
+</people>"""
+
+class ParserTest(unittest.TestCase):
+
+    def assertSameTree(self, xml):
+        expected = minidom.parseString(xml)
+        document = parser.parse_string(xml)
+        self.assertEquals(expected.toxml(), document.toxml())
+        for tag in ("person", "position", "name", "id"):
+            self.assertEquals([e.toxml() for e in expected.getElementsByTagName(tag)],
+                              [e.toxml() for e in document.getElementsByTagName(tag)])
+
+    def assertSameProfiles(self, xml):
+        expected = [repr(Profile.create(person)) for person in
+                    minidom.parseString(xml).getElementsByTagName("person")]
+        self.assertEquals(expected, [repr(p) for p in parser.parse_people(xml)])
+        self.assertEquals(repr(Profile.create(minidom.parseString(xml))),
+                          repr(Profile.create(parser.parse_string(xml))))
+
+    def test_example_tree(self):
+        self.assertSameTree(open(EXAMPLE).read())
+
+    def test_edge_cases(self):
+        self.assertSameTree(EDGE_CASES)
+        self.assertSameProfiles(EDGE_CASES)
+        person = parser.parse_string(EDGE_CASES).getElementsByTagName("person")[0]
+        self.assertEquals(u"A & B", person.getElementsByTagName("first-name")[0].childNodes[0].nodeValue)
+
+    def test_nested_people_keep_document_order(self):
+        xml = "<people><person><id>1</id><connections><connection><person><id>2</id></person>" \
+              "</connection></connections></person><person><id>3</id></person></people>"
+        self.assertEquals(["1", "2", "3"], [p.id for p in parser.parse_people(xml)])
+
+    def test_concurrent_parsing_leaves_the_collector_alone(self):
+        xml = open(EXAMPLE).read()
+        def work():
+            for i in range(50):
+                parser.parse_string(xml)
+        threads = [threading.Thread(target = work) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(gc.isenabled())
+
+if __name__ == "__main__":
+    unittest.main()
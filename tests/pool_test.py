@@ -0,0 +1,122 @@
+import unittest
+import httplib
+from linkedin.pool import HTTPSConnectionPool
+
+class FakeResponse(object):
+    def __init__(self, data, will_close = False):
+        self.status = 200
+        self.will_close = will_close
+        self._data = data
+
+    def read(self, amt = None):
+        if amt is None:
+            amt = len(self._data)
+        data, self._data = self._data[:amt], self._data[amt:]
+        return data
+
+class FakeConnection(object):
+    created = []
+
+    def __init__(self, host, timeout = None):
+        self.host = host
+        self.sock = None
+        self.closed = False
+        self.requests = 0
+        self.fail_next = False
+        self.fail_response = False
+        FakeConnection.created.append(self)
+
+    def request(self, method, url, body = None, headers = None):
+        if self.fail_next:
+            self.fail_next = False
+            raise httplib.BadStatusLine("")
+        self.requests += 1
+
+    def getresponse(self):
+        if self.fail_response:
+            self.fail_response = False
+            raise httplib.BadStatusLine("")
+        return FakeResponse("<person/>")
+
+    def close(self):
+        self.closed = True
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        FakeConnection.created = []
+        self.pool = HTTPSConnectionPool("api.linkedin.com", pool_size = 2)
+        self.pool.connection_class = FakeConnection
+        self.pool._is_dropped = lambda connection: False
+
+    def test_connection_is_reused(self):
+        self.pool.request("GET", "/v1/people/~")
+        self.pool.request("GET", "/v1/people/~")
+        self.assertEquals(1, len(FakeConnection.created))
+        self.assertEquals(2, FakeConnection.created[0].requests)
+        self.assertEquals(1, self.pool.num_idle())
+        self.assertEquals(0, self.pool.num_in_use())
+
+    def test_stale_connection_is_replaced(self):
+        self.pool.request("GET", "/v1/people/~")
+        FakeConnection.created[0].fail_next = True
+        response, data = self.pool.request("GET", "/v1/people/~")
+        self.assertEquals("<person/>", data)
+        self.assertEquals(2, len(FakeConnection.created))
+        self.assertTrue(FakeConnection.created[0].closed)
+
+    def test_written_post_is_not_sent_twice(self):
+        self.pool.request("GET", "/v1/people/~")
+        FakeConnection.created[0].fail_response = True
+        self.assertRaises(httplib.BadStatusLine, self.pool.request, "POST", "/v1/people/~/mailbox", "<body/>")
+        self.assertEquals(1, len(FakeConnection.created))
+        self.assertEquals(0, self.pool.num_in_use())
+
+        # Failing before the request was written, the POST is sent on a fresh connection.
+        self.pool.request("GET", "/v1/people/~")
+        FakeConnection.created[-1].fail_next = True
+        response, data = self.pool.request("POST", "/v1/people/~/mailbox", "<body/>")
+        self.assertEquals(1, FakeConnection.created[-1].requests)
+
+    def test_written_get_is_sent_again(self):
+        self.pool.request("GET", "/v1/people/~")
+        FakeConnection.created[0].fail_response = True
+        response, data = self.pool.request("GET", "/v1/people/~")
+        self.assertEquals("<person/>", data)
+        self.assertEquals(2, len(FakeConnection.created))
+
+    def test_idle_timeout(self):
+        self.pool.idle_timeout = 0
+        self.pool.request("GET", "/v1/people/~")
+        self.pool.request("GET", "/v1/people/~")
+        self.assertEquals(2, len(FakeConnection.created))
+        self.assertTrue(FakeConnection.created[0].closed)
+
+    def test_fresh_connection_error_is_raised(self):
+        original = FakeConnection.request
+        def failing_request(connection, *args, **kwargs):
+            raise httplib.BadStatusLine("")
+        FakeConnection.request = failing_request
+        try:
+            self.assertRaises(httplib.BadStatusLine, self.pool.request, "GET", "/v1/people/~")
+        finally:
+            FakeConnection.request = original
+        self.assertEquals(0, self.pool.num_in_use())
+        self.assertEquals(0, self.pool.num_idle())
+
+    def test_stream(self):
+        chunks = list(self.pool.stream("GET", "/v1/people/~", chunk_size = 4))
+        self.assertEquals(["<per", "son/", ">"], chunks)
+        self.assertEquals(1, self.pool.num_idle())
+        self.assertEquals(0, self.pool.num_in_use())
+
+    def test_stream_closed_early(self):
+        chunks = self.pool.stream("GET", "/v1/people/~", chunk_size = 4)
+        chunks.next()
+        chunks.close()
+        self.assertTrue(FakeConnection.created[0].closed)
+        self.assertEquals(0, self.pool.num_idle())
+        self.assertEquals(0, self.pool.num_in_use())
+
+if __name__ == "__main__":
+    unittest.main()
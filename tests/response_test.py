@@ -0,0 +1,72 @@
+import unittest
+from linkedin.parser import Response
+from linkedin.linkedin import *
+
+ERROR = """<?xml version='1.0' encoding='UTF-8' standalone='yes'?>
+<!-- comment -->
+<error>
+  <status>404</status>
+  <timestamp>1262186271064</timestamp>
+  <error-code>0000</error-code>
+  <message>[invalid.property.name]. Couldn't find property with name: first_name</message>
+</error>"""
+
+UPDATES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<updates total="1">
+  <update>
+    <timestamp>1285087000000</timestamp>
+    <update-key>UNIU-1-2-3</update-key>
+    <update-type>XXXX</update-type>
+    <is-commentable>false</is-commentable>
+  </update>
+</updates>"""
+
+class ResponseTest(unittest.TestCase):
+
+    def test_root_tag(self):
+        self.assertEquals("error", Response(ERROR).root_tag)
+        self.assertEquals("updates", Response(UPDATES).root_tag)
+        self.assertEquals("person", Response("\xef\xbb\xbf<person><id>1</id></person>").root_tag)
+        self.assertEquals(None, Response("").root_tag)
+        self.assertEquals(None, Response(None).root_tag)
+
+    def test_error(self):
+        self.assertEquals("[invalid.property.name]. Couldn't find property with name: first_name",
+                          Response(ERROR).error)
+        self.assertEquals("Unknown error", Response("<error><status>500</status></error>").error)
+
+    def test_other_responses_are_not_parsed_for_the_error_check(self):
+        response = Response(UPDATES)
+        self.assertEquals(None, response.error)
+        self.assertEquals(None, response._document)
+
+    def test_document_is_parsed_once(self):
+        response = Response(UPDATES)
+        self.assertTrue(response.document is response.document)
+
+class ParseOnceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = lambda method, relative_url, query_dict, body=None: self.response
+
+    def test_updates(self):
+        self.response = UPDATES
+        updates = self.api.get_updates()
+        self.assertEquals(1, len(updates))
+        self.assertEquals("UNIU-1-2-3", updates[0].update_key)
+        self.assertEquals(1285087000000, updates[0].timestamp)
+
+    def test_error_is_raised(self):
+        self.response = ERROR
+        self.assertRaises(LinkedinError, self.api.get_updates)
+        self.assertRaises(LinkedinError, self.api.get_profile)
+
+    def test_empty_response(self):
+        self.response = ""
+        self.assertEquals(None, self.api.send_message("subject", "message", ["id"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import unittest
+import socket
+from linkedin.linkedin import *
+from linkedin import retry
+from linkedin.retry import RetryPolicy, CircuitBreaker, CircuitOpen, ServerError
+from linkedin.cache import ResponseCache
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person><id>abc</id></person>"""
+
+ERROR = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<error><status>503</status><message>Service unavailable</message></error>"""
+
+class FakeLinkedIn(LinkedIn):
+    # Answers with the next of self.answers: a status, a (status, body) pair, an exception or a body.
+    def _https_connection(self, method, relative_url, query_dict, body=None):
+        self.requests.append((method, query_dict["oauth_nonce"]))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        if isinstance(answer, int):
+            return self._check_status(answer, ERROR)
+        if isinstance(answer, tuple):
+            return self._check_status(*answer)
+        return answer
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class RetryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.time = retry.time.time
+        retry.time.time = self.clock.time
+        self.policy = RetryPolicy(max_attempts = 3, base_delay = 1, max_delay = 3,
+                                  breaker = CircuitBreaker(failure_threshold = 3, reset_timeout = 30))
+        self.policy._sleep = self.clock.sleep
+
+        self.api = FakeLinkedIn("key", "secret", "http://localhost")
+        self.api._access_token, self.api._access_token_secret = "token", "secret"
+        self.api.requests = []
+        self.api.retry_policy = self.policy
+
+    def tearDown(self):
+        retry.time.time = self.time
+
+    def failing(self, *errors):
+        errors = list(errors)
+        calls = []
+        def function():
+            calls.append(1)
+            if errors:
+                raise errors.pop(0)
+            return "done"
+        return function, calls
+
+    def test_retries_transient_errors(self):
+        function, calls = self.failing(socket.error("reset"), ServerError(502, ""))
+        self.assertEquals("done", self.policy.call(function))
+        self.assertEquals(3, len(calls))
+        self.assertEquals(2, len(self.clock.slept))
+        self.assertTrue(0 <= self.clock.slept[0] <= 1)
+        self.assertTrue(0 <= self.clock.slept[1] <= 2)
+        self.assertEquals("closed", self.policy.breaker.state)
+
+    def test_gives_up(self):
+        function, calls = self.failing(*[socket.error("reset")] * 5)
+        self.assertRaises(socket.error, self.policy.call, function)
+        self.assertEquals(3, len(calls))
+        self.policy.breaker.success()
+
+        function, calls = self.failing(ValueError())
+        self.assertRaises(ValueError, self.policy.call, function)
+        self.assertEquals(1, len(calls))
+
+        function, calls = self.failing(socket.error("reset"))
+        self.assertRaises(socket.error, self.policy.call, function, idempotent = False)
+        self.assertEquals(1, len(calls))
+
+    def test_jitter_is_capped(self):
+        for attempt in range(1, 10):
+            self.assertTrue(0 <= self.policy.delay(attempt) <= 3)
+
+    def test_retry_budget(self):
+        self.policy = RetryPolicy(max_attempts = 10, budget = 2, budget_ratio = 0.5,
+                                  breaker = CircuitBreaker(failure_threshold = 100))
+        self.policy._sleep = self.clock.sleep
+        function, calls = self.failing(*[socket.error("reset")] * 10)
+        self.assertRaises(socket.error, self.policy.call, function)
+        self.assertEquals(3, len(calls))
+        # Each call brings back half a retry.
+        function, calls = self.failing(*[socket.error("reset")] * 10)
+        self.assertRaises(socket.error, self.policy.call, function)
+        self.assertEquals(1, len(calls))
+        function, calls = self.failing(*[socket.error("reset")] * 10)
+        self.assertRaises(socket.error, self.policy.call, function)
+        self.assertEquals(2, len(calls))
+        self.assertEquals(3, self.policy.stats()["retries"])
+        self.assertEquals(3, self.policy.stats()["exhausted"])
+
+    def test_circuit_breaker(self):
+        function, calls = self.failing(*[socket.error("down")] * 4)
+        self.assertRaises(socket.error, self.policy.call, function)
+        self.assertEquals("open", self.policy.breaker.state)
+        self.assertRaises(CircuitOpen, self.policy.call, function)
+        self.assertEquals(3, len(calls))
+
+        # After the reset timeout one probe goes through, the other calls keep failing fast.
+        self.clock.now += 31
+        breaker = self.policy.breaker
+        breaker.before()
+        self.assertEquals("half-open", breaker.state)
+        self.assertRaises(CircuitOpen, breaker.before)
+        breaker.failure()
+        self.assertEquals("open", breaker.state)
+        self.assertRaises(CircuitOpen, breaker.before)
+
+        self.clock.now += 31
+        function, calls = self.failing()
+        self.assertEquals("done", self.policy.call(function))
+        self.assertEquals("closed", breaker.state)
+        self.assertEquals(0, breaker.failures)
+
+    def test_probe_refused_before_sending(self):
+        breaker = self.policy.breaker
+        for i in range(3):
+            breaker.failure()
+        self.clock.now += 31
+        function, calls = self.failing(ValueError())
+        self.assertRaises(ValueError, self.policy.call, function)
+        self.assertEquals("half-open", breaker.state)
+        self.assertEquals("done", self.policy.call(function))
+
+    def test_client_retries_gets(self):
+        self.api.answers = [socket.error("reset"), 503, PROFILE]
+        self.assertEquals("abc", self.api.get_profile().id)
+        self.assertEquals(3, len(self.api.requests))
+        # every attempt is signed again
+        self.assertEquals(3, len(set([nonce for method, nonce in self.api.requests])))
+
+    def test_client_keeps_the_last_error(self):
+        self.api.answers = [503, 503, 503]
+        try:
+            self.api.get_profile()
+            self.fail()
+        except LinkedinError, error:
+            self.assertEquals("Service unavailable", error._error)
+        self.assertRaises(CircuitOpenError, self.api.get_profile)
+        self.assertEquals(3, len(self.api.requests))
+
+    def test_client_raises_the_last_status(self):
+        self.api.cache = ResponseCache()
+        self.api.answers = [503, (503, "<html><body>503 Service Unavailable</body></html>")]
+        self.policy.max_attempts = 2
+        try:
+            self.api.get_profile(member_id = "abc")
+            self.fail()
+        except HTTPError, error:
+            self.assertEquals(503, error.status)
+            self.assertEquals("HTTP 503", error._error)
+        self.assertEquals(0, self.api.cache.stats()["entries"])
+
+    def test_client_errors_break_the_failures(self):
+        # A 4xx is an answer of the API: 503s around it are not failures in a row.
+        self.policy.max_attempts = 1
+        self.api.answers = [503, 404, 503] * 3
+        for status in [503, 404, 503] * 3:
+            try:
+                self.api.get_profile(member_id = "abc")
+                self.fail()
+            except HTTPError, error:
+                self.assertEquals(status, error.status)
+        self.assertEquals("closed", self.policy.breaker.state)
+        self.assertEquals(1, self.policy.breaker.failures)
+
+    def test_client_does_not_retry_writes(self):
+        self.api.answers = [503, PROFILE]
+        self.assertRaises(LinkedinError, self.api.set_status, "hello")
+        self.assertEquals([("PUT", self.api.requests[0][1])], self.api.requests)
+
+    def test_oauth_calls_are_not_retried(self):
+        self.api.answers = [503]
+        self.assertTrue(self.api.access_token("request", "request secret", "verifier"))
+        self.assertEquals(None, self.api._access_token)
+        self.assertEquals(1, len(self.api.requests))
+
+    def test_without_policy(self):
+        self.api.retry_policy = None
+        self.api.answers = [socket.error("reset")]
+        self.assertRaises(socket.error, self.api.get_profile)
+        self.api.answers = [503]
+        self.assertRaises(LinkedinError, self.api.get_profile)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import re, threading, time, urllib
+from linkedin.linkedin import *
+
+PAGE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<people-search><people total="%d" count="%d" start="%d">%s</people><num-results>%d</num-results></people-search>"""
+
+class SearchCursorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.total = 95
+        self.max_count = 100
+        self.urls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_connection = self._fake_connection
+
+    def _parameter(self, relative_url, name, default):
+        match = re.search(r"%s=(\d+)" % name, relative_url)
+        return match and int(match.group(1)) or default
+
+    def _fake_connection(self, method, relative_url, query_dict, body=None):
+        self.lock.acquire()
+        self.urls.append(relative_url)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.lock.release()
+        start = self._parameter(relative_url, "start", 0)
+        count = min(self.max_count, self._parameter(relative_url, "count", 10))
+        # later pages answer first
+        time.sleep(0.002 * (100 - start) / 10)
+        self.lock.acquire()
+        self.active -= 1
+        self.lock.release()
+        ids = range(start, min(start + count, self.total))
+        people = "".join(["<person><id>%d</id><first-name>F%d</first-name></person>" % (i, i) for i in ids])
+        return PAGE % (self.total, len(ids), start, people, self.total)
+
+    def test_rank_order_and_concurrency(self):
+        cursor = self.api.search_cursor({"keywords" : "python"}, page_size = 10, concurrency = 3)
+        self.assertEquals(range(95), [int(p.id) for p in cursor])
+        self.assertEquals(95, cursor.total)
+        self.assertEquals(10, len(self.urls))
+        self.assertEquals(3, self.max_active)
+        self.assertTrue("keywords=python" in self.urls[0])
+
+    def test_field_selector(self):
+        list(self.api.search_cursor({"keywords" : "python"}, fields = ["id", "first-name"], page_size = 50))
+        self.assertTrue(self.urls[0].startswith("/v1/people-search:(people:(id,first-name))?"), self.urls[0])
+        self.urls = []
+        list(self.api.search_cursor({}, fields = ":(people:(id),num-results)", page_size = 50))
+        self.assertTrue(self.urls[0].startswith("/v1/people-search:(people:(id),num-results)?"))
+        self.urls = []
+        self.api.get_search({}, fields = ["id"])
+        self.assertEquals(["/v1/people-search:(people:(id))"], self.urls)
+
+    def test_server_page_size_and_max_results(self):
+        self.max_count = 25
+        profiles = list(self.api.search_cursor({}, page_size = 100, max_results = 60))
+        self.assertEquals(range(60), [int(p.id) for p in profiles])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import itertools, threading, time
+from linkedin.linkedin import *
+from linkedin.asynchronous import AsyncLinkedIn
+from linkedin.cache import ResponseCache
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person><id>%s</id><first-name>%s</first-name></person>"""
+
+class FakeLinkedIn(LinkedIn):
+    # the sessions use the methods of the class of the client
+    def _https_connection(self, method, relative_url, query_dict, body=None):
+        token = query_dict["oauth_token"]
+        self.requests.append(token)
+        time.sleep(0.001)
+        return PROFILE % (token, token)
+
+UPDATES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<updates total="1"><update><timestamp>%d</timestamp><update-key>k%d</update-key>
+<update-type>STAT</update-type></update></updates>"""
+
+class FeedLinkedIn(LinkedIn):
+    # Each poll of the feed finds one update newer than all the previous ones.
+    def _https_stream(self, method, relative_url, query_dict, body=None, chunk_size=16384):
+        timestamp = self.clock.next()
+        yield UPDATES % (timestamp, timestamp)
+
+class SlowMarks(dict):
+    # Widens the window between reading a mark and storing the next one, and
+    # records the marks moved backwards.
+    def __init__(self):
+        dict.__init__(self)
+        self.backwards = []
+
+    def get(self, key, default = None):
+        value = dict.get(self, key, default)
+        time.sleep(0.001)
+        return value
+
+    def __setitem__(self, key, mark):
+        old = dict.get(self, key)
+        if old is not None and mark.timestamp < old.timestamp:
+            self.backwards.append((old.timestamp, mark.timestamp))
+        dict.__setitem__(self, key, mark)
+
+class SessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FakeLinkedIn("key", "secret", "http://localhost")
+        self.api.requests = self.requests = []
+
+    def test_sessions_carry_their_tokens(self):
+        sessions = [self.api.session("token%d" % i, "secret%d" % i) for i in range(200)]
+        results = {}
+        def work(session):
+            for i in range(5):
+                results.setdefault(session._access_token, set()).add(session.get_profile().id)
+        threads = [threading.Thread(target = work, args = (session,)) for session in sessions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(200, len(results))
+        for token, ids in results.items():
+            self.assertEquals(set([token]), ids)
+        self.assertRaises(OAuthError, self.api.get_profile)
+
+    def test_sessions_share_the_client(self):
+        self.api.cache = ResponseCache()
+        first = self.api.session("token1", "secret1")
+        second = self.api.session("token2", "secret2")
+        self.assertEquals("token1", first.get_profile().id)
+        self.assertEquals("token1", self.api.session("token1", "secret1").get_profile().id)
+        self.assertEquals("token2", second.get_profile().id)
+        self.assertEquals(["token1", "token2"], self.requests)
+        self.assertTrue(first.cache is self.api.cache)
+
+        self.api.lazy_profiles = True
+        self.assertTrue(first.lazy_profiles)
+        self.assertTrue(first.session("token3", "secret3").client is self.api)
+
+    def test_sessions_never_move_a_mark_backwards(self):
+        api = FeedLinkedIn("key", "secret", "http://localhost")
+        api.clock = itertools.count(1000)
+        api.update_marks = SlowMarks()
+        sessions = [api.session("token", "secret") for i in range(4)]
+        def work(session):
+            for i in range(10):
+                session.get_new_updates()
+        threads = [threading.Thread(target = work, args = (session,)) for session in sessions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals([], api.update_marks.backwards)
+        self.assertEquals(1039, api.update_marks["token"].timestamp)
+
+    def test_clear_and_errors_stay_in_the_session(self):
+        self.api._access_token, self.api._access_token_secret = "client token", "client secret"
+        session = self.api.session("token", "secret")
+        session.clear()
+        self.assertRaises(OAuthError, session.get_profile)
+        self.assertEquals("client token", self.api.get_profile().id)
+        self.assertRaises(AttributeError, getattr, session, "no_such_attribute")
+
+    def test_async_session(self):
+        api = AsyncLinkedIn("key", "secret", "http://localhost")
+        session = api.session("token", "secret")
+        self.assertTrue(isinstance(session, AsyncLinkedIn))
+        self.assertTrue(isinstance(session, Session))
+        self.assertTrue(type(session) is type(api.session("other", "secret")))
+        self.assertTrue(session._socket_map is api._socket_map)
+
+if __name__ == "__main__":
+    unittest.main()
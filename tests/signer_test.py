@@ -0,0 +1,41 @@
+import unittest
+from linkedin.linkedin import *
+from linkedin.signer import Signer, nonce
+
+# The example of the OAuth 1.0 specification, appendix A.5.
+PARAMS = {"oauth_consumer_key" : "dpf43f3p2l4k3l03", "oauth_token" : "nnch734d00sl2jdk",
+          "oauth_signature_method" : "HMAC-SHA1", "oauth_timestamp" : "1191242096",
+          "oauth_nonce" : "kllo9940pd9333jh", "oauth_version" : "1.0",
+          "file" : "vacation.jpg", "size" : "original"}
+URL = "http://photos.example.net/photos"
+SIGNATURE = "tR3+Ty81lMeYAr/Fid0kMTYa/WM="
+
+class SignerTest(unittest.TestCase):
+
+    def test_specification_example(self):
+        signer = Signer("kd94hf93k423kf44", "pfkkdhi9sl3r4s00")
+        self.assertEquals(SIGNATURE, signer.sign("GET", URL, PARAMS))
+        self.assertEquals("kd94hf93k423kf44&pfkkdhi9sl3r4s00", signer.key)
+        # the keyed state is copied, signing again gives the same result
+        self.assertEquals(SIGNATURE, signer.sign("GET", URL, dict(PARAMS)))
+
+    def test_constants_are_quoted_once(self):
+        constants = {"oauth_consumer_key" : "dpf43f3p2l4k3l03", "oauth_token" : "nnch734d00sl2jdk"}
+        signer = Signer("kd94hf93k423kf44", "pfkkdhi9sl3r4s00", constants)
+        self.assertEquals(SIGNATURE, signer.sign("GET", URL, PARAMS))
+        self.assertEquals([("a", "1"), ("b", "x%20y"), ("b", "z")], signer.pairs({"b" : ["z", "x y"], "a" : 1}))
+
+    def test_api_signature(self):
+        api = LinkedIn("dpf43f3p2l4k3l03", "kd94hf93k423kf44", "http://localhost")
+        api.VERSION = "1.0"
+        self.assertEquals(SIGNATURE, api._calc_signature(URL, dict(PARAMS), "pfkkdhi9sl3r4s00"))
+        self.assertTrue(api._signer("pfkkdhi9sl3r4s00") is api._signer("pfkkdhi9sl3r4s00"))
+        self.assertEquals("kd94hf93k423kf44&", api._calc_key(None))
+
+    def test_nonce(self):
+        self.assertEquals(20, len(nonce()))
+        self.assertEquals(7, len(nonce(7)))
+        self.assertNotEquals(nonce(), nonce())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from linkedin.linkedin import *
+from linkedin import pool
+from linkedin.retry import RetryPolicy
+from benchmarks.payloads import connections_xml
+
+BAD_GATEWAY = "<html><body><h1>502 Bad Gateway</h1></body></html>"
+
+class FakeResponse(object):
+    def __init__(self, status, data):
+        self.status = status
+        self.will_close = False
+        self._data = data
+
+    def read(self, amt = None):
+        if amt is None:
+            amt = len(self._data)
+        data, self._data = self._data[:amt], self._data[amt:]
+        return data
+
+class FakeConnection(object):
+    # Answers every request with FakeConnection.answer, a (status, body) pair.
+    answer = None
+
+    def __init__(self, host, timeout = None):
+        self.sock = None
+
+    def request(self, method, url, body = None, headers = None):
+        pass
+
+    def getresponse(self):
+        return FakeResponse(*FakeConnection.answer)
+
+    def close(self):
+        pass
+
+ERROR = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<error>
+  <status>403</status>
+  <message>Access to connections denied</message>
+</error>"""
+
+class StreamingConnectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.response = connections_xml(30)
+        self.api._https_connection = lambda method, relative_url, query_dict, body=None: self.response
+        self.api._https_stream = self._fake_stream
+        self.read = 0
+
+    def _fake_stream(self, method, relative_url, query_dict, body=None, chunk_size=16384):
+        for position in range(0, len(self.response), chunk_size):
+            self.read = position + chunk_size
+            yield self.response[position:position + chunk_size]
+
+    def test_same_profiles_as_get_connections(self):
+        expected = [repr(p) for p in self.api.get_connections()]
+        self.assertEquals(expected, [repr(p) for p in self.api.iter_connections(chunk_size = 100)])
+
+    def test_profiles_are_yielded_while_reading(self):
+        connections = self.api.iter_connections(chunk_size = 100)
+        connections.next()
+        self.assertTrue(self.read < len(self.response) / 10)
+
+    def test_nested_persons_keep_document_order(self):
+        self.response = "<connections><person><id>1</id><connections><connection><person><id>2</id>" \
+                        "</person></connection></connections></person><person><id>3</id></person></connections>"
+        self.assertEquals(["1", "2", "3"], [p.id for p in self.api.iter_connections(chunk_size = 7)])
+
+    def test_error(self):
+        self.response = ERROR
+        try:
+            list(self.api.iter_connections(chunk_size = 10))
+            self.fail("LinkedinError expected")
+        except LinkedinError, error:
+            self.assertEquals("Access to connections denied", error._error)
+
+class StreamStatusTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.pool = pool.HTTPSConnectionPool("api.linkedin.com")
+        self.pool.connection_class = FakeConnection
+        self.get_pool = pool.get_pool
+        pool.get_pool = lambda host: self.pool
+
+    def tearDown(self):
+        pool.get_pool = self.get_pool
+
+    def test_failed_status_raises(self):
+        FakeConnection.answer = (502, BAD_GATEWAY)
+        for retry_policy in (None, RetryPolicy()):
+            self.api.retry_policy = retry_policy
+            try:
+                list(self.api.iter_connections())
+                self.fail("HTTPError expected")
+            except HTTPError, error:
+                self.assertEquals(502, error.status)
+                self.assertEquals(BAD_GATEWAY, error.data)
+            self.assertEquals(0, self.pool.num_in_use())
+
+    def test_error_document_keeps_its_message(self):
+        FakeConnection.answer = (403, ERROR)
+        try:
+            list(self.api.iter_connections())
+            self.fail("HTTPError expected")
+        except HTTPError, error:
+            self.assertEquals("Access to connections denied", error._error)
+
+    def test_success(self):
+        FakeConnection.answer = (200, connections_xml(3))
+        self.assertEquals(3, len(list(self.api.iter_connections(chunk_size = 100))))
+        self.assertEquals(1, self.pool.num_idle())
+
+if __name__ == "__main__":
+    unittest.main()
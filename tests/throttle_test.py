@@ -0,0 +1,177 @@
+import unittest
+import os, shutil, tempfile
+from linkedin.linkedin import *
+from linkedin import throttle
+from linkedin.throttle import RateLimiter, QuotaLedger, Throttled, classify
+
+PROFILE = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<person><id>%s</id></person>"""
+
+class FakeLinkedIn(LinkedIn):
+    def _https_connection(self, method, relative_url, query_dict, body=None):
+        self.requests.append(relative_url)
+        return PROFILE % query_dict["oauth_token"]
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+class ThrottleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.time = throttle.time.time
+        throttle.time.time = self.clock.time
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        throttle.time.time = self.time
+        shutil.rmtree(self.directory)
+
+    def limiter(self, **kwargs):
+        limiter = RateLimiter(**kwargs)
+        limiter._sleep = self.clock.sleep
+        return limiter
+
+    def test_classify(self):
+        self.assertEquals("profile", classify("/v1/people/~"))
+        self.assertEquals("profile", classify("/v1/people/~:(id,first-name)"))
+        self.assertEquals("profile", classify("/v1/people/id=abc:(id)"))
+        self.assertEquals("profile", classify("/v1/people/url=http%3A%2F%2Fwww.linkedin.com%2Fin%2Fozgurv"))
+        self.assertEquals("connections", classify("/v1/people/~/connections:(id,headline)?start=0&count=500"))
+        self.assertEquals("search", classify("/v1/people-search:(people:(id))?keywords=python"))
+        self.assertEquals("search", classify("/v1/people-search"))
+        self.assertEquals("updates", classify("/v1/people/~/network?type=SHAR"))
+        self.assertEquals("updates", classify("/v1/people/~/network/updates"))
+        self.assertEquals("mailbox", classify("/v1/people/~/mailbox"))
+        self.assertEquals("shares", classify("/v1/people/~/shares"))
+        self.assertEquals("shares", classify("/v1/people/~/current-status"))
+        self.assertEquals(None, classify("/uas/oauth/requestToken"))
+
+    def test_bursts_then_waits(self):
+        limiter = self.limiter(app_rates = {"profile" : (2, 3)})
+        for i in range(3):
+            self.assertEquals("profile", limiter.acquire("/v1/people/~", "token"))
+        self.assertEquals([], self.clock.slept)
+        limiter.acquire("/v1/people/~", "token")
+        self.assertEquals([0.5], self.clock.slept)
+        limiter.acquire("/v1/people/~", "token")
+        self.assertEquals([0.5, 0.5], self.clock.slept)
+        # Other call types and the OAuth calls are not limited.
+        limiter.acquire("/v1/people-search", "token")
+        limiter.acquire("/uas/oauth/accessToken", "token")
+        self.assertEquals(2, len(self.clock.slept))
+
+    def test_rejects_without_blocking(self):
+        limiter = self.limiter(app_rates = {"profile" : (1, 1)}, block = False)
+        limiter.acquire("/v1/people/~", "token")
+        try:
+            limiter.acquire("/v1/people/~", "token")
+            self.fail()
+        except Throttled, error:
+            self.assertEquals(("profile", "rate", "app", 1.0), (error.bucket, error.limit, error.scope, error.retry_after))
+        self.clock.now += 1
+        limiter.acquire("/v1/people/~", "token")
+
+        limiter = self.limiter(app_rates = {"profile" : (1, 1)}, max_wait = 0.5)
+        limiter.acquire("/v1/people/~", "token")
+        self.assertRaises(Throttled, limiter.acquire, "/v1/people/~", "token")
+        self.clock.now += 0.6
+        limiter.acquire("/v1/people/~", "token")
+        self.assertEquals(1, len(self.clock.slept))
+        self.assertAlmostEquals(0.4, self.clock.slept[0])
+
+    def test_token_rates_are_per_token(self):
+        limiter = self.limiter(token_rates = {"search" : (1, 2)}, block = False)
+        for token in ("first", "second"):
+            limiter.acquire("/v1/people-search", token)
+            limiter.acquire("/v1/people-search", token)
+        try:
+            limiter.acquire("/v1/people-search", "first")
+            self.fail()
+        except Throttled, error:
+            self.assertEquals("token", error.scope)
+
+    def test_dropping_idle_token_buckets(self):
+        limiter = self.limiter(token_rates = {"profile" : (1, 1)}, block = False)
+        limiter.MAX_TOKEN_BUCKETS = 10
+        for i in range(10):
+            limiter.acquire("/v1/people/~", "token%d" % i)
+        self.clock.now += 5
+        limiter.acquire("/v1/people/~", "another")
+        self.assertEquals(1, len(limiter._token_buckets))
+
+    def test_daily_quotas(self):
+        limiter = self.limiter(app_quotas = {"search" : 3}, token_quotas = {"search" : 2})
+        limiter.acquire("/v1/people-search", "first")
+        limiter.acquire("/v1/people-search", "first")
+        try:
+            limiter.acquire("/v1/people-search", "first")
+            self.fail()
+        except Throttled, error:
+            self.assertEquals(("quota", "token"), (error.limit, error.scope))
+            self.assertTrue(0 < error.retry_after <= 86400)
+        limiter.acquire("/v1/people-search", "second")
+        try:
+            limiter.acquire("/v1/people-search", "second")
+            self.fail()
+        except Throttled, error:
+            self.assertEquals("app", error.scope)
+        self.assertEquals(3, limiter.usage("search"))
+        self.assertEquals(2, limiter.usage("search", "first"))
+        self.assertEquals(1, limiter.usage("search", "second"))
+
+    def test_quota_rejections_keep_the_rate_tokens(self):
+        limiter = self.limiter(token_rates = {"search" : (1, 2)}, token_quotas = {"search" : 1}, block = False)
+        limiter.acquire("/v1/people-search", "token")
+        for i in range(3):
+            try:
+                limiter.acquire("/v1/people-search", "token")
+                self.fail()
+            except Throttled, error:
+                self.assertEquals("quota", error.limit)
+        self.assertEquals(1, limiter._token_buckets[("token", "search")].tokens)
+
+    def test_quotas_survive_restarts(self):
+        path = os.path.join(self.directory, "quotas.db")
+        limiter = self.limiter(token_quotas = {"mailbox" : 2}, ledger = QuotaLedger(path))
+        limiter.acquire("/v1/people/~/mailbox", "token")
+
+        limiter = self.limiter(token_quotas = {"mailbox" : 2}, ledger = QuotaLedger(path))
+        self.assertEquals(1, limiter.usage("mailbox", "token"))
+        limiter.acquire("/v1/people/~/mailbox", "token")
+        self.assertRaises(Throttled, limiter.acquire, "/v1/people/~/mailbox", "token")
+        self.assertEquals(2, limiter.usage("mailbox", "token"))
+        self.assertTrue("token" not in open(path, "rb").read())
+
+    def test_past_days_are_dropped(self):
+        ledger = QuotaLedger(os.path.join(self.directory, "quotas.db"))
+        self.assertEquals(None, ledger.consume("profile", [("app", 1)], day = "2012-01-01"))
+        self.assertEquals("app", ledger.consume("profile", [("app", 1)], day = "2012-01-01"))
+        self.assertEquals(None, ledger.consume("profile", [("app", 1)], day = "2012-01-02"))
+        self.assertEquals(0, ledger.count("app", "profile", day = "2012-01-01"))
+
+    def test_client_raises_rate_limit_error(self):
+        api = FakeLinkedIn("key", "secret", "http://localhost")
+        api.requests = []
+        api.rate_limiter = self.limiter(token_quotas = {"profile" : 1})
+        session = api.session("token", "secret")
+        self.assertEquals("token", session.get_profile().id)
+        try:
+            session.get_profile()
+            self.fail()
+        except RateLimitError, error:
+            self.assertTrue(error.retry_after > 0)
+        self.assertEquals(1, len(api.requests))
+        self.assertEquals("other", api.session("other", "secret").get_profile().id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import re
+from linkedin.linkedin import *
+from linkedin.updates import HighWaterMark, iter_updates
+from linkedin import pool
+from tests.streaming_test import FakeConnection, BAD_GATEWAY
+
+UPDATES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<updates total="%d">%s</updates>"""
+
+UPDATE = """
+  <update>
+    <timestamp>%d</timestamp>
+    <update-key>%s</update-key>
+    <update-type>XXXX</update-type>
+    <is-commentable>false</is-commentable>
+  </update>"""
+
+TYPED_UPDATE = """
+  <update>
+    <timestamp>%d</timestamp>
+    <update-key>%s</update-key>
+    <update-type>%s</update-type>
+  </update>"""
+
+class UpdatesSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        # newest first, two updates share a millisecond
+        self.feed = [(1300, "k5"), (1200, "k4"), (1200, "k3"), (1100, "k2"), (1000, "k1")]
+        self.urls = []
+        self.read = 0
+        self.api = LinkedIn("key", "secret", "http://localhost")
+        self.api._access_token = "token"
+        self.api._access_token_secret = "token secret"
+        self.api._https_stream = self._fake_stream
+
+    def _response(self, after):
+        # like LinkedIn, 'after' is inclusive here to exercise the update keys
+        updates = [UPDATE % update for update in self.feed if after is None or update[0] >= after]
+        return UPDATES % (len(updates), "".join(updates))
+
+    def _fake_stream(self, method, relative_url, query_dict, body=None, chunk_size=16384):
+        self.urls.append(relative_url)
+        after = re.search(r"after=(\d+)", relative_url)
+        response = self._response(after and int(after.group(1)))
+        for position in range(0, len(response), 64):
+            self.read = position + 64
+            yield response[position:position + 64]
+
+    def test_polls_return_the_delta(self):
+        self.feed = self.feed[2:]
+        self.assertEquals(["k3", "k2", "k1"], [u.update_key for u in self.api.get_new_updates()])
+        self.assertEquals("/v1/people/~/network/updates", self.urls[0])
+        self.assertEquals([], self.api.get_new_updates())
+        self.assertEquals("/v1/people/~/network/updates?after=1200", self.urls[1])
+
+        self.feed = [(1300, "k5"), (1200, "k4"), (1200, "k3"), (1100, "k2"), (1000, "k1")]
+        self.assertEquals(["k5", "k4"], [u.update_key for u in self.api.get_new_updates()])
+        self.assertEquals(1300, self.api.update_marks["token"].timestamp)
+
+    def test_marks_are_per_token(self):
+        self.api.get_new_updates()
+        self.api._access_token = "other token"
+        self.assertEquals(5, len(self.api.get_new_updates()))
+
+    def test_parsing_stops_at_the_first_seen_update(self):
+        self.feed = [(10000 - i, "k%d" % i) for i in range(1000)]
+        mark = HighWaterMark(9998, ["k2"])
+        response = self._response(None)
+        chunks = [response[i:i + 1024] for i in range(0, len(response), 1024)]
+        consumed = []
+        def tracked():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+        self.assertEquals(["k0", "k1"], [u.update_key for u in iter_updates(tracked(), mark)])
+        self.assertTrue(len(consumed) < len(chunks) / 2)
+
+    def test_error(self):
+        self._response = lambda after: "<error><message>Throttled</message></error>"
+        self.assertRaises(LinkedinError, self.api.get_new_updates)
+        self.assertFalse("token" in self.api.update_marks)
+
+    def test_mark(self):
+        mark = HighWaterMark(1200, ["k3"])
+        self.assertTrue(mark.seen(1100, "k2"))
+        self.assertTrue(mark.seen(1200, "k3"))
+        self.assertFalse(mark.seen(1200, "k4"))
+        self.assertFalse(HighWaterMark().seen(0, "k0"))
+
+    def test_types_are_sent_and_filtered(self):
+        typed = [(1000 + i, "k%d" % i, ("SHAR", "CONN", "STAT", "PICU")[i % 4]) for i in range(8)]
+        feed = UPDATES % (8, "".join([TYPED_UPDATE % update for update in typed]))
+        urls = []
+        def fake_connection(method, relative_url, query_dict, body=None):
+            urls.append(relative_url)
+            return feed
+        self.api._https_connection = fake_connection
+        created = []
+        original = Update.create
+        def counting_create(element, update_type):
+            created.append(update_type)
+            return original(element, update_type)
+        Update.create = staticmethod(counting_create)
+        try:
+            result = self.api.get_updates(types = ["SHAR", "CONN"])
+        finally:
+            Update.create = staticmethod(original)
+        self.assertEquals("/v1/people/~/network/updates?type=CONN&type=SHAR", urls[0])
+        self.assertEquals(["k0", "k1", "k4", "k5"], [u.update_key for u in result])
+        self.assertEquals(["SHAR", "CONN", "SHAR", "CONN"], created)
+        self.assertEquals(8, len(self.api.get_updates()))
+
+    def test_new_updates_marks_are_per_types(self):
+        self.api.get_new_updates(types = ["XXXX"])
+        self.assertEquals("/v1/people/~/network/updates?type=XXXX", self.urls[0])
+        self.assertEquals(1300, self.api.update_marks["token|XXXX"].timestamp)
+        self.assertFalse("token" in self.api.update_marks)
+        self.assertEquals([], self.api.get_new_updates(types = ["XXXX"]))
+        self.assertEquals("/v1/people/~/network/updates?after=1300&type=XXXX", self.urls[1])
+        self.assertEquals([], self.api.get_new_updates(types = ["SHAR"]))
+
+    def test_other_elements_are_not_updates(self):
+        self.assertEquals([], list(iter_updates([BAD_GATEWAY])))
+        feed = "<updates><paging/>%s<foo><update-type>XXXX</update-type></foo></updates>" % (UPDATE % (1000, "k1"))
+        self.assertEquals(["k1"], [update.update_key for update in iter_updates([feed])])
+
+    def test_failed_status_raises(self):
+        del self.api._https_stream
+        connection_pool = pool.HTTPSConnectionPool("api.linkedin.com")
+        connection_pool.connection_class = FakeConnection
+        FakeConnection.answer = (502, BAD_GATEWAY)
+        get_pool = pool.get_pool
+        pool.get_pool = lambda host: connection_pool
+        try:
+            try:
+                self.api.get_new_updates()
+                self.fail("HTTPError expected")
+            except HTTPError, error:
+                self.assertEquals(502, error.status)
+        finally:
+            pool.get_pool = get_pool
+        self.assertEquals({}, self.api.update_marks)
+
+    def test_repeated_parameters_are_signed_sorted(self):
+        self.assertEquals("a=1&type=CONN&type=SHAR", self.api._urlencode({"type" : ("SHAR", "CONN"), "a" : 1}))
+
+if __name__ == "__main__":
+    unittest.main()